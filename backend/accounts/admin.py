@@ -1,7 +1,12 @@
 from django.contrib.admin import AdminSite
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Account, Transaction, ServiceRequest
+from .exports import stream_csv
+from .models import (
+    User, Account, Transaction, ServiceRequest, InterestAccrual, TransactionArchive, AuditEntry,
+    StandingInstruction,
+)
+from .pagination import ApproximateCountPaginator
 
 
 # Custom Admin Site branding
@@ -10,32 +15,112 @@ admin.site.site_title = 'Subbu Bank Admin'
 admin.site.index_title = 'Welcome to Subbu Bank Admin Panel'
 
 
+def export_as_csv(fields, filename):
+    """Build an admin action that streams the selected rows as CSV."""
+    def action(modeladmin, request, queryset):
+        rows = queryset.order_by().values_list(*fields).iterator(chunk_size=2000)
+        return stream_csv(fields, rows, filename)
+    action.short_description = 'Export selected as CSV'
+    action.__name__ = 'export_as_csv'
+    return action
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Defaults for million-row tables: approximate counts, no full-count on filter."""
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     list_display = ['username', 'email', 'first_name', 'last_name', 'role', 'is_active', 'date_joined']
     list_filter = ['role', 'is_active']
     search_fields = ['username', 'email', 'first_name', 'last_name']
+    raw_id_fields = ['created_by']
+    show_full_result_count = False
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Bank Role', {'fields': ('role', 'phone', 'address', 'created_by')}),
     )
 
 
 @admin.register(Account)
-class AccountAdmin(admin.ModelAdmin):
+class AccountAdmin(LargeTableAdmin):
     list_display = ['account_number', 'user', 'account_type', 'balance', 'is_active', 'created_at']
     list_filter = ['account_type', 'is_active']
+    list_select_related = ['user']
     search_fields = ['account_number', 'user__username']
+    autocomplete_fields = ['user']
+    actions = [export_as_csv(
+        ('account_number', 'user__username', 'account_type', 'balance', 'is_active', 'created_at'),
+        'accounts.csv',
+    )]
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(LargeTableAdmin):
     list_display = ['reference_id', 'account', 'transaction_type', 'amount', 'balance_after', 'timestamp']
     list_filter = ['transaction_type']
+    list_select_related = ['account__user']
     search_fields = ['reference_id', 'description']
+    autocomplete_fields = ['account']
+    date_hierarchy = 'timestamp'
+    actions = [export_as_csv(
+        ('reference_id', 'account__account_number', 'transaction_type', 'amount',
+         'balance_after', 'description', 'timestamp'),
+        'transactions.csv',
+    )]
 
 
 @admin.register(ServiceRequest)
-class ServiceRequestAdmin(admin.ModelAdmin):
-    list_display = ['user', 'service_type', 'status', 'created_at', 'updated_at']
+class ServiceRequestAdmin(LargeTableAdmin):
+    list_display = ['user', 'service_type', 'status', 'assigned_to', 'created_at', 'updated_at']
     list_filter = ['service_type', 'status']
+    list_select_related = ['user', 'assigned_to']
     search_fields = ['user__username']
+    autocomplete_fields = ['user', 'assigned_to']
+
+
+@admin.register(InterestAccrual)
+class InterestAccrualAdmin(LargeTableAdmin):
+    list_display = ['account', 'period_start', 'interest', 'transaction', 'created_at']
+    list_filter = ['period_start']
+    list_select_related = ['account', 'transaction']
+    search_fields = ['account__account_number']
+    raw_id_fields = ['account', 'transaction']
+
+
+@admin.register(TransactionArchive)
+class TransactionArchiveAdmin(LargeTableAdmin):
+    list_display = ['account', 'month', 'row_count', 'path', 'created_at']
+    list_select_related = ['account']
+    search_fields = ['account__account_number']
+    raw_id_fields = ['account']
+    readonly_fields = ['path', 'row_count', 'blocks', 'sha256']
+
+
+@admin.register(StandingInstruction)
+class StandingInstructionAdmin(LargeTableAdmin):
+    list_display = ['account', 'kind', 'amount', 'frequency', 'next_run', 'is_active', 'last_status']
+    list_filter = ['kind', 'frequency', 'is_active', 'last_status']
+    list_select_related = ['account']
+    search_fields = ['account__account_number', 'description']
+    raw_id_fields = ['account', 'destination']
+
+
+@admin.register(AuditEntry)
+class AuditEntryAdmin(LargeTableAdmin):
+    """Read-only: entries are only ever appended by accounts/audit.py."""
+    list_display = ['seq', 'action', 'actor_id', 'subject', 'created_at']
+    list_filter = ['action']
+    search_fields = ['subject']
+    ordering = ['-seq']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,245 @@
+"""
+Spending analytics on pre-aggregated daily rollups.
+
+Every posted transaction is categorised from its description and added to
+one DailyRollup row (account, local day, category) by the
+'transaction.posted' outbox handler below. The handler runs in the same
+DB transaction that marks the event delivered, so each posting is counted
+exactly once. Analytics queries then read at most one row per account per
+day per category instead of scanning Transaction.
+
+``manage.py rebuild_rollups`` recomputes rollups from the ledger (table
+and cold-storage archive) for backfills or after changing CATEGORY_RULES.
+A rebuilt range already counts postings whose event is still waiting in
+the outbox; the rebuild records them as RollupCoverage rows in the same DB
+transaction that replaces the rollups, and the handler skips a covered
+posting once. The events themselves are left for every other subscriber.
+The grouping is vectorised with NumPy when it is installed.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure-Python grouping
+    np = None
+
+from . import archive, batch, outbox, sharding
+from .fields import CENTS
+from .models import Account, DailyRollup, OutboxEvent, RollupCoverage, Transaction
+
+# First match wins, so more specific rules come first.
+CATEGORY_RULES = (
+    ('refund', ('refund', 'cashback', 'reversal')),
+    ('salary', ('salary', 'payroll')),
+    ('interest', ('interest', 'dividend')),
+    ('food', ('swiggy', 'zomato', 'restaurant', 'grocery', 'bigbasket', 'cafe')),
+    ('shopping', ('amazon', 'flipkart', 'myntra', 'purchase')),
+    ('bills', ('bill', 'electricity', 'recharge', 'subscription', 'netflix', 'insurance', 'emi')),
+    ('fuel', ('petrol', 'diesel', 'fuel')),
+    ('cash', ('atm', 'cash')),
+    ('transfer', ('transfer', 'neft', 'imps', 'rtgs', 'upi')),
+)
+OTHER = 'other'
+
+
+def categorize(description):
+    """Category slug for a transaction description."""
+    text = description.lower()
+    for category, keywords in CATEGORY_RULES:
+        if any(keyword in text for keyword in keywords):
+            return category
+    return OTHER
+
+
+# ─── Incremental maintenance ────────────────────────────────────────
+def add_to_rollup(account_id, day, category, transaction_type, amount):
+    """Add one posting to its rollup row, creating the row on first use."""
+    if transaction_type == 'credit':
+        changes = {'credit_total': F('credit_total') + amount, 'credit_count': F('credit_count') + 1}
+    else:
+        changes = {'debit_total': F('debit_total') + amount, 'debit_count': F('debit_count') + 1}
+    rollup = DailyRollup.objects.filter(account_id=account_id, day=day, category=category)
+    if rollup.update(**changes):
+        return
+    try:
+        with transaction.atomic(using=sharding.db()):
+            DailyRollup.objects.create(account_id=account_id, day=day, category=category)
+    except IntegrityError:
+        pass  # another worker created it first
+    rollup.update(**changes)
+
+
+@outbox.register('transaction.posted')
+def apply_posting(payload):
+    if RollupCoverage.objects.filter(transaction_id=payload['transaction_id']).delete()[0]:
+        return  # already counted by rebuild_rollups
+    ts = datetime.fromisoformat(payload['timestamp'])
+    add_to_rollup(
+        payload['account_id'], timezone.localtime(ts).date(),
+        categorize(payload['description']), payload['transaction_type'],
+        Decimal(payload['amount']),
+    )
+
+
+# ─── Queries ────────────────────────────────────────────────────────
+def _money(value):
+    return '{:f}'.format(Decimal(value or 0).quantize(CENTS))
+
+
+def _totals(row):
+    return {
+        'credit': _money(row['credit']), 'debit': _money(row['debit']),
+        'credit_count': row['credit_count'] or 0, 'debit_count': row['debit_count'] or 0,
+    }
+
+
+def summarize(rollups, interval='month', top=10):
+    """Time series (per day or month), top debit categories and totals for a rollup queryset."""
+    sums = {
+        'credit': Sum('credit_total'), 'debit': Sum('debit_total'),
+        'credit_count': Sum('credit_count'), 'debit_count': Sum('debit_count'),
+    }
+    period = TruncMonth('day') if interval == 'month' else F('day')
+    series = rollups.values(period=period).annotate(**sums).order_by('period')
+    categories = rollups.values('category').annotate(**sums).order_by('-debit', '-credit')[:top]
+    return {
+        'series': [{'period': row['period'].isoformat(), **_totals(row)} for row in series],
+        'categories': [{'category': row['category'], **_totals(row)} for row in categories],
+        'totals': _totals(rollups.aggregate(**sums)),
+    }
+
+
+# ─── Rebuild ────────────────────────────────────────────────────────
+def _ledger_rows(account_ids, start, end):
+    """(account_id, day ordinal, is_credit, paise, description) from table and archive."""
+    qs = Transaction.objects.filter(account_id__in=account_ids)
+    start_dt = end_dt = None
+    if start:
+        start_dt = timezone.make_aware(datetime.combine(start, time.min))
+        qs = qs.filter(timestamp__gte=start_dt)
+    if end:
+        end_dt = timezone.make_aware(datetime.combine(end, time.min))
+        qs = qs.filter(timestamp__lt=end_dt)
+    qs = qs.order_by().annotate(day=TruncDate('timestamp')).values_list(
+        'account_id', 'day', 'transaction_type', 'amount', 'description')
+    for account_id, day, transaction_type, amount, description in qs.iterator(chunk_size=5000):
+        yield account_id, day.toordinal(), transaction_type == 'credit', int(amount * 100), description
+
+    accounts = Account.objects.filter(id__in=account_ids)
+    ids_by_number = dict(accounts.values_list('account_number', 'id'))
+    for row in archive.read_transactions(accounts, start_dt, end_dt):
+        _, account_number, transaction_type, amount, _, description, _, ts = row
+        yield (ids_by_number[account_number], timezone.localtime(ts).date().toordinal(),
+               transaction_type == 'credit', int(amount * 100), description)
+
+
+def _group_numpy(rows, categories):
+    """{(account_id, day ordinal, category): [credit paise, debit paise, credits, debits]}."""
+    account_ids, days, credits, paise, descriptions = zip(*rows)
+    unique_desc, desc_index = np.unique(np.array(descriptions), return_inverse=True)
+    category_codes = np.array([categories.index(categorize(d)) for d in unique_desc])[desc_index]
+    keys = np.column_stack((np.array(account_ids, dtype=np.int64),
+                            np.array(days, dtype=np.int64), category_codes))
+    unique_keys, group = np.unique(keys, axis=0, return_inverse=True)
+    group = group.ravel()
+    is_credit = np.array(credits, dtype=bool)
+    amounts = np.array(paise, dtype=np.int64)
+
+    totals = np.zeros((len(unique_keys), 4), dtype=np.int64)
+    np.add.at(totals[:, 0], group[is_credit], amounts[is_credit])
+    np.add.at(totals[:, 1], group[~is_credit], amounts[~is_credit])
+    np.add.at(totals[:, 2], group[is_credit], 1)
+    np.add.at(totals[:, 3], group[~is_credit], 1)
+    return {
+        (int(a), int(d), categories[c]): row.tolist()
+        for (a, d, c), row in zip(unique_keys, totals)
+    }
+
+
+def _group_python(rows):
+    grouped = defaultdict(lambda: [0, 0, 0, 0])
+    category_of = {}
+    for account_id, day, is_credit, paise, description in rows:
+        if description not in category_of:
+            category_of[description] = categorize(description)
+        totals = grouped[account_id, day, category_of[description]]
+        if is_credit:
+            totals[0] += paise
+            totals[2] += 1
+        else:
+            totals[1] += paise
+            totals[3] += 1
+    return grouped
+
+
+def _cover_pending(account_ids, start, end):
+    """
+    Record the postings of ``account_ids`` on days in [start, end) whose
+    'transaction.posted' event is still pending, so apply_posting skips them;
+    call inside the rebuild's atomic block. The events are locked until the
+    rebuild commits (waiting for a worker delivering one right now) but
+    stay pending for every other handler of the topic.
+    """
+    events = (OutboxEvent.objects.select_for_update()
+              .filter(topic='transaction.posted', processed_at__isnull=True,
+                      payload__account_id__in=list(account_ids)))
+    covered = []
+    for payload in events.values_list('payload', flat=True):
+        day = timezone.localtime(datetime.fromisoformat(payload['timestamp'])).date()
+        if (start is None or day >= start) and (end is None or day < end):
+            covered.append(RollupCoverage(transaction_id=payload['transaction_id'],
+                                          account_id=payload['account_id']))
+    RollupCoverage.objects.bulk_create(covered, ignore_conflicts=True)
+    return len(covered)
+
+
+def rebuild_chunk(account_ids, start=None, end=None):
+    """
+    Replace the rollups of ``account_ids`` for days in [start, end) (dates,
+    None = open) with totals recomputed from the ledger. Returns rows written.
+
+    Only for days that take no new postings: one committed after the ledger
+    is read would be marked covered without being counted.
+    """
+    rows = list(_ledger_rows(account_ids, start, end))
+    if not rows:
+        grouped = {}
+    elif np is not None:
+        grouped = _group_numpy(rows, [c for c, _ in CATEGORY_RULES] + [OTHER])
+    else:
+        grouped = _group_python(rows)
+
+    with transaction.atomic(using=sharding.db()):
+        _cover_pending(account_ids, start, end)
+        stale = DailyRollup.objects.filter(account_id__in=account_ids)
+        if start:
+            stale = stale.filter(day__gte=start)
+        if end:
+            stale = stale.filter(day__lt=end)
+        stale.delete()
+        DailyRollup.objects.bulk_create([
+            DailyRollup(
+                account_id=account_id, day=date.fromordinal(day), category=category,
+                credit_total=Decimal(credit) / 100, debit_total=Decimal(debit) / 100,
+                credit_count=credits, debit_count=debits,
+            )
+            for (account_id, day, category), (credit, debit, credits, debits) in grouped.items()
+        ], batch_size=2000)
+    return len(grouped)
+
+
+def _rebuild(args):
+    return rebuild_chunk(*args)
+
+
+def rebuild(account_ids, start=None, end=None, workers=1, chunk_size=500):
+    """Rebuild rollups for ``account_ids`` in chunks; yields rows written per chunk."""
+    chunks = [(chunk, start, end) for chunk in batch.chunked(account_ids, chunk_size)]
+    return batch.run_chunks(_rebuild, chunks, workers)
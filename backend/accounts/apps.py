@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class AccountsConfig(AppConfig):
+    name = 'accounts'
+
+    def ready(self):
+        # Registers the app's outbox handlers.
+        from . import analytics, ledger  # noqa: F401
+        from . import sharding
+        sharding.connect_signals(self)
@@ -0,0 +1,191 @@
+"""
+Cold storage for old transactions.
+
+``manage.py archive_transactions`` moves every account-month that lies
+entirely before the retention window out of the Transaction table into one
+immutable file under TRANSACTION_ARCHIVE_ROOT:
+
+  <root>/<account_id // 1000>/<account_id>/<YYYY-MM>.jsonl.gz
+
+A file is a sequence of independent gzip members ("blocks") of up to
+BLOCK_ROWS JSON lines each, in (timestamp, id) order. The byte offset,
+length and timestamp range of every block are kept in the matching
+TransactionArchive row, so a reader memory-maps the file and inflates only
+the blocks that overlap the requested range. Timestamps are stored as
+integer microseconds since the epoch (UTC).
+
+The file is written and fsynced before its TransactionArchive row is
+committed together with the DELETE of the archived rows, so a crash at
+any point leaves the rows either in the table or in a recorded file. The
+root must be durable storage that already exists: there is no default
+outside DEBUG, and the command will not create it.
+"""
+import hashlib
+import mmap
+import os
+import zlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import DateField
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from . import sharding
+from .models import Transaction, TransactionArchive
+
+BLOCK_ROWS = 512
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Row layout inside the files; matches TransactionValuesSerializer.lookups
+# minus the account number, which comes from the TransactionArchive row.
+ROW_LOOKUPS = ('id', 'transaction_type', 'amount', 'balance_after',
+               'description', 'reference_id', 'timestamp')
+
+
+def archive_root():
+    """TRANSACTION_ARCHIVE_ROOT; refuses to guess one, since archiving deletes the rows."""
+    if not settings.TRANSACTION_ARCHIVE_ROOT:
+        raise ImproperlyConfigured('TRANSACTION_ARCHIVE_ROOT is not set.')
+    return Path(settings.TRANSACTION_ARCHIVE_ROOT)
+
+
+def to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _month_bounds(month):
+    """Aware local-time [start, end) of the month starting on ``month``."""
+    next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return (timezone.make_aware(datetime.combine(month, time.min)),
+            timezone.make_aware(datetime.combine(next_month, time.min)))
+
+
+def cutoff_month(retention_days=None, today=None):
+    """First month that is kept in the table: the one containing the retention cutoff."""
+    days = settings.TRANSACTION_RETENTION_DAYS if retention_days is None else retention_days
+    return ((today or timezone.localdate()) - timedelta(days=days)).replace(day=1)
+
+
+def pending_months(before):
+    """(account_id, month) pairs with rows in the table older than ``before``."""
+    start, _ = _month_bounds(before)
+    return (
+        Transaction.objects.filter(timestamp__lt=start)
+        .annotate(month=TruncMonth('timestamp', output_field=DateField()))
+        .order_by('account_id', 'month')
+        .values_list('account_id', 'month')
+        .distinct()
+    )
+
+
+# ─── Writing ────────────────────────────────────────────────────────
+def _encode(row):
+    pk, transaction_type, amount, balance_after, description, reference_id, ts = row
+    return orjson.dumps([pk, transaction_type, str(amount), str(balance_after),
+                         description, reference_id, to_micros(ts)])
+
+
+def _write_file(path, rows):
+    """Write ``rows`` as gzip blocks to ``path`` atomically; return (blocks, sha256)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    blocks, digest, offset = [], hashlib.sha256(), 0
+    with open(tmp, 'wb') as f:
+        for i in range(0, len(rows), BLOCK_ROWS):
+            chunk = rows[i:i + BLOCK_ROWS]
+            compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+            data = compressor.compress(b'\n'.join(_encode(r) for r in chunk) + b'\n')
+            data += compressor.flush()
+            f.write(data)
+            digest.update(data)
+            blocks.append([offset, len(data), to_micros(chunk[0][-1]),
+                           to_micros(chunk[-1][-1]), len(chunk)])
+            offset += len(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, path)
+    return blocks, digest.hexdigest()
+
+
+def archive_month(account_id, month):
+    """Move one account-month into cold storage. Returns the TransactionArchive (or None)."""
+    start, end = _month_bounds(month)
+    relative = Path(str(account_id // 1000), str(account_id), f'{month:%Y-%m}.jsonl.gz')
+    with transaction.atomic(using=sharding.db()):
+        if TransactionArchive.objects.filter(account_id=account_id, month=month).exists():
+            return None
+        qs = Transaction.objects.filter(account_id=account_id, timestamp__gte=start, timestamp__lt=end)
+        rows = list(qs.order_by('timestamp', 'id').values_list(*ROW_LOOKUPS))
+        if not rows:
+            return None
+        blocks, sha256 = _write_file(archive_root() / relative, rows)
+        archive = TransactionArchive.objects.create(
+            account_id=account_id, month=month, path=str(relative),
+            row_count=len(rows), blocks=blocks, sha256=sha256,
+        )
+        Transaction.objects.filter(id__in=[row[0] for row in rows]).delete()
+    return archive
+
+
+# ─── Reading ────────────────────────────────────────────────────────
+def _read_file(path, blocks, lo, hi):
+    """Yield decoded rows from the blocks that overlap [lo, hi) µs."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for offset, length, first, last, _ in blocks:
+            if last < lo or first >= hi:
+                continue
+            data = zlib.decompress(mm[offset:offset + length], 31)
+            for line in data.splitlines():
+                row = orjson.loads(line)
+                if lo <= row[6] < hi:
+                    yield row
+
+
+def read_transactions(accounts, start=None, end=None, transaction_type=None, match=None):
+    """
+    Archived transactions of ``accounts`` (a queryset) in [start, end), newest
+    first, as TransactionValuesSerializer rows.
+
+    ``match(description, reference_id, account_number)`` filters like the
+    table's search does.
+    """
+    archives = TransactionArchive.objects.filter(account__in=accounts)
+    if start is not None:
+        archives = archives.filter(month__gte=timezone.localtime(start).date().replace(day=1))
+    if end is not None:
+        archives = archives.filter(month__lt=timezone.localtime(end).date())
+    archives = archives.order_by('-month').values_list(
+        'month', 'account__account_number', 'path', 'blocks')
+
+    lo = to_micros(start) if start is not None else 0
+    hi = to_micros(end) if end is not None else 2 ** 62
+    root = archive_root()
+    current, pending = None, []
+    for period, account_number, path, blocks in archives.iterator():
+        if period != current:
+            yield from _newest_first(pending)
+            current, pending = period, []
+        for pk, txn_type, amount, balance_after, description, reference_id, ts in _read_file(
+                root / path, blocks, lo, hi):
+            if transaction_type and txn_type != transaction_type:
+                continue
+            if match and not match(description, reference_id, account_number):
+                continue
+            pending.append((pk, account_number, txn_type, Decimal(amount), Decimal(balance_after),
+                            description, reference_id, from_micros(ts)))
+    yield from _newest_first(pending)
+
+
+def _newest_first(rows):
+    return sorted(rows, key=lambda row: (row[-1], row[0]), reverse=True)
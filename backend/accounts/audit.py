@@ -0,0 +1,207 @@
+"""
+Tamper-evident audit trail.
+
+Deposits, withdrawals, user creation and service request changes call
+``record()``, which only appends the event to an in-process buffer once
+the surrounding transaction commits: no hashing or INSERT on the request
+path. A background thread (started with the first event) flushes the
+buffer every AUDIT_FLUSH_SECONDS, or as soon as AUDIT_BATCH_SIZE events
+are waiting, and the buffer is flushed again at exit.
+
+A flush chains the events, in the order they were buffered, onto the
+current head of the log: each AuditEntry stores the previous entry's hash,
+and its own hash covers that plus its seq, time, action, actor, subject and
+data, so altering, removing or reordering an entry breaks every link after
+it. The batch goes in with one bulk INSERT. ``seq`` is unique, so two
+processes flushing at once cannot both extend the same head: the loser's
+INSERT fails and it re-chains onto the new head. On PostgreSQL the table
+also refuses UPDATE, DELETE and TRUNCATE (migration 0013).
+
+Events still buffered when a process is killed are lost; the flush
+interval bounds how many. ``manage.py verify_audit`` checks the chain.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import AuditEntry
+
+logger = logging.getLogger(__name__)
+
+GENESIS = '0' * 64
+MAX_RETRIES = 5
+
+_events = []
+_wakeup = threading.Condition()
+_flush_lock = threading.Lock()
+_start_lock = threading.Lock()
+_flusher = None
+
+
+def entry_hash(prev_hash, seq, created_at, action, actor_id, subject, data):
+    """SHA-256 linking one entry to ``prev_hash``."""
+    body = json.dumps([seq, created_at.isoformat(), action, actor_id, subject, data],
+                      sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f'{prev_hash}{body}'.encode()).hexdigest()
+
+
+def head():
+    """(seq, hash) of the newest entry, or (0, GENESIS) for an empty log."""
+    return AuditEntry.objects.order_by('-seq').values_list('seq', 'hash').first() or (0, GENESIS)
+
+
+# ─── Recording ──────────────────────────────────────────────────────
+def record(action, actor, subject, **data):
+    """Audit one event, e.g. ``record('deposit', user, 'account:42', amount='10.00')``."""
+    record_many([(action, actor, subject, data)])
+
+
+def record_many(events, using=DEFAULT_DB_ALIAS):
+    """Audit ``(action, actor, subject, data)`` tuples once ``using``'s transaction commits."""
+    now = timezone.now()
+    events = [(now, action, getattr(actor, 'id', actor), subject, data)
+              for action, actor, subject, data in events]
+    transaction.on_commit(lambda: _append(events), using=using)
+
+
+def posting(action, actor, txn, **data):
+    """The ``record_many`` event for a posted Transaction."""
+    return (action, actor, f'account:{txn.account_id}', {
+        'amount': txn.amount, 'balance_after': txn.balance_after,
+        'reference_id': txn.reference_id, 'transaction_id': txn.id, **data,
+    })
+
+
+def _append(events):
+    with _wakeup:
+        _events.extend(events)
+        full = len(_events) >= settings.AUDIT_BATCH_SIZE
+        if full:
+            _wakeup.notify()
+    if settings.AUDIT_FLUSH_SECONDS is None:
+        if full:
+            flush()
+    else:
+        _ensure_flusher()
+
+
+# ─── Flushing ───────────────────────────────────────────────────────
+def flush():
+    """Chain and write every buffered event; returns how many were written."""
+    with _flush_lock:
+        with _wakeup:
+            events = _events[:]
+            _events.clear()
+        if not events:
+            return 0
+        try:
+            _write(events)
+        except Exception:
+            with _wakeup:
+                _events[:0] = events
+            raise
+        return len(events)
+
+
+def _write(events):
+    # Normalise data the way JSONField will hand it back to the verifier.
+    events = [(created_at, action, actor_id, subject, json.loads(json.dumps(data, cls=DjangoJSONEncoder)))
+              for created_at, action, actor_id, subject, data in events]
+    for attempt in range(MAX_RETRIES):
+        try:
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                seq, prev_hash = head()
+                entries = []
+                for created_at, action, actor_id, subject, data in events:
+                    seq += 1
+                    digest = entry_hash(prev_hash, seq, created_at, action, actor_id, subject, data)
+                    entries.append(AuditEntry(
+                        seq=seq, action=action, actor_id=actor_id, subject=subject, data=data,
+                        created_at=created_at, prev_hash=prev_hash, hash=digest,
+                    ))
+                    prev_hash = digest
+                AuditEntry.objects.bulk_create(entries, batch_size=1000)
+            return
+        except IntegrityError:
+            # Another process extended the chain first; re-chain onto its head.
+            if attempt == MAX_RETRIES - 1:
+                raise
+
+
+def _run():
+    while True:
+        with _wakeup:
+            if len(_events) < settings.AUDIT_BATCH_SIZE:
+                _wakeup.wait(timeout=settings.AUDIT_FLUSH_SECONDS)
+        try:
+            close_old_connections()
+            flush()
+        except Exception:
+            logger.exception('Audit flush failed; retrying')
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _start_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run, name='audit-flusher', daemon=True)
+            _flusher.start()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception('Audit events lost at exit')
+
+
+def _reset_in_child():
+    # A forked worker starts with an empty buffer and no flusher of its own.
+    global _flusher, _wakeup, _flush_lock, _start_lock
+    _events.clear()
+    _wakeup, _flush_lock, _start_lock = threading.Condition(), threading.Lock(), threading.Lock()
+    _flusher = None
+
+
+atexit.register(_flush_at_exit)
+os.register_at_fork(after_in_child=_reset_in_child)
+
+
+# ─── Verification ───────────────────────────────────────────────────
+def verify_range(bounds):
+    """
+    Check entries ``first..last`` (by seq); returns (entries checked, problems).
+
+    Module-level so batch.run_chunks can run ranges in worker processes.
+    The entry before ``first`` is read too, to check the first link.
+    """
+    first, last = bounds
+    rows = (AuditEntry.objects.filter(seq__gte=first - 1, seq__lte=last).order_by('seq')
+            .values_list('seq', 'created_at', 'action', 'actor_id', 'subject', 'data', 'prev_hash', 'hash'))
+    problems = []
+    expected, prev = first, (GENESIS if first == 1 else None)
+    for seq, created_at, action, actor_id, subject, data, prev_hash, digest in rows.iterator(chunk_size=2000):
+        if seq < first:
+            prev = digest
+            continue
+        if seq != expected:
+            problems.append({'seq': expected, 'problem': f'entries {expected}-{seq - 1} missing'})
+            prev = None
+        if prev is not None and prev_hash != prev:
+            problems.append({'seq': seq, 'problem': 'prev_hash does not match the previous entry'})
+        if entry_hash(prev_hash, seq, created_at, action, actor_id, subject, data) != digest:
+            problems.append({'seq': seq, 'problem': 'hash does not match the entry'})
+        expected, prev = seq + 1, digest
+    if expected <= last:
+        problems.append({'seq': expected, 'problem': f'entries {expected}-{last} missing'})
+    return last - first + 1, problems
@@ -0,0 +1,30 @@
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from . import revocation
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """Stock JWT authentication that also refuses tokens issued before a 'log out everywhere'."""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocation.logged_out(token):
+            raise InvalidToken('Token has been revoked.')
+        return token
+
+
+class BatchSubrequestAuthentication(BaseAuthentication):
+    """
+    Sub-requests built by the batch view carry the (user, auth) the outer
+    request was authenticated with. Clients cannot set the attribute, so
+    every other request falls through to JWT.
+    """
+
+    def authenticate(self, request):
+        return getattr(request._request, 'batch_auth', None)
+
+    def authenticate_header(self, request):
+        # DRF asks the first authenticator: keep 401 + WWW-Authenticate for JWT.
+        return JWTAuthentication().authenticate_header(request)
@@ -0,0 +1,49 @@
+"""
+Chunked batch execution over a forked process pool, for management commands
+that sweep every account (interest accrual, ledger verification).
+
+Each worker process opens its own DB connection: the parent closes its
+connections before forking and every worker closes whatever it inherited,
+so no socket is ever shared across processes.
+"""
+import multiprocessing
+from functools import partial
+
+from django.db import connection, connections
+
+from . import sharding
+
+
+def default_workers():
+    """4 processes, or 1 on SQLite (single writer, and in-memory DBs are per-process)."""
+    return 1 if connection.vendor == 'sqlite' else 4
+
+
+def chunked(ids, size):
+    """Split a list into lists of at most ``size`` items."""
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def _close_connections():
+    connections.close_all()
+
+
+def _routed(fn, alias, chunk):
+    with sharding.use(alias):
+        return fn(chunk)
+
+
+def run_chunks(fn, chunks, workers=1):
+    """
+    Yield ``fn(chunk)`` for every chunk, in completion order.
+
+    ``fn`` must be a module-level function (it is pickled by reference).
+    With ``workers`` <= 1 everything runs in this process. Workers run on
+    the caller's ledger database (see sharding.py).
+    """
+    if workers <= 1:
+        yield from map(fn, chunks)
+        return
+    connections.close_all()
+    with multiprocessing.get_context('fork').Pool(workers, initializer=_close_connections) as pool:
+        yield from pool.imap_unordered(partial(_routed, fn, sharding.db()), chunks)
@@ -0,0 +1,26 @@
+"""Streaming CSV responses shared by the admin export action and the statement export."""
+import csv
+
+from django.http import StreamingHttpResponse
+
+
+class _Echo:
+    """File-like object whose write() just returns the line, for csv.writer streaming."""
+    def write(self, value):
+        return value
+
+
+def _with_header(header, rows):
+    yield header
+    yield from rows
+
+
+def stream_csv(header, rows, filename):
+    """Stream ``rows`` (an iterable of sequences) as a CSV attachment."""
+    writer = csv.writer(_Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in _with_header(header, rows)),
+        content_type='text/csv',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,199 @@
+"""
+Read-only fast serializers for list endpoints.
+
+Each class mirrors one of the ModelSerializers in serializers.py but works
+on ``values_list()`` tuples instead of model instances: no model
+construction, no per-field ``to_representation`` calls, and choice labels
+come from precomputed dicts. The JSON shape is identical to the
+corresponding ModelSerializer.
+"""
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .fields import CENTS
+from .models import Account, ServiceRequest, StandingInstruction
+
+
+def _decimal(value):
+    """Match DRF DecimalField output: exact string at 2 decimal places."""
+    return None if value is None else '{:f}'.format(Decimal(value).quantize(CENTS))
+
+
+class ValuesSerializer:
+    """Base class: ``lookups`` feed values_list(), ``to_representation`` maps a row."""
+    lookups = ()
+
+    def __init__(self):
+        self.tz = timezone.get_current_timezone()
+
+    def values(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def datetime(self, value):
+        """Match DRF DateTimeField: current timezone, ISO-8601, 'Z' for UTC."""
+        if value is None:
+            return None
+        value = value.astimezone(self.tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class UserValuesSerializer(ValuesSerializer):
+    """Fast equivalent of UserSerializer."""
+    lookups = ('id', 'username', 'email', 'first_name', 'last_name', 'role',
+               'phone', 'address', 'is_active', 'date_joined', 'created_by')
+
+    def to_representation(self, row):
+        (pk, username, email, first_name, last_name, role,
+         phone, address, is_active, date_joined, created_by) = row
+        return {
+            'id': pk,
+            'username': username,
+            'email': email,
+            'first_name': first_name,
+            'last_name': last_name,
+            'full_name': f"{first_name} {last_name}".strip() or username,
+            'role': role,
+            'phone': phone,
+            'address': address,
+            'is_active': is_active,
+            'date_joined': self.datetime(date_joined),
+            'created_by': created_by,
+        }
+
+
+class PortfolioValuesSerializer(UserValuesSerializer):
+    """UserSerializer shape plus the per-customer summary annotations."""
+    lookups = UserValuesSerializer.lookups + (
+        'account_count', 'total_balance', 'last_transaction_at', 'pending_services',
+    )
+
+    def to_representation(self, row):
+        data = super().to_representation(row[:-4])
+        account_count, total_balance, last_transaction_at, pending_services = row[-4:]
+        data['account_count'] = account_count
+        data['total_balance'] = _decimal(total_balance)
+        data['last_transaction_at'] = self.datetime(last_transaction_at)
+        data['pending_services'] = pending_services
+        return data
+
+
+class AccountValuesSerializer(ValuesSerializer):
+    """Fast equivalent of AccountSerializer (balance includes hot-account slot credits)."""
+    lookups = ('id', 'account_number', 'account_type', 'live_balance',
+               'is_active', 'created_at')
+    ACCOUNT_TYPE_DISPLAY = dict(Account.ACCOUNT_TYPES)
+
+    def values(self, queryset):
+        return queryset.with_live_balance().values_list(*self.lookups)
+
+    def to_representation(self, row):
+        pk, account_number, account_type, balance, is_active, created_at = row
+        return {
+            'id': pk,
+            'account_number': account_number,
+            'account_type': account_type,
+            'account_type_display': self.ACCOUNT_TYPE_DISPLAY.get(account_type, account_type),
+            'balance': _decimal(balance),
+            'is_active': is_active,
+            'created_at': self.datetime(created_at),
+        }
+
+
+class TransactionValuesSerializer(ValuesSerializer):
+    """Fast equivalent of TransactionSerializer."""
+    lookups = ('id', 'account__account_number', 'transaction_type', 'amount',
+               'balance_after', 'description', 'reference_id', 'timestamp')
+
+    def to_representation(self, row):
+        (pk, account_number, transaction_type, amount,
+         balance_after, description, reference_id, ts) = row
+        return {
+            'id': pk,
+            'account_number': account_number,
+            'transaction_type': transaction_type,
+            'amount': _decimal(amount),
+            'balance_after': _decimal(balance_after),
+            'description': description,
+            'reference_id': reference_id,
+            'timestamp': self.datetime(ts),
+        }
+
+
+class ServiceRequestValuesSerializer(ValuesSerializer):
+    """Fast equivalent of ServiceRequestSerializer."""
+    lookups = ('id', 'service_type', 'status', 'remarks', 'created_at', 'updated_at')
+    SERVICE_TYPE_DISPLAY = dict(ServiceRequest.SERVICE_TYPES)
+    STATUS_DISPLAY = dict(ServiceRequest.STATUS_CHOICES)
+
+    def to_representation(self, row):
+        pk, service_type, status, remarks, created_at, updated_at = row
+        return {
+            'id': pk,
+            'service_type': service_type,
+            'service_type_display': self.SERVICE_TYPE_DISPLAY.get(service_type, service_type),
+            'status': status,
+            'status_display': self.STATUS_DISPLAY.get(status, status),
+            'remarks': remarks,
+            'created_at': self.datetime(created_at),
+            'updated_at': self.datetime(updated_at),
+        }
+
+
+class QueueItemValuesSerializer(ServiceRequestValuesSerializer):
+    """ServiceRequestSerializer shape plus the customer and claim details."""
+    lookups = ServiceRequestValuesSerializer.lookups + (
+        'user_id', 'user__username', 'assigned_to_id', 'claimed_at',
+    )
+
+    def to_representation(self, row):
+        data = super().to_representation(row[:-4])
+        user_id, username, assigned_to, claimed_at = row[-4:]
+        data['customer_id'] = user_id
+        data['customer_username'] = username
+        data['assigned_to'] = assigned_to
+        data['claimed_at'] = self.datetime(claimed_at)
+        return data
+
+
+class StandingInstructionValuesSerializer(ValuesSerializer):
+    """Fast equivalent of StandingInstructionSerializer."""
+    lookups = ('id', 'account_id', 'account__account_number', 'kind', 'destination_id',
+               'destination__account_number', 'amount', 'description', 'frequency',
+               'start_date', 'end_date', 'next_run', 'is_active', 'last_run_at',
+               'last_status', 'created_at')
+    KIND_DISPLAY = dict(StandingInstruction.KIND_CHOICES)
+    FREQUENCY_DISPLAY = dict(StandingInstruction.FREQUENCY_CHOICES)
+
+    def to_representation(self, row):
+        (pk, account_id, account_number, kind, destination_id, destination_number, amount,
+         description, frequency, start_date, end_date, next_run, is_active, last_run_at,
+         last_status, created_at) = row
+        return {
+            'id': pk,
+            'account': account_id,
+            'account_number': account_number,
+            'kind': kind,
+            'kind_display': self.KIND_DISPLAY.get(kind, kind),
+            'destination': destination_id,
+            'destination_number': destination_number,
+            'amount': _decimal(amount),
+            'description': description,
+            'frequency': frequency,
+            'frequency_display': self.FREQUENCY_DISPLAY.get(frequency, frequency),
+            'start_date': start_date.isoformat(),
+            'end_date': end_date and end_date.isoformat(),
+            'next_run': next_run.isoformat(),
+            'is_active': is_active,
+            'last_run_at': self.datetime(last_run_at),
+            'last_status': last_status,
+            'created_at': self.datetime(created_at),
+        }
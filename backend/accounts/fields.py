@@ -0,0 +1,62 @@
+"""
+Money stored as integer paise.
+
+PaiseField behaves like a DecimalField(decimal_places=2) everywhere in
+Python — model attributes, forms, DRF ModelSerializers and aggregates all
+see exact 2-place Decimals — but the column is a BIGINT holding the amount
+in paise. Sums and comparisons run on integers in the database, and the
+API's decimal strings are unchanged.
+
+Values with more than two decimal places are rejected rather than rounded.
+Expressions that mix a PaiseField column with a Python amount must wrap
+the amount with ``paise()`` so it is sent as paise:
+
+    F('balance') + paise(amount)
+"""
+from decimal import Decimal
+
+from django.db import models
+
+CENTS = Decimal('0.01')
+
+
+class PaiseField(models.DecimalField):
+    """DecimalField(max_digits, 2) stored as a BIGINT number of paise."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_digits', 15)
+        kwargs['decimal_places'] = 2
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['decimal_places']
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        # Column type, and keeps backends from adding NUMERIC casts/converters.
+        return 'BigIntegerField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return Decimal(int(value)).scaleb(-2)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        if value != value.quantize(CENTS):
+            raise ValueError(f'{value} has more than 2 decimal places.')
+        return int(value.scaleb(2))
+
+    def get_db_prep_save(self, value, connection):
+        if hasattr(value, 'as_sql'):
+            return value
+        return self.get_db_prep_value(value, connection)
+
+
+def paise(amount):
+    """``amount`` as an expression value for PaiseField columns."""
+    return models.Value(amount, output_field=PaiseField())
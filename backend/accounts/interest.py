@@ -0,0 +1,163 @@
+"""
+Monthly interest accrual for savings accounts.
+
+Interest is computed on the end-of-day balance for every day of the period
+(local TIME_ZONE days), reconstructed from the Transaction ledger:
+
+  opening balance = current balance - net of every posting since period start
+  daily balance   = opening balance + net of postings up to the end of that day
+
+  interest = sum(daily balances) * annual rate / 100 / days in year
+
+rounded half-up to the paisa. All arithmetic is Decimal.
+
+Accounts are processed in chunks; each chunk is one DB transaction that
+locks its accounts (canonical order, see ledger.lock_accounts), posts the
+'Interest Credit' rows with bulk_create and records an InterestAccrual row
+per account. The unique (account, period_start) constraint makes a period
+idempotent: a re-run, or a run resumed after a crash, skips accounts that
+already have their accrual row.
+"""
+import calendar
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import batch, ledger, sharding
+from .fields import CENTS
+from .models import Account, InterestAccrual, Transaction
+
+DESCRIPTION = 'Interest Credit'
+
+
+def default_rate():
+    return Decimal(str(getattr(settings, 'SAVINGS_INTEREST_RATE', '0')))
+
+
+def period_bounds(period_start):
+    """First day of the period and first day of the next one."""
+    days = calendar.monthrange(period_start.year, period_start.month)[1]
+    return period_start, period_start + timedelta(days=days)
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def pending_account_ids(period_start):
+    """Active savings accounts opened before period end with no accrual for the period yet."""
+    _, end = period_bounds(period_start)
+    return list(
+        Account.objects.filter(
+            account_type='savings', is_active=True, created_at__lt=_local_midnight(end),
+        ).exclude(
+            interest_accruals__period_start=period_start,
+        ).order_by('id').values_list('id', flat=True)
+    )
+
+
+def _daily_balance_sum(account, start, end, deltas):
+    """
+    Sum of end-of-day balances over [start, end) for ``account``.
+
+    ``deltas`` maps local date -> net posted amount on that date for every
+    posting since ``start`` (including postings after ``end``).
+    """
+    opening = account.balance - sum(deltas.values(), Decimal('0'))
+    first_day = max(start, timezone.localtime(account.created_at).date())
+    running = opening + sum(
+        (amount for day, amount in deltas.items() if day < first_day), Decimal('0')
+    )
+    total = Decimal('0')
+    day = first_day
+    while day < end:
+        running += deltas.get(day, 0)
+        if running > 0:
+            total += running
+        day += timedelta(days=1)
+    return total
+
+
+def accrue_chunk(account_ids, period_start, rate):
+    """
+    Accrue and post one period's interest for ``account_ids`` in one transaction.
+    Returns (accounts accrued, total interest posted).
+    """
+    start, end = period_bounds(period_start)
+    days_in_year = Decimal(366 if calendar.isleap(start.year) else 365)
+
+    with transaction.atomic(using=sharding.db()):
+        accounts = ledger.lock_accounts(account_ids, strict=False)
+        # Re-check under the lock so an overlapping run cannot double-credit.
+        done = set(InterestAccrual.objects.filter(
+            account_id__in=accounts, period_start=start,
+        ).values_list('account_id', flat=True))
+        for account_id in done:
+            del accounts[account_id]
+        if not accounts:
+            return 0, Decimal('0')
+
+        deltas = defaultdict(lambda: defaultdict(Decimal))
+        rows = Transaction.objects.filter(
+            account_id__in=accounts, timestamp__gte=_local_midnight(start),
+        ).order_by().values_list('account_id', 'transaction_type', 'amount', 'timestamp')
+        for account_id, transaction_type, amount, ts in rows.iterator(chunk_size=5000):
+            day = timezone.localtime(ts).date()
+            deltas[account_id][day] += amount if transaction_type == 'credit' else -amount
+
+        amounts = {}
+        for account_id, account in accounts.items():
+            total = _daily_balance_sum(account, start, end, deltas[account_id])
+            amounts[account_id] = (total * rate / 100 / days_in_year).quantize(
+                CENTS, rounding=ROUND_HALF_UP)
+
+        txns = ledger.credit_locked_accounts(accounts, amounts, DESCRIPTION)
+        InterestAccrual.objects.bulk_create(
+            [InterestAccrual(account_id=account_id, period_start=start,
+                             interest=interest, transaction=txns.get(account_id))
+             for account_id, interest in amounts.items()],
+            batch_size=1000,
+        )
+    return len(amounts), sum(amounts.values(), Decimal('0'))
+
+
+def _run_chunk(args):
+    return accrue_chunk(*args)
+
+
+def run_period(period_start, rate=None, workers=1, chunk_size=1000, progress=None):
+    """
+    Accrue ``period_start``'s month for every pending savings account.
+
+    With ``workers`` > 1 chunks are spread over a process pool (see
+    batch.py). Ledger shards are processed one after another.
+    ``progress(accounts, interest)`` is called after every committed chunk.
+    Returns (accounts, total interest).
+    """
+    rate = default_rate() if rate is None else rate
+    accrued, total = 0, Decimal('0')
+    for alias in sharding.aliases():
+        with sharding.use(alias):
+            ids = pending_account_ids(period_start)
+            chunks = [(chunk, period_start, rate) for chunk in batch.chunked(ids, chunk_size)]
+            for count, interest in batch.run_chunks(_run_chunk, chunks, workers):
+                accrued, total = accrued + count, total + interest
+                if progress:
+                    progress(count, interest)
+    return accrued, total
+
+
+def previous_period(today=None):
+    """First day of the last complete month (local time)."""
+    today = today or timezone.localdate()
+    return (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def parse_period(value):
+    """'YYYY-MM' -> first day of that month."""
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
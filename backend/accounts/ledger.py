@@ -0,0 +1,383 @@
+"""
+Posting engine — the one place that moves money.
+
+Every balance change (deposit, withdrawal, transfer) goes through here so
+that it happens under a row lock, inside a single DB transaction, with the
+matching Transaction rows written in the same transaction.
+
+Deadlock avoidance: all accounts touched by a posting are locked with one
+``SELECT ... FOR NO KEY UPDATE ... ORDER BY id``, so concurrent postings
+always acquire locks in the same (canonical) order. NO KEY UPDATE (only
+the balance changes) does not block the FOR KEY SHARE lock PostgreSQL's
+foreign key check takes on the account when a Transaction row commits.
+
+Hot accounts (``Account.balance_slots`` > 0) take credits without the
+account row lock: each credit increments one randomly chosen BalanceSlot,
+so concurrent credits only collide when they pick the same slot. A slot
+credit holding its slot therefore never waits on a debit holding the
+account row, which would deadlock with the debit waiting for the slot. If
+set_balance_slots() removed the slot meanwhile, the credit takes the
+locked path instead. Debits
+and transfers lock the account row and then its slots (account order,
+then slot order), fold the slots into ``Account.balance`` and proceed on
+that consistent total. For slot credits ``balance_after`` is the live
+balance as seen by the posting's own transaction.
+
+Every posting also writes a 'transaction.posted' OutboxEvent in the same
+atomic block (see outbox.py), queues a live update for the account
+owner's open streams (see live.py) and pushes its rows into the owner's
+recent-transactions cache on commit (see recent.py).
+
+Debits are checked against the per-account velocity and daily withdrawal
+limits, and counted, while the accounts are locked (see limits.py).
+
+Postings run on the ledger database of the current context (see
+sharding.py). A transfer to a customer on another shard posts the debit
+and a 'transfer.credit' outbox event in one transaction; the outbox worker
+then posts the credit on the destination's shard, or refunds the source if
+the destination account is gone.
+"""
+import random
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import F, Sum
+
+from . import audit, limits, live, outbox, recent, sharding
+from .fields import paise
+from .models import Account, BalanceSlot, Transaction, User, generate_reference_id
+
+
+# Transfers to an account on another shard also carry its owner and number.
+Transfer = namedtuple('Transfer', ['source_id', 'destination_id', 'amount', 'description',
+                                   'destination_user_id', 'destination_number'],
+                      defaults=[None, None])
+
+
+class LedgerError(Exception):
+    """A posting was rejected; ``status`` is the HTTP status to report."""
+    status = 400
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class AccountNotFound(LedgerError):
+    status = 404
+
+
+class InsufficientFunds(LedgerError):
+    pass
+
+
+class LimitExceeded(LedgerError):
+    status = 429
+
+
+def lock_accounts(account_ids, strict=True):
+    """
+    Lock active accounts in canonical (id) order and return them keyed by id.
+
+    Hot accounts also get their slots locked and folded into ``balance``.
+    Call inside ``transaction.atomic()``. With ``strict`` a missing or
+    inactive account raises AccountNotFound; otherwise it is left out.
+    """
+    accounts = {
+        acc.id: acc
+        for acc in Account.objects.select_for_update(no_key=True)
+        .filter(id__in=set(account_ids), is_active=True)
+        .order_by('id')
+    }
+    if strict and len(accounts) != len(set(account_ids)):
+        raise AccountNotFound('Account not found or not active.')
+    for account in accounts.values():
+        if account.balance_slots:
+            _consolidate(account)
+    return accounts
+
+
+@contextmanager
+def _posting():
+    """
+    atomic() on the ledger database, yielding the reservations list that
+    _check_limits() fills. Debits reserved in the outermost block are
+    released if it rolls back; in a caller's transaction (None) they are
+    counted on commit instead.
+    """
+    using = sharding.db()
+    reserved = None if transaction.get_connection(using).in_atomic_block else []
+    try:
+        with transaction.atomic(using=using):
+            yield reserved
+    except BaseException:
+        for now, amounts in reserved or ():
+            limits.release_debits(amounts, now)
+        raise
+
+
+def _check_limits(amounts, reserved):
+    """Enforce debit limits for ``amounts`` (account id -> total) and count them."""
+    if reserved is None:
+        refusal = limits.check_debits(amounts)
+        if not refusal:
+            limits.record_debits(amounts)
+    else:
+        now = time.time()
+        refusal = limits.reserve_debits(amounts, now)
+        if not refusal:
+            reserved.append((now, amounts))
+    if refusal:
+        raise LimitExceeded(refusal)
+
+
+def _publish(txns):
+    """Outbox events, live updates and cached recent rows for freshly posted ``txns``."""
+    outbox.publish_many('transaction.posted', [outbox.transaction_payload(t) for t in txns])
+    live.notify_postings(txns)
+    recent.record(txns)
+
+
+def _consolidate(account):
+    """
+    Lock a hot account's slots and fold them into account.balance (row
+    already locked). The folded balance is saved here, with the slot reset,
+    so callers that end up not posting to the account lose nothing.
+    """
+    slots = list(BalanceSlot.objects.select_for_update().filter(account=account).order_by('slot'))
+    pending = sum(slot.balance for slot in slots)
+    if pending:
+        account.balance += pending
+        BalanceSlot.objects.filter(account=account).update(balance=0)
+        account.save(update_fields=['balance'])
+
+
+def _post_slot_credit(account, amount, description, reference_id=None):
+    """
+    Credit a hot account through one random slot, without locking the account
+    row. Returns None, posting nothing, if the slot no longer exists.
+    """
+    updated = BalanceSlot.objects.filter(
+        account=account, slot=random.randrange(account.balance_slots)
+    ).update(balance=F('balance') + paise(amount))
+    if not updated:
+        return None  # slots changed by set_balance_slots() since ``account`` was read
+    pending = account.slots.aggregate(total=Sum('balance'))['total'] or 0
+    base = Account.objects.values_list('balance', flat=True).get(pk=account.pk)
+    txn = Transaction.objects.create(
+        account=account,
+        transaction_type='credit',
+        amount=amount,
+        balance_after=base + pending,
+        description=description,
+        reference_id=reference_id,
+    )
+    _publish([txn])
+    return txn
+
+
+def post_entry(account_id, transaction_type, amount, description, owner=None, reference_id=None):
+    """
+    Credit or debit a single account. ``owner`` restricts the posting to
+    that user's accounts. Returns the Transaction; its ``balance_after`` is
+    the new balance.
+    """
+    with _posting() as reserved:
+        if transaction_type == 'credit':
+            account = Account.objects.filter(id=account_id, is_active=True).first()
+            if account is None or (owner is not None and account.user_id != owner.id):
+                raise AccountNotFound('Account not found or not active.')
+            if account.balance_slots:
+                txn = _post_slot_credit(account, amount, description, reference_id)
+                if txn is not None:
+                    return txn
+
+        account = lock_accounts([account_id])[account_id]
+        if owner is not None and account.user_id != owner.id:
+            raise AccountNotFound('Account not found or not active.')
+
+        if transaction_type == 'debit':
+            if account.balance < amount:
+                raise InsufficientFunds(f'Insufficient balance. Available: ₹{account.balance}')
+            _check_limits({account.id: amount}, reserved)
+            account.balance -= amount
+        else:
+            account.balance += amount
+        account.save(update_fields=['balance'])
+
+        txn = Transaction.objects.create(
+            account=account,
+            transaction_type=transaction_type,
+            amount=amount,
+            balance_after=account.balance,
+            description=description,
+            reference_id=reference_id,
+        )
+        _publish([txn])
+    return txn
+
+
+def execute_transfers(transfers, owner=None):
+    """
+    Post a batch of Transfers atomically: all succeed or none do.
+
+    Each transfer writes a debit row on the source and a credit row on the
+    destination. ``owner`` requires every source account to belong to that
+    user. Returns the Transaction rows, debit then credit per transfer;
+    credits to another shard are returned unsaved and posted by the outbox
+    worker.
+    """
+    transfers = list(transfers)
+    if not transfers:
+        return []
+
+    with _posting() as reserved:
+        accounts = lock_accounts(
+            [t.source_id for t in transfers]
+            + [t.destination_id for t in transfers if t.destination_user_id is None]
+        )
+        txns, posted, remote, debits = [], [], [], {}
+        for t in transfers:
+            source = accounts[t.source_id]
+            destination = accounts[t.destination_id] if t.destination_user_id is None else None
+            if owner is not None and source.user_id != owner.id:
+                raise AccountNotFound('Account not found or not active.')
+            if destination is not None and source.id == destination.id:
+                raise LedgerError('Cannot transfer to the same account.')
+            if source.balance < t.amount:
+                raise InsufficientFunds(
+                    f'Insufficient balance in {source.account_number}. '
+                    f'Available: ₹{source.balance}'
+                )
+            source.balance -= t.amount
+            debits[source.id] = debits.get(source.id, 0) + t.amount
+            destination_number = destination.account_number if destination else t.destination_number
+            debit = Transaction(
+                account=source, transaction_type='debit', amount=t.amount,
+                balance_after=source.balance, reference_id=generate_reference_id(),
+                description=f'{t.description} to {destination_number}'[:255],
+            )
+            credit = Transaction(
+                account_id=t.destination_id, transaction_type='credit', amount=t.amount,
+                reference_id=generate_reference_id(),
+                description=f'{t.description} from {source.account_number}'[:255],
+            )
+            if destination is not None:
+                destination.balance += t.amount
+                credit.account, credit.balance_after = destination, destination.balance
+                posted += [debit, credit]
+            else:
+                posted.append(debit)
+                remote.append(_remote_credit(t, source, debit, credit))
+            txns += [debit, credit]
+
+        _check_limits(debits, reserved)
+        Account.objects.bulk_update(accounts.values(), ['balance'])
+        Transaction.objects.bulk_create(posted)
+        _publish(posted)
+        outbox.publish_many('transfer.credit', remote)
+    return txns
+
+
+def _remote_credit(transfer, source, debit, credit):
+    """'transfer.credit' payload: the credit half of a transfer to another shard."""
+    return {
+        'source_id': source.id,
+        'destination_id': transfer.destination_id,
+        'destination_user_id': transfer.destination_user_id,
+        'amount': str(transfer.amount),
+        'description': credit.description,
+        'reference_id': credit.reference_id,
+        'reversal_description': f'Reversal: {debit.description}'[:255],
+        'reversal_reference_id': generate_reference_id(),
+    }
+
+
+@outbox.register('transfer.credit')
+def deliver_transfer(payload):
+    """
+    Post a cross-shard credit on the destination's current shard (idempotent
+    by reference id). If the destination account is closed, refund the
+    source, which is on the shard this event is delivered from.
+    """
+    amount = Decimal(payload['amount'])
+    owner = User.objects.filter(pk=payload['destination_user_id']).first()
+    if owner is not None:
+        shard = sharding.shard_of(owner)
+        with sharding.use(shard):
+            if Transaction.objects.filter(reference_id=payload['reference_id']).exists():
+                return
+            try:
+                credit = post_entry(payload['destination_id'], 'credit', amount,
+                                    payload['description'], reference_id=payload['reference_id'])
+                audit.record_many([audit.posting('transfer.credit', None, credit)])
+                return
+            except AccountNotFound:
+                if sharding.shard_of(User.objects.get(pk=owner.pk)) != shard:
+                    raise  # moved by rebalance_shards meanwhile; retried later
+    if not Transaction.objects.filter(reference_id=payload['reversal_reference_id']).exists():
+        refund = post_entry(payload['source_id'], 'credit', amount, payload['reversal_description'],
+                            reference_id=payload['reversal_reference_id'])
+        audit.record_many([audit.posting('transfer.reversal', None, refund)])
+
+
+def _save_balances(accounts):
+    """Write ``accounts``' balances with one executemany (bulk_update's CASE is slow at scale)."""
+    connection = connections[sharding.db()]
+    field = Account._meta.get_field('balance')
+    quote = connection.ops.quote_name
+    sql = (f'UPDATE {quote(Account._meta.db_table)} SET {quote(field.column)} = %s '
+           f'WHERE {quote(Account._meta.pk.column)} = %s')
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(field.get_db_prep_save(account.balance, connection), account.pk)
+                                 for account in accounts])
+
+
+def post_locked_entries(accounts, entries):
+    """
+    Bulk-post ``(account_id, transaction_type, amount, description)`` entries,
+    in order, to accounts already returned by lock_accounts() in this atomic
+    block. Balances are not checked. Returns the Transactions in entry order.
+    """
+    txns = []
+    for account_id, transaction_type, amount, description in entries:
+        account = accounts[account_id]
+        account.balance += amount if transaction_type == 'credit' else -amount
+        txns.append(Transaction(
+            account=account, transaction_type=transaction_type, amount=amount,
+            balance_after=account.balance, reference_id=generate_reference_id(),
+            description=description,
+        ))
+    _save_balances({t.account_id: t.account for t in txns}.values())
+    Transaction.objects.bulk_create(txns, batch_size=1000)
+    _publish(txns)
+    return txns
+
+
+def credit_locked_accounts(accounts, amounts, description):
+    """
+    Bulk-credit accounts already returned by lock_accounts() in this atomic block.
+
+    ``amounts`` maps account id -> Decimal; zero amounts are skipped.
+    Returns the created Transactions keyed by account id.
+    """
+    amounts = {account_id: amount for account_id, amount in amounts.items() if amount > 0}
+    txns = post_locked_entries(
+        accounts, [(account_id, 'credit', amount, description) for account_id, amount in amounts.items()])
+    return dict(zip(amounts, txns))
+
+
+def set_balance_slots(account_id, slots):
+    """Switch an account to ``slots`` sub-balances (0 = ordinary single-row account)."""
+    with transaction.atomic(using=sharding.db()):
+        account = lock_accounts([account_id])[account_id]
+        BalanceSlot.objects.filter(account=account).delete()
+        BalanceSlot.objects.bulk_create(
+            [BalanceSlot(account=account, slot=n) for n in range(slots)]
+        )
+        account.balance_slots = slots
+        account.save(update_fields=['balance', 'balance_slots'])
+    return account
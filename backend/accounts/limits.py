@@ -0,0 +1,181 @@
+"""
+Per-account debit limits on sliding-window counters.
+
+Two limits apply to every debit the ledger posts (withdrawals and transfer
+sources):
+
+  velocity  at most DEBIT_VELOCITY_LIMIT debit postings per rolling minute
+            (a transfer batch counts once per source account)
+  daily     at most DAILY_WITHDRAWAL_LIMIT rupees debited per rolling 24 h
+
+Each window is split into buckets kept as integer counters in the
+LIMITS_CACHE cache (keyed by account and bucket number, expiring with the
+window). A check reads the window's buckets in one get_many() — the oldest
+bucket weighted by how much of it is still inside the window — so it costs
+the same however busy the account is.
+
+A posting whose transaction is the outermost one counts its debits while
+its accounts are still locked: reserve_debits() adds to the current bucket
+with the cache's atomic incr and only then re-reads the window, so two
+debits that race (on different processes, or one committing as the next
+takes the lock) each see the other and cannot overshoot together. The
+ledger releases the counts if the posting rolls back. Inside a caller's
+transaction, which may still roll back after the posting, the debits are
+checked there and counted once it commits.
+
+The counters are a guard, not the books: the ledger stays the source of
+truth. When an account's counters are missing (first debit, cache restart
+or eviction) they are seeded once from its recent Transaction rows.
+LocMemCache, the default, is per process; set REDIS_URL so all web
+processes share one set of counters.
+"""
+import time
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from . import sharding
+from .models import Transaction
+
+Window = namedtuple('Window', ['name', 'seconds', 'buckets'])
+
+VELOCITY = Window('velocity', 60, 6)
+DAILY = Window('daily', 24 * 3600, 24)
+
+
+def _cache():
+    return caches[settings.LIMITS_CACHE]
+
+
+def _bucket_seconds(window):
+    return window.seconds / window.buckets
+
+
+def _key(window, account_id, bucket):
+    return f'limits:{window.name}:{account_id}:{bucket}'
+
+
+def estimate(window, account_id, now=None):
+    """Sliding-window total for ``account_id`` at ``now`` (epoch seconds)."""
+    now = time.time() if now is None else now
+    size = _bucket_seconds(window)
+    current = int(now // size)
+    oldest = current - window.buckets
+    values = _cache().get_many([_key(window, account_id, b) for b in range(oldest, current + 1)])
+    total = sum(value for key, value in values.items()
+                if key != _key(window, account_id, oldest))
+    # Only the tail of the oldest bucket is still inside the window.
+    inside = 1 - (now - current * size) / size
+    return total + values.get(_key(window, account_id, oldest), 0) * inside
+
+
+def add(window, account_id, value, now=None):
+    """Add ``value`` to the current bucket of ``account_id``'s window."""
+    now = time.time() if now is None else now
+    key = _key(window, account_id, int(now // _bucket_seconds(window)))
+    cache = _cache()
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        # First posting in this bucket; add() loses to a concurrent creator.
+        if not cache.add(key, value, timeout=window.seconds + _bucket_seconds(window)):
+            cache.incr(key, value)
+
+
+def subtract(window, account_id, value, now):
+    """Take back ``value`` added to the bucket current at ``now``."""
+    try:
+        _cache().decr(_key(window, account_id, int(now // _bucket_seconds(window))), value)
+    except ValueError:
+        pass  # the bucket has expired
+
+
+def _seed(account_id):
+    """Load an account's counters from the ledger, once per daily window."""
+    if not _cache().add(f'limits:seeded:{account_id}', True, timeout=DAILY.seconds):
+        return
+    since = timezone.now() - timedelta(seconds=DAILY.seconds)
+    debits = Transaction.objects.filter(
+        account_id=account_id, transaction_type='debit', timestamp__gte=since,
+    ).values_list('amount', 'timestamp')
+    velocity_since = time.time() - VELOCITY.seconds
+    for amount, ts in debits:
+        ts = ts.timestamp()
+        add(DAILY, account_id, int(amount.scaleb(2)), now=ts)
+        if ts >= velocity_since:
+            add(VELOCITY, account_id, 1, now=ts)
+
+
+def _rupees(paise):
+    return Decimal(int(paise)).scaleb(-2)
+
+
+def _refusal(account_id, amount, counted):
+    """Why debiting ``amount`` breaks a limit, or None; ``counted``: the window already includes it."""
+    velocity_limit = settings.DEBIT_VELOCITY_LIMIT
+    daily_limit = settings.DAILY_WITHDRAWAL_LIMIT
+    pending = 0 if counted else 1
+    if velocity_limit is not None and estimate(VELOCITY, account_id) + pending > velocity_limit:
+        return f'Too many debits: at most {velocity_limit} per minute. Try again shortly.'
+    if daily_limit is not None:
+        limit = int(Decimal(daily_limit).scaleb(2))
+        value = int(amount.scaleb(2))
+        used = estimate(DAILY, account_id) - (value if counted else 0)
+        if used + value > limit:
+            available = _rupees(max(limit - used, 0))
+            return (f'Daily withdrawal limit of ₹{daily_limit} exceeded. '
+                    f'Available now: ₹{available:.2f}')
+    return None
+
+
+def check_debits(amounts):
+    """
+    Reason the debits in ``amounts`` (account id -> Decimal) would break a
+    limit, or None. Call with the accounts locked.
+    """
+    for account_id, amount in amounts.items():
+        _seed(account_id)
+        refusal = _refusal(account_id, amount, counted=False)
+        if refusal:
+            return refusal
+    return None
+
+
+def reserve_debits(amounts, now):
+    """
+    Count the debits in ``amounts`` in the buckets current at ``now``, then
+    check them. Returns the reason they break a limit, counting nothing, or
+    None. Call with the accounts locked; release_debits() undoes it.
+    """
+    counted = {}
+    for account_id, amount in amounts.items():
+        _seed(account_id)
+        add(VELOCITY, account_id, 1, now=now)
+        add(DAILY, account_id, int(amount.scaleb(2)), now=now)
+        counted[account_id] = amount
+        refusal = _refusal(account_id, amount, counted=True)
+        if refusal:
+            release_debits(counted, now)
+            return refusal
+    return None
+
+
+def release_debits(amounts, now):
+    """Uncount debits reserved at ``now`` whose posting rolled back."""
+    for account_id, amount in amounts.items():
+        subtract(VELOCITY, account_id, 1, now)
+        subtract(DAILY, account_id, int(amount.scaleb(2)), now)
+
+
+def record_debits(amounts):
+    """Count the debits in ``amounts`` once the posting's transaction commits."""
+    def apply():
+        for account_id, amount in amounts.items():
+            add(VELOCITY, account_id, 1)
+            add(DAILY, account_id, int(amount.scaleb(2)))
+    transaction.on_commit(apply, using=sharding.db())
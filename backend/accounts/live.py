@@ -0,0 +1,247 @@
+"""
+Live balance/transaction updates over server-sent events.
+
+Postings call ``notify_postings()`` inside their atomic block. On
+PostgreSQL that is a ``pg_notify`` on the ``ledger_events`` channel, which
+the server delivers only when the posting commits, to every web process.
+Each process runs one listener thread per ledger database (started with
+the first stream) that LISTENs on a dedicated connection and fans events
+out to the streams of that process. On other databases (local SQLite)
+events go straight to the in-process broker on commit, which is enough for
+``runserver``.
+
+Streams resume from ``Last-Event-ID``: missed transactions are replayed
+from the table first, so a reconnecting client only receives the delta.
+Transaction ids are assigned at INSERT, not at commit, so a posting with a
+lower id can commit after one the client already has; the replay therefore
+also re-sends the REPLAY_OVERLAP before the last event, and clients skip
+ids they have seen.
+
+Every open stream holds a server thread for up to MAX_STREAM_SECONDS, so a
+process serves at most LIVE_MAX_STREAMS of them (503 + Retry-After beyond
+that) and the remaining threads stay free for API requests. The cap is
+derived from GUNICORN_THREADS, the same setting the start commands pass as
+``--threads``.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+
+from . import sharding
+from .fast_serializers import TransactionValuesSerializer
+from .models import Transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'ledger_events'
+HEARTBEAT_SECONDS = 15
+# Streams end after this long; clients reconnect with Last-Event-ID. Keeps
+# long-lived responses from pinning a server thread indefinitely.
+MAX_STREAM_SECONDS = 300
+QUEUE_SIZE = 500
+REPLAY_LIMIT = 500
+# Postings that commit this long after their INSERT can still be missed on resume.
+REPLAY_OVERLAP = timedelta(seconds=60)
+RETRY_AFTER_SECONDS = 30
+
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+
+class Subscription:
+    """One open stream: a bounded queue plus a flag set when it overflowed."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+
+class Broker:
+    """In-process fan-out from user id to that user's open streams."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, user_id):
+        subscription = Subscription()
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self.lock:
+            streams = self.subscriptions.get(user_id)
+            if streams is not None:
+                streams.discard(subscription)
+                if not streams:
+                    del self.subscriptions[user_id]
+
+    def deliver(self, user_id, event):
+        with self.lock:
+            streams = list(self.subscriptions.get(user_id, ()))
+        for subscription in streams:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.overflowed = True
+
+
+broker = Broker()
+
+
+# ─── Publishing ─────────────────────────────────────────────────────
+def transaction_event(txn):
+    """Stream event for a posted Transaction (``account`` must be loaded)."""
+    account = txn.account
+    data = TransactionValuesSerializer().to_representation((
+        txn.id, account.account_number, txn.transaction_type, txn.amount,
+        txn.balance_after, txn.description, txn.reference_id, txn.timestamp,
+    ))
+    return {'user_id': account.user_id, 'id': txn.id, 'account_id': account.id,
+            'balance': data['balance_after'], 'transaction': data}
+
+
+def notify_postings(txns):
+    """Queue live events for ``txns``; call inside the posting's atomic block."""
+    events = [transaction_event(txn) for txn in txns]
+    alias = sharding.db()
+    if connections[alias].vendor == 'postgresql':
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                [CHANNEL, [json.dumps(event) for event in events]],
+            )
+    else:
+        transaction.on_commit(lambda: [broker.deliver(e['user_id'], e) for e in events], using=alias)
+
+
+# ─── Postgres listener ──────────────────────────────────────────────
+_listeners = {}
+_listener_lock = threading.Lock()
+
+
+def _listen_forever(alias):
+    while True:
+        db = connections.create_connection(alias)
+        try:
+            db.ensure_connection()
+            db.connection.execute(f'LISTEN {CHANNEL}')
+            for notify in db.connection.notifies():
+                event = json.loads(notify.payload)
+                broker.deliver(event['user_id'], event)
+        except Exception:
+            logger.exception('Live event listener lost its connection; reconnecting')
+            time.sleep(1)
+        finally:
+            db.close()
+
+
+def ensure_listener():
+    """Start this process's LISTEN threads once (PostgreSQL only)."""
+    with _listener_lock:
+        for alias in sharding.aliases():
+            if connections[alias].vendor != 'postgresql':
+                continue
+            listener = _listeners.get(alias)
+            if listener is None or not listener.is_alive():
+                listener = threading.Thread(target=_listen_forever, args=(alias,),
+                                            name=f'ledger-listener-{alias}', daemon=True)
+                listener.start()
+                _listeners[alias] = listener
+
+
+# ─── Streaming ──────────────────────────────────────────────────────
+def _format(event):
+    data = json.dumps({k: v for k, v in event.items() if k != 'user_id'})
+    return f"id: {event['id']}\nevent: transaction\ndata: {data}\n\n"
+
+
+def _replay(user_id, last_event_id):
+    """
+    Events for the user's transactions that may have committed after
+    ``last_event_id``: every later id, plus the REPLAY_OVERLAP before it.
+    """
+    txns = Transaction.objects.filter(account__user_id=user_id)
+    since = Q(id__gt=last_event_id)
+    anchor = txns.filter(id=last_event_id).values_list('timestamp', flat=True).first()
+    if anchor is not None:
+        since |= Q(timestamp__gte=anchor - REPLAY_OVERLAP)
+    txns = txns.filter(since).select_related('account').order_by('id')[:REPLAY_LIMIT]
+    return [transaction_event(txn) for txn in txns]
+
+
+class LiveStream:
+    """Response body holding one of the process's LIVE_MAX_STREAMS slots until closed."""
+
+    def __init__(self, frames):
+        self._frames = frames
+        self._released = False
+
+    def __iter__(self):
+        return self._frames
+
+    def close(self):
+        # Called by the server when the response ends, iterated or not.
+        global _open_streams
+        try:
+            self._frames.close()
+        finally:
+            with _streams_lock:
+                if not self._released:
+                    self._released = True
+                    _open_streams -= 1
+
+
+def open_stream(user_id, last_event_id=None):
+    """A LiveStream for ``user_id``, or None if this process already serves LIVE_MAX_STREAMS."""
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= settings.LIVE_MAX_STREAMS:
+            return None
+        _open_streams += 1
+    return LiveStream(sharding.bind(stream(user_id, last_event_id)))
+
+
+def stream(user_id, last_event_id=None):
+    """Yield SSE frames for ``user_id`` until MAX_STREAM_SECONDS have passed."""
+    ensure_listener()
+    # Subscribe before replaying so nothing committed in between is lost;
+    # ids already replayed are skipped below.
+    subscription = broker.subscribe(user_id)
+    try:
+        yield 'retry: 3000\n\n'
+        replayed = set()
+        if last_event_id is not None:
+            events = _replay(user_id, last_event_id)
+            for event in events:
+                replayed.add(event['id'])
+                yield _format(event)
+            if len(events) == REPLAY_LIMIT:
+                yield 'event: resync\ndata: {}\n\n'  # more missed than we replay
+        # Don't hold DB connections (auth, replay) for the life of the stream.
+        for alias in {DEFAULT_DB_ALIAS, sharding.db()}:
+            connections[alias].close()
+
+        deadline = time.monotonic() + MAX_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            if subscription.overflowed:
+                # Client fell too far behind: tell it to refetch instead.
+                subscription.overflowed = False
+                yield 'event: resync\ndata: {}\n\n'
+            try:
+                event = subscription.queue.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            if event['id'] not in replayed:
+                yield _format(event)
+    finally:
+        broker.unsubscribe(user_id, subscription)
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import archive, sharding
+
+# Interest accrual and incremental ledger verification read the last
+# couple of months straight from the table.
+MIN_RETENTION_DAYS = 90
+
+
+class Command(BaseCommand):
+    help = (
+        'Move transactions older than the retention window into compressed, '
+        'immutable per-account-month files (TRANSACTION_ARCHIVE_ROOT). '
+        'Safe to re-run; already archived months are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help='Keep this many days in the table (default: TRANSACTION_RETENTION_DAYS).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the account-months that would be archived.')
+
+    def handle(self, *args, **options):
+        days = options['retention_days']
+        if days is not None and days < MIN_RETENTION_DAYS:
+            raise CommandError(f'--retention-days must be at least {MIN_RETENTION_DAYS}.')
+        before = archive.cutoff_month(days)
+        if not options['dry_run']:
+            # The archived rows are deleted: never write them anywhere that may not survive a deploy.
+            root = settings.TRANSACTION_ARCHIVE_ROOT
+            if not root:
+                raise CommandError('TRANSACTION_ARCHIVE_ROOT is not set. Point it at durable storage '
+                                   '(a persistent disk) before archiving.')
+            if not Path(root).is_dir():
+                raise CommandError(f'TRANSACTION_ARCHIVE_ROOT {root} does not exist. Mount or create '
+                                   'the archive disk first.')
+
+        archived = rows = 0
+        for alias in sharding.aliases():
+            with sharding.use(alias):
+                for account_id, month in list(archive.pending_months(before)):
+                    if options['dry_run']:
+                        self.stdout.write(f'  account #{account_id} {month:%Y-%m}')
+                        continue
+                    result = archive.archive_month(account_id, month)
+                    if result is not None:
+                        archived += 1
+                        rows += result.row_count
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Archived {rows} transaction(s) in {archived} account-month(s) before {before:%Y-%m}.'
+            ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from accounts import revocation
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete revoked refresh tokens that have expired and "log out everywhere" '
+        'cutoffs older than any live token. Run daily; web processes drop them '
+        'from their filters at the next rebuild (REVOCATION_REBUILD_SECONDS).'
+    )
+
+    def handle(self, *args, **options):
+        rows, cutoffs = revocation.compact()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {rows} expired revocation(s) and {cutoffs} stale cutoff(s).'
+        ))
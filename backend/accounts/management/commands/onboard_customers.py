@@ -0,0 +1,62 @@
+import csv
+import json
+from pathlib import Path
+
+import orjson
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import batch, onboarding
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Create customers, each with a default account, from a CSV file (header '
+        'row: username,email,first_name,last_name,password,phone,address,account_type) '
+        'or a JSON list. Invalid rows are skipped and written to the report.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or .json file of customers.')
+        parser.add_argument('--rm', required=True,
+                            help='Username of the relationship manager the customers belong to.')
+        parser.add_argument('--report', default='onboarding_report.jsonl',
+                            help='JSON-lines report, one line per input row.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate only; create nothing.')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Password hashing processes (default: 4, or 1 on SQLite).')
+        parser.add_argument('--chunk-size', type=int, default=onboarding.CHUNK_SIZE,
+                            help='Customers per insert transaction.')
+
+    def handle(self, *args, **options):
+        try:
+            rm = User.objects.get(username=options['rm'], role='rm')
+        except User.DoesNotExist:
+            raise CommandError(f'No relationship manager named {options["rm"]!r}.')
+
+        path = Path(options['path'])
+        try:
+            data = path.read_bytes()
+            rows = orjson.loads(data) if path.suffix == '.json' else onboarding.read_csv(data)
+        except (OSError, ValueError, csv.Error) as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+        if not isinstance(rows, list):
+            raise CommandError('A JSON file must hold a list of customers.')
+
+        result = onboarding.onboard(
+            rows, rm, dry_run=options['dry_run'],
+            workers=options['workers'] or batch.default_workers(),
+            chunk_size=options['chunk_size'],
+        )
+        with open(options['report'], 'w') as report:
+            for entry in result['rows']:
+                report.write(json.dumps(entry) + '\n')
+
+        if options['dry_run']:
+            done = f'{len(rows) - result["errors"]} customer(s) valid'
+        else:
+            done = f'Created {result["created"]} customer(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{done}; {result["errors"]} row(s) rejected (see {options["report"]}).'
+        ))
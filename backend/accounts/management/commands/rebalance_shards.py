@@ -0,0 +1,86 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from accounts import sharding
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Move customers (with all their accounts, transactions and pending '
+        'outbox events) between ledger shards. Each move is safe to re-run '
+        'if it is interrupted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer', help='Username of one customer to move (with --to).')
+        parser.add_argument('--to', help='Target database alias for --customer.')
+        parser.add_argument('--drain', metavar='ALIAS',
+                            help="Move every customer off ALIAS ('default' moves pre-sharding customers).")
+        parser.add_argument('--auto', action='store_true',
+                            help='Even out the number of customers per shard.')
+        parser.add_argument('--dry-run', action='store_true', help='Only print the planned moves.')
+
+    def handle(self, *args, **options):
+        shards = list(settings.LEDGER_SHARDS)
+        if not shards:
+            raise CommandError('No ledger shards configured (LEDGER_SHARD_URLS / LEDGER_SQLITE_SHARDS).')
+        if sum(bool(options[o]) for o in ('customer', 'drain', 'auto')) != 1:
+            raise CommandError('Give exactly one of --customer, --drain or --auto.')
+
+        customers = User.objects.filter(role='customer')
+        if options['customer']:
+            if options['to'] not in sharding.aliases():
+                raise CommandError(f'--to must be one of: {", ".join(sharding.aliases())}.')
+            try:
+                moves = [(customers.get(username=options['customer']), options['to'])]
+            except User.DoesNotExist:
+                raise CommandError(f"No customer named {options['customer']!r}.")
+        elif options['drain']:
+            moves = self.plan_drain(customers, options['drain'], shards)
+        else:
+            moves = self.plan_even(customers, shards)
+
+        rows = 0
+        for user, target in moves:
+            self.stdout.write(f'  {user.username}: {sharding.shard_of(user)} -> {target}')
+            if not options['dry_run']:
+                rows += sharding.move_customer(user, target)
+        verb = 'Planned' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(moves)} customer(s), {rows} row(s) copied.'))
+
+    def _load(self, customers, shards):
+        load = Counter({alias: 0 for alias in shards})
+        load.update(customers.exclude(shard='').values_list('shard', flat=True))
+        return load
+
+    def plan_drain(self, customers, alias, shards):
+        if alias not in sharding.aliases():
+            raise CommandError(f'--drain must be one of: {", ".join(sharding.aliases())}.')
+        targets = [shard for shard in shards if shard != alias]
+        if not targets:
+            raise CommandError('No other shard to move customers to.')
+        load = self._load(customers, targets)
+        moves = []
+        for user in customers.filter(shard='' if alias == DEFAULT_DB_ALIAS else alias).order_by('id'):
+            target = min(targets, key=lambda shard: load[shard])
+            load[target] += 1
+            moves.append((user, target))
+        return moves
+
+    def plan_even(self, customers, shards):
+        load = self._load(customers, shards)
+        moves = []
+        while True:
+            fullest = max(shards, key=lambda shard: load[shard])
+            emptiest = min(shards, key=lambda shard: load[shard])
+            if load[fullest] - load[emptiest] <= 1:
+                return moves
+            count = (load[fullest] - load[emptiest]) // 2
+            for user in customers.filter(shard=fullest).order_by('-id')[:count]:
+                moves.append((user, emptiest))
+            load[fullest] -= count
+            load[emptiest] += count
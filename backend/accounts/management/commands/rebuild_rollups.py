@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts import analytics, batch, sharding
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute spending rollups from the ledger (table and archive) for '
+        'a day range. Run it for past days only: today\'s rollups are still '
+        'being updated by the outbox worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help='First day, YYYY-MM-DD (default: all history).')
+        parser.add_argument('--to', dest='end', help='Last day, YYYY-MM-DD (default: yesterday).')
+        parser.add_argument('--account', type=int, action='append',
+                            help='Only this account id (repeatable).')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: 4, or 1 on SQLite).')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Accounts per chunk.')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            last = (date.fromisoformat(options['end']) if options['end']
+                    else timezone.localdate() - timedelta(days=1))
+        except ValueError:
+            raise CommandError('Dates must be YYYY-MM-DD.')
+        if start and start > last:
+            raise CommandError('--from must not be after --to.')
+        if last >= timezone.localdate():
+            raise CommandError('--to must be before today.')
+
+        written = accounts = 0
+        for alias in sharding.aliases():
+            with sharding.use(alias):
+                ids = Account.objects.order_by('id')
+                if options['account']:
+                    ids = ids.filter(id__in=options['account'])
+                ids = list(ids.values_list('id', flat=True))
+                accounts += len(ids)
+                written += sum(analytics.rebuild(
+                    ids, start, last + timedelta(days=1),
+                    workers=options['workers'] or batch.default_workers(),
+                    chunk_size=options['chunk_size'],
+                ))
+        engine = 'numpy' if analytics.np is not None else 'python'
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} rollup row(s) for {accounts} account(s) ({engine}).'
+        ))
@@ -0,0 +1,50 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from accounts import outbox, sharding
+
+
+class Command(BaseCommand):
+    help = (
+        'Drain the transactional outbox: claim due events in batches with '
+        'SELECT ... FOR UPDATE SKIP LOCKED and run their handlers, on every '
+        'ledger shard. Safe to run several copies at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--purge-days', type=int, default=7,
+                            help='Delete delivered events older than this when idle.')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain what is due now, then exit.')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        delivered = 0
+        while self.running:
+            claimed = 0
+            for alias in sharding.aliases():
+                with sharding.use(alias):
+                    claimed += outbox.process_batch(options['batch_size'])
+            delivered += claimed
+            if claimed:
+                continue
+            if options['once']:
+                break
+            for alias in sharding.aliases():
+                with sharding.use(alias):
+                    outbox.purge_processed(timedelta(days=options['purge_days']))
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Outbox worker stopped after {delivered} event(s).'))
+
+    def stop(self, signum, frame):
+        self.running = False
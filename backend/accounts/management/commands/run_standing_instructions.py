@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import batch, standing
+
+
+class Command(BaseCommand):
+    help = (
+        'Execute every standing instruction (recurring payment or sweep) due on '
+        'or before the run date, in account-grouped batches. Safe to re-run: a '
+        'date is executed at most once per instruction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Run date, YYYY-MM-DD (default: today).')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: 4, or 1 on SQLite).')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Instructions per transaction (accounts are never split).')
+
+    def handle(self, *args, **options):
+        try:
+            until = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError:
+            raise CommandError('--date must be YYYY-MM-DD.')
+
+        def progress(counts):
+            self.stdout.write(
+                f"  {counts['completed']} completed, {counts['failed']} failed, "
+                f"{counts['skipped']} skipped, ₹{counts['amount']}"
+            )
+
+        totals = standing.run_due(
+            until, workers=options['workers'] or batch.default_workers(),
+            chunk_size=options['chunk_size'], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Standing instructions: {totals['completed']} completed, {totals['failed']} failed, "
+            f"{totals['skipped']} skipped, total ₹{totals['amount']}."
+        ))
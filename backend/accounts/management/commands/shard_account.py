@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import ledger, sharding
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        'Spread a hot account\'s credits over N balance slots so concurrent '
+        'credits do not serialize on its row lock. --slots 0 turns it off.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('account_number')
+        parser.add_argument('--slots', type=int, required=True,
+                            help='Number of sub-balance slots (0 disables).')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['slots'] <= 256:
+            raise CommandError('--slots must be between 0 and 256.')
+        for alias in sharding.aliases():
+            with sharding.use(alias):
+                account_id = Account.objects.filter(
+                    account_number=options['account_number']).values_list('id', flat=True).first()
+                if account_id is not None:
+                    account = ledger.set_balance_slots(account_id, options['slots'])
+                    break
+        else:
+            raise CommandError(f"Account {options['account_number']} not found.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{account.account_number}: {account.balance_slots} slot(s), "
+            f"balance ₹{account.balance}"
+        ))
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts import audit, batch
+from accounts.models import AuditEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Check the audit log\'s hash chain: every entry\'s hash, its link to the '
+        'previous entry and that no sequence number is missing. Problems are '
+        'written as JSON lines; exits non-zero if any are found.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='audit_problems.jsonl',
+                            help='JSON-lines report of problems.')
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only entries added since the last run.')
+        parser.add_argument('--state', default=str(Path(settings.BASE_DIR) / '.verify_audit_state.json'),
+                            help='Where the last verified head (seq and hash) is kept.')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: 4, or 1 on SQLite).')
+        parser.add_argument('--chunk-size', type=int, default=50_000,
+                            help='Entries per worker task.')
+
+    def handle(self, *args, **options):
+        state_path = Path(options['state'])
+        last = json.loads(state_path.read_text()) if state_path.exists() else None
+        head_seq, head_hash = audit.head()
+
+        problems = []
+        start = 1
+        if last is not None:
+            # The last verified head anchors the chain: if it changed or the
+            # log got shorter, entries before it were rewritten or dropped.
+            anchored = AuditEntry.objects.filter(seq=last['seq']).values_list('hash', flat=True).first()
+            if last['seq'] and anchored != last['hash']:
+                problems.append({'seq': last['seq'], 'problem': 'verified head was changed or removed'})
+            elif options['incremental']:
+                start = last['seq'] + 1
+
+        checked = 0
+        chunks = [(first, min(first + options['chunk_size'] - 1, head_seq))
+                  for first in range(start, head_seq + 1, options['chunk_size'])]
+        for count, found in batch.run_chunks(audit.verify_range, chunks,
+                                             workers=options['workers'] or batch.default_workers()):
+            checked += count
+            problems += found
+
+        with open(options['output'], 'w') as report:
+            for problem in sorted(problems, key=lambda p: p['seq']):
+                report.write(json.dumps(problem) + '\n')
+        scope = f'since entry #{start - 1}' if start > 1 else 'full'
+        if problems:
+            raise CommandError(
+                f'{len(problems)} problem(s) in {checked} audit entries ({scope}); see {options["output"]}.'
+            )
+        state_path.write_text(json.dumps({
+            'seq': head_seq, 'hash': head_hash, 'finished_at': timezone.now().isoformat(),
+        }))
+        self.stdout.write(self.style.SUCCESS(
+            f'Audit log OK: {checked} entries verified ({scope}), head #{head_seq} {head_hash[:12]}.'
+        ))
@@ -0,0 +1,141 @@
+"""
+Response compression for API responses.
+
+Negotiates brotli (when the optional ``brotli`` package is installed) or
+gzip from Accept-Encoding. Streaming responses are compressed chunk by
+chunk and flushed after every chunk, so nothing is buffered and clients
+see each chunk as soon as the view yields it.
+
+BREACH: like Django's GZipMiddleware, gzip output carries up to
+MAX_RANDOM_BYTES of random padding in its header so the compressed length
+leaks less about the body. Brotli has no room for padding, so views that
+return credentials (tokens, invite links) are never compressed at all.
+
+Tuning (settings):
+  COMPRESSION_MIN_LENGTH        skip bodies smaller than this (bytes)
+  COMPRESSION_GZIP_LEVEL        zlib level; 5 is close to 9 on JSON at ~1/3 the CPU
+  COMPRESSION_BROTLI_QUALITY    brotli quality; 4 beats gzip-6 in size and speed
+  COMPRESSION_EXEMPT_URL_NAMES  URL names whose responses are sent uncompressed
+"""
+import secrets
+import struct
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'text/', 'application/javascript', 'application/xml',
+    'application/x-ndjson',
+)
+MAX_RANDOM_BYTES = 100  # as GZipMiddleware.max_random_bytes
+
+
+def gzip_header():
+    """gzip header (mtime 0) padded with a random-length FNAME field."""
+    filename = b'a' * secrets.randbelow(MAX_RANDOM_BYTES)
+    return b'\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff' + filename + b'\x00'
+
+
+def gzip_trailer(crc, size):
+    """CRC-32 and length (mod 2**32) of the uncompressed data."""
+    return struct.pack('<LL', crc, size & 0xffffffff)
+
+
+def gzip_compress(data, level):
+    """``data`` as one padded gzip member."""
+    return gzip_header() + zlib.compress(data, level, -15) + gzip_trailer(zlib.crc32(data), len(data))
+
+
+def gzip_sequence(sequence, level):
+    """Yield a padded gzip stream for ``sequence``, sync-flushed after each chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    header, crc, size = gzip_header(), 0, 0
+    for chunk in sequence:
+        if chunk:
+            crc, size = zlib.crc32(chunk, crc), size + len(chunk)
+            yield header + compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            header = b''
+    yield header + compressor.flush() + gzip_trailer(crc, size)
+
+
+def brotli_sequence(sequence, quality):
+    """Yield a brotli stream for ``sequence``, flushed after each chunk."""
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        if chunk:
+            yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compress JSON/text responses with brotli or gzip above a size threshold."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 5)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+        self.exempt_url_names = frozenset(getattr(settings, 'COMPRESSION_EXEMPT_URL_NAMES', ()))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.has_header('Content-Encoding'):
+            return response
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name in self.exempt_url_names:
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        # Async streams (ASGI) are left to the server.
+        if response.streaming and response.is_async:
+            return response
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and re_accepts_br.search(accept):
+            encoding = 'br'
+        elif re_accepts_gzip.search(accept):
+            encoding = 'gzip'
+        else:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                response.streaming_content = brotli_sequence(
+                    response.streaming_content, self.brotli_quality)
+            else:
+                response.streaming_content = gzip_sequence(
+                    response.streaming_content, self.gzip_level)
+            # Compressed size is unknown until the stream ends.
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            else:
+                compressed = gzip_compress(response.content, self.gzip_level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # RFC 9110 §8.8.1: a strong ETag must not survive a content-coding change.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
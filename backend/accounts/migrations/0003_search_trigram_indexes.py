@@ -0,0 +1,46 @@
+"""
+GIN trigram indexes for server-side search (see accounts/search.py).
+
+Indexes are built on UPPER(col) because that is the expression Django's
+``icontains`` compares on PostgreSQL. PostgreSQL only: other backends skip
+this migration. Built CONCURRENTLY so large ledgers are not locked.
+"""
+from django.db import migrations
+
+TRIGRAM_INDEXES = [
+    ('user_search_trgm_idx', 'accounts_user',
+     ['first_name', 'last_name', 'username', 'email', 'phone']),
+    ('account_number_trgm_idx', 'accounts_account', ['account_number']),
+    ('txn_search_trgm_idx', 'accounts_transaction', ['description', 'reference_id']),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, columns in TRIGRAM_INDEXES:
+        expressions = ', '.join(f'UPPER("{col}") gin_trgm_ops' for col in columns)
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" USING gin ({expressions})'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_portfolio_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
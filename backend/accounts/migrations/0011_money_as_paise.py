@@ -0,0 +1,49 @@
+"""
+Store balances and transaction amounts as BIGINT paise (accounts.fields.PaiseField).
+
+Each column is converted through a temporary column: add it, fill it with
+ROUND(value * 100), drop the NUMERIC column and rename. Reversible; the
+columns without a default get one first so they can be re-added on rollback.
+"""
+import accounts.fields
+from django.db import migrations, models
+
+COLUMNS = [
+    # (model, table, column, max_digits, has default=0)
+    ('account', 'accounts_account', 'balance', 15, True),
+    ('balanceslot', 'accounts_balanceslot', 'balance', 15, True),
+    ('transaction', 'accounts_transaction', 'amount', 12, False),
+    ('transaction', 'accounts_transaction', 'balance_after', 15, False),
+]
+
+
+def convert(model, table, column, max_digits, has_default):
+    temp = f'{column}_paise'
+    rollback_default = [] if has_default else [
+        migrations.AlterField(
+            model_name=model, name=column,
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=max_digits),
+        ),
+    ]
+    return rollback_default + [
+        migrations.AddField(
+            model_name=model, name=temp,
+            field=accounts.fields.PaiseField(default=0, max_digits=max_digits),
+            preserve_default=has_default,
+        ),
+        migrations.RunSQL(
+            f'UPDATE {table} SET {temp} = ROUND({column} * 100)',
+            f'UPDATE {table} SET {column} = {temp} / 100.0',
+        ),
+        migrations.RemoveField(model_name=model, name=column),
+        migrations.RenameField(model_name=model, old_name=temp, new_name=column),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_daily_rollup'),
+    ]
+
+    operations = [op for args in COLUMNS for op in convert(*args)]
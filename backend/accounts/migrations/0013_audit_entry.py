@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:09
+
+from django.db import migrations, models
+
+# On PostgreSQL the table refuses UPDATE, DELETE and TRUNCATE outright;
+# the hash chain (see accounts/audit.py) catches tampering elsewhere.
+APPEND_ONLY_SQL = '''
+CREATE OR REPLACE FUNCTION accounts_auditentry_append_only() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'accounts_auditentry is append-only';
+END
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER auditentry_no_update_delete BEFORE UPDATE OR DELETE ON accounts_auditentry
+    FOR EACH ROW EXECUTE FUNCTION accounts_auditentry_append_only();
+CREATE TRIGGER auditentry_no_truncate BEFORE TRUNCATE ON accounts_auditentry
+    FOR EACH STATEMENT EXECUTE FUNCTION accounts_auditentry_append_only();
+'''
+
+
+def make_append_only(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(APPEND_ONLY_SQL)
+
+
+def drop_append_only(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP FUNCTION IF EXISTS accounts_auditentry_append_only() CASCADE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_user_shard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.BigIntegerField(unique=True)),
+                ('action', models.CharField(max_length=50)),
+                ('actor_id', models.BigIntegerField(blank=True, null=True)),
+                ('subject', models.CharField(max_length=100)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField()),
+                ('prev_hash', models.CharField(max_length=64)),
+                ('hash', models.CharField(max_length=64)),
+            ],
+            options={
+                'verbose_name_plural': 'audit entries',
+            },
+        ),
+        migrations.RunPython(make_append_only, drop_append_only),
+    ]
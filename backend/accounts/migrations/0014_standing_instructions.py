@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:16
+
+import accounts.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_audit_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingInstruction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('payment', 'Recurring Payment'), ('sweep', 'Sweep')], default='payment', max_length=10)),
+                ('amount', accounts.fields.PaiseField(max_digits=15)),
+                ('description', models.CharField(default='EMI Payment', max_length=255)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], default='monthly', max_length=10)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('next_run', models.DateField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status', models.CharField(blank=True, max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standing_instructions', to='accounts.account')),
+                ('destination', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='incoming_sweeps', to='accounts.account')),
+            ],
+            options={
+                'ordering': ['next_run', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InstructionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_date', models.DateField()),
+                ('status', models.CharField(choices=[('completed', 'Completed'), ('failed', 'Failed'), ('skipped', 'Skipped')], max_length=10)),
+                ('amount', accounts.fields.PaiseField(default=0, max_digits=15)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('instruction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='accounts.standinginstruction')),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.transaction')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='standinginstruction',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['next_run', 'account', 'id'], name='si_due_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='instructionrun',
+            constraint=models.UniqueConstraint(fields=('instruction', 'run_date'), name='unique_instruction_run_date'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_token_revocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCoverage',
+            fields=[
+                ('transaction_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.account')),
+            ],
+        ),
+    ]
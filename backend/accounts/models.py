@@ -1,6 +1,22 @@
 import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import sharding
+from .fields import PaiseField
+
+
+def generate_reference_id():
+    """Unique transaction reference, e.g. TXN8F2A1B3C4D5E."""
+    return f"TXN{uuid.uuid4().hex[:12].upper()}"
+
+
+def generate_account_number():
+    """Unique account number, e.g. SB8F2A1B3C4D."""
+    return f"SB{uuid.uuid4().hex[:10].upper()}"
 
 
 class User(AbstractUser):
@@ -17,13 +33,49 @@ class User(AbstractUser):
         'self', on_delete=models.SET_NULL, null=True, blank=True,
         related_name='created_users'
     )
+    # Database alias holding the customer's ledger rows ('' = default); see sharding.py
+    shard = models.CharField(max_length=32, blank=True, default='')
 
     def __str__(self):
         return f"{self.get_full_name() or self.username} ({self.get_role_display()})"
 
 
+class AccountQuerySet(models.QuerySet):
+    def with_live_balance(self):
+        """
+        Annotate ``live_balance``: the stored balance plus any credits still
+        sitting in hot-account BalanceSlots (zero for ordinary accounts).
+        """
+        slots = BalanceSlot.objects.filter(account=models.OuterRef('pk')).order_by().values('account')
+        return self.annotate(live_balance=models.ExpressionWrapper(
+            models.F('balance') + Coalesce(
+                models.Subquery(slots.annotate(s=models.Sum('balance')).values('s')),
+                models.Value(0, output_field=PaiseField()),
+            ),
+            output_field=PaiseField(),
+        ))
+
+    def for_user(self, user):
+        """``user``'s accounts, read from the ledger shard that holds them."""
+        return self.using(sharding.shard_of(user)).filter(user=user)
+
+    def total_balance(self):
+        """Sum of live balances across the queryset (two aggregate queries)."""
+        base = self.aggregate(total=models.Sum('balance'))['total'] or 0
+        pending = BalanceSlot.objects.using(self.db).filter(account__in=self.values('pk')).aggregate(
+            total=models.Sum('balance'))['total'] or 0
+        return base + pending
+
+
 class Account(models.Model):
-    """Bank account linked to a customer."""
+    """
+    Bank account linked to a customer.
+
+    Hot accounts (salary disbursement, cash collection) can opt into
+    ``balance_slots`` > 0: credits then land in one of N BalanceSlot rows
+    instead of locking this row, and ``balance`` holds the consolidated
+    part. See ledger.py.
+    """
     ACCOUNT_TYPES = [
         ('savings', 'Savings Account'),
         ('current', 'Current Account'),
@@ -32,19 +84,44 @@ class Account(models.Model):
     account_number = models.CharField(max_length=20, unique=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='accounts')
     account_type = models.CharField(max_length=20, choices=ACCOUNT_TYPES, default='savings')
-    balance = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    balance = PaiseField(default=0)
     is_active = models.BooleanField(default=True)
+    balance_slots = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AccountQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.account_number} - {self.user.username} (₹{self.balance})"
 
+    def live_balance(self):
+        """Stored balance plus unconsolidated slot credits."""
+        if not self.balance_slots:
+            return self.balance
+        pending = self.slots.aggregate(total=models.Sum('balance'))['total'] or 0
+        return self.balance + pending
+
     def save(self, *args, **kwargs):
         if not self.account_number:
-            self.account_number = f"SB{uuid.uuid4().hex[:10].upper()}"
+            self.account_number = generate_account_number()
         super().save(*args, **kwargs)
 
 
+class BalanceSlot(models.Model):
+    """One of N sub-balances holding not-yet-consolidated credits of a hot account."""
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='slots')
+    slot = models.PositiveSmallIntegerField()
+    balance = PaiseField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'slot'], name='unique_account_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id}#{self.slot} (₹{self.balance})"
+
+
 class Transaction(models.Model):
     """A single financial transaction."""
     TRANSACTION_TYPES = [
@@ -53,21 +130,27 @@ class Transaction(models.Model):
     ]
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='transactions')
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
-    amount = models.DecimalField(max_digits=12, decimal_places=2)
-    balance_after = models.DecimalField(max_digits=15, decimal_places=2)
+    amount = PaiseField(max_digits=12)
+    balance_after = PaiseField()
     description = models.CharField(max_length=255)
     reference_id = models.CharField(max_length=30, unique=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Latest-first statements and "last transaction" lookups per account
+            models.Index(fields=['account', '-timestamp'], name='txn_account_ts_idx'),
+            # Admin date hierarchy / date-range filters across all accounts
+            models.Index(fields=['timestamp'], name='txn_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.transaction_type.upper()} ₹{self.amount} | {self.description}"
 
     def save(self, *args, **kwargs):
         if not self.reference_id:
-            self.reference_id = f"TXN{uuid.uuid4().hex[:12].upper()}"
+            self.reference_id = generate_reference_id()
         super().save(*args, **kwargs)
 
 
@@ -91,11 +174,224 @@ class ServiceRequest(models.Model):
     service_type = models.CharField(max_length=30, choices=SERVICE_TYPES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     remarks = models.TextField(blank=True)
+    assigned_to = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='claimed_service_requests'
+    )
+    claimed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'status'], name='svc_user_status_idx'),
+            # Work-queue polling touches only pending rows, however much history exists
+            models.Index(
+                fields=['created_at', 'id'], name='svc_pending_queue_idx',
+                condition=models.Q(status='pending'),
+            ),
+            models.Index(fields=['assigned_to', 'status'], name='svc_assignee_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_service_type_display()} - {self.user.username} ({self.status})"
+
+
+class OutboxEvent(models.Model):
+    """Side-effect event written atomically with a posting; drained by run_outbox_worker."""
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Polling only ever scans undelivered events
+            models.Index(
+                fields=['available_at', 'id'], name='outbox_pending_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.id}"
+
+
+class InterestAccrual(models.Model):
+    """One row per account per accrual period; makes accrue_interest idempotent and resumable."""
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='interest_accruals')
+    period_start = models.DateField()
+    interest = models.DecimalField(max_digits=12, decimal_places=2)
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'period_start'], name='unique_account_period'),
+        ]
+
+    def __str__(self):
+        return f"{self.account.account_number} {self.period_start:%Y-%m}: {self.interest}"
+
+
+class TransactionArchive(models.Model):
+    """One account-month of transactions moved out of the table into a compressed file."""
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='transaction_archives')
+    month = models.DateField()
+    path = models.CharField(max_length=255)  # relative to TRANSACTION_ARCHIVE_ROOT
+    row_count = models.PositiveIntegerField()
+    # Offset index: [[byte offset, byte length, first ts µs, last ts µs, rows], ...]
+    blocks = models.JSONField()
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'month'], name='unique_account_month_archive'),
+        ]
+
+    def __str__(self):
+        return f"{self.account.account_number} {self.month:%Y-%m} ({self.row_count} rows)"
+
+
+class DailyRollup(models.Model):
+    """Per-account, per-day, per-category posting totals, kept current from the outbox."""
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='daily_rollups')
+    day = models.DateField()
+    category = models.CharField(max_length=30)
+    credit_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    debit_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    credit_count = models.PositiveIntegerField(default=0)
+    debit_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index behind every (account, day range) analytics query
+            models.UniqueConstraint(fields=['account', 'day', 'category'], name='unique_account_day_category'),
+        ]
+
+    def __str__(self):
+        return f"{self.account.account_number} {self.day} {self.category}"
+
+
+class RollupCoverage(models.Model):
+    """
+    A posting that rebuild_rollups counted while its outbox event was still
+    pending; the rollup handler skips it (once) instead of adding it again.
+    """
+    transaction_id = models.BigIntegerField(primary_key=True)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='+')
+
+    def __str__(self):
+        return f"rollup covers transaction #{self.transaction_id}"
+
+
+class StandingInstruction(models.Model):
+    """Recurring payment (EMI, bill) or sweep, executed by run_standing_instructions."""
+    KIND_CHOICES = [
+        ('payment', 'Recurring Payment'),  # debits ``amount`` to an outside payee
+        ('sweep', 'Sweep'),                # moves the balance above ``amount`` to ``destination``
+    ]
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='standing_instructions')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='payment')
+    destination = models.ForeignKey(
+        Account, on_delete=models.CASCADE, null=True, blank=True, related_name='incoming_sweeps'
+    )
+    amount = PaiseField()
+    description = models.CharField(max_length=255, default='EMI Payment')
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='monthly')
+    start_date = models.DateField()  # monthly runs keep its day of the month
+    end_date = models.DateField(null=True, blank=True)
+    next_run = models.DateField()
+    is_active = models.BooleanField(default=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.CharField(max_length=10, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['next_run', 'id']
+        indexes = [
+            # The scheduler's due query: range on next_run, index-only on Postgres
+            models.Index(
+                fields=['next_run', 'account', 'id'], name='si_due_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.account.account_number} ({self.frequency})"
+
+
+class InstructionRun(models.Model):
+    """Outcome of one scheduled run; unique per (instruction, run_date) so a date runs once."""
+    STATUS_CHOICES = [
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped'),  # sweep with nothing above the threshold
+    ]
+    instruction = models.ForeignKey(StandingInstruction, on_delete=models.CASCADE, related_name='runs')
+    run_date = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    amount = PaiseField(default=0)
+    transaction = models.ForeignKey(
+        Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['instruction', 'run_date'], name='unique_instruction_run_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.instruction_id} {self.run_date}: {self.status}"
+
+
+class AuditEntry(models.Model):
+    """Append-only, hash-chained audit trail entry; written in batches by audit.py."""
+    seq = models.BigIntegerField(unique=True)
+    action = models.CharField(max_length=50)
+    actor_id = models.BigIntegerField(null=True, blank=True)  # not a FK: entries outlive users
+    subject = models.CharField(max_length=100)  # e.g. 'account:42', 'user:7'
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField()
+    prev_hash = models.CharField(max_length=64)
+    hash = models.CharField(max_length=64)
+
+    class Meta:
+        verbose_name_plural = 'audit entries'
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.subject}"
+
+
+class RevokedToken(models.Model):
+    """Refresh token revoked by rotation or logout; deleted once it expires (see revocation.py)."""
+    jti = models.UUIDField(primary_key=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(db_index=True)  # other processes sync from here
+
+    def __str__(self):
+        return f"{self.jti} (expires {self.expires_at:%Y-%m-%d %H:%M})"
+
+
+class TokenCutoff(models.Model):
+    """'Log out everywhere': the user's tokens issued before ``not_before`` are refused."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='token_cutoff')
+    not_before = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user} logged out everywhere at {self.not_before:%Y-%m-%d %H:%M}"
@@ -0,0 +1,201 @@
+"""
+Bulk customer onboarding.
+
+``onboard(rows, created_by)`` provisions a customer and a default account
+for every valid row (dicts from a JSON body or a CSV file):
+
+  1. every row is validated with OnboardCustomerSerializer; usernames are
+     checked against the rest of the file and, in batches, against the table
+  2. passwords are hashed, across a process pool (batch.run_chunks) for
+     the management command and in the calling thread for the API; rows
+     without one get an unusable password and an ``invite_token`` in the
+     report, which the customer exchanges for a password of their own at
+     /api/password/setup/ (``accept_invite``)
+  3. users and their accounts are inserted with bulk_create, one
+     transaction per chunk (and ledger shard, see sharding.py)
+
+Invalid rows are skipped and reported; the rest are created. The report
+has one entry per input row, in input order.
+"""
+import csv
+import io
+import secrets
+
+from django.contrib.auth.hashers import (
+    UNUSABLE_PASSWORD_PREFIX, UNUSABLE_PASSWORD_SUFFIX_LENGTH, make_password,
+)
+from django.contrib.auth.tokens import default_token_generator
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from . import batch, sharding
+from .models import Account, User, generate_account_number
+from .serializers import OnboardCustomerSerializer
+
+CHUNK_SIZE = 1000
+HASH_CHUNK_SIZE = 25
+USERNAME_TAKEN = 'A user with that username already exists.'
+
+
+def read_csv(data):
+    """Rows of a CSV file (bytes or str, header line first) as dicts."""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+    return list(csv.DictReader(io.StringIO(data), restval=''))
+
+
+def _error(index, username, errors):
+    return {'row': index, 'username': username, 'status': 'error', 'errors': errors}
+
+
+# ─── Validation ─────────────────────────────────────────────────────
+def validate(rows):
+    """
+    Validate all rows in one pass. Returns (report, valid): report holds an
+    error entry (or None) per row, valid is a list of (row number, data).
+    """
+    serializer = OnboardCustomerSerializer()
+    report, valid, first_row = [None] * len(rows), [], {}
+    for index, row in enumerate(rows, start=1):
+        try:
+            data = serializer.run_validation(row)
+        except ValidationError as exc:
+            username = row.get('username') if isinstance(row, dict) else None
+            report[index - 1] = _error(index, username, exc.detail)
+            continue
+        username = data['username']
+        if username in first_row:
+            report[index - 1] = _error(index, username, {
+                'username': [f'Duplicate of row {first_row[username]}.']})
+            continue
+        first_row[username] = index
+        valid.append((index, data))
+
+    taken = set()
+    for chunk in batch.chunked(list(first_row), CHUNK_SIZE):
+        taken.update(User.objects.filter(username__in=chunk).values_list('username', flat=True))
+    if taken:
+        for index, data in valid:
+            if data['username'] in taken:
+                report[index - 1] = _error(index, data['username'], {'username': [USERNAME_TAKEN]})
+        valid = [(index, data) for index, data in valid if data['username'] not in taken]
+    return report, valid
+
+
+# ─── Password hashing ───────────────────────────────────────────────
+def _unusable_password():
+    # Same shape as make_password(None), from one token instead of 40 choice() calls.
+    suffix = secrets.token_urlsafe(UNUSABLE_PASSWORD_SUFFIX_LENGTH)[:UNUSABLE_PASSWORD_SUFFIX_LENGTH]
+    return UNUSABLE_PASSWORD_PREFIX + suffix
+
+
+def _hash_chunk(chunk):
+    start, passwords = chunk
+    return start, [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords, workers=1):
+    """Hashes for ``passwords`` in order; blank passwords get unusable ones."""
+    hashes = [_unusable_password() if not password else None for password in passwords]
+    todo = [i for i, password in enumerate(passwords) if password]
+    chunks = [(start, [passwords[i] for i in todo[start:start + HASH_CHUNK_SIZE]])
+              for start in range(0, len(todo), HASH_CHUNK_SIZE)]
+    for start, chunk_hashes in batch.run_chunks(_hash_chunk, chunks, workers):
+        for i, password_hash in zip(todo[start:], chunk_hashes):
+            hashes[i] = password_hash
+    return hashes
+
+
+# ─── Invites ────────────────────────────────────────────────────────
+def invite_token(user):
+    """
+    Token that lets ``user``, onboarded without a password, choose one. It
+    stops working once a password is set or after PASSWORD_RESET_TIMEOUT.
+    """
+    return default_token_generator.make_token(user)
+
+
+def accept_invite(username, token, password):
+    """Set the password of an invited customer; returns the user, or None if the invite is not valid."""
+    with transaction.atomic():
+        # Locked so two requests with the same invite cannot both set a password.
+        user = (User.objects.select_for_update()
+                .filter(username=username, role='customer', is_active=True).first())
+        if (user is None or user.has_usable_password()
+                or not default_token_generator.check_token(user, token)):
+            return None
+        user.set_password(password)
+        user.save(update_fields=['password'])
+    return user
+
+
+# ─── Writing ────────────────────────────────────────────────────────
+def _create_chunk(entries, created_by):
+    """Insert users + accounts for [(row number, data, hash)]; returns report entries."""
+    users = [
+        User(username=data['username'], email=data.get('email', ''),
+             first_name=data.get('first_name', ''), last_name=data.get('last_name', ''),
+             phone=data.get('phone', ''), address=data.get('address', ''),
+             password=password_hash, role='customer', created_by=created_by)
+        for _, data, password_hash in entries
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        sharding.place(users)
+        accounts = {}
+        for alias in {sharding.shard_of(user) for user in users}:
+            with sharding.use(alias), transaction.atomic(using=alias):
+                accounts.update((account.user_id, account) for account in Account.objects.bulk_create([
+                    Account(user=user, account_number=generate_account_number(),
+                            account_type=data['account_type'])
+                    for user, (_, data, _) in zip(users, entries) if sharding.shard_of(user) == alias
+                ]))
+    accounts = [accounts[user.id] for user in users]
+    report = []
+    for (index, _, _), user, account in zip(entries, users, accounts):
+        entry = {'row': index, 'username': user.username, 'status': 'created',
+                 'user_id': user.id, 'account_number': account.account_number}
+        if not user.has_usable_password():
+            entry['invite_token'] = invite_token(user)
+        report.append(entry)
+    return report
+
+
+def _insert(entries, created_by):
+    """Like _create_chunk, reporting usernames taken concurrently since validation."""
+    conflicts = []
+    while entries:
+        try:
+            return _create_chunk(entries, created_by) + conflicts
+        except IntegrityError:
+            usernames = [data['username'] for _, data, _ in entries]
+            taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+            if not taken:
+                raise
+            conflicts += [_error(index, data['username'], {'username': [USERNAME_TAKEN]})
+                          for index, data, _ in entries if data['username'] in taken]
+            entries = [entry for entry in entries if entry[1]['username'] not in taken]
+    return conflicts
+
+
+def onboard(rows, created_by, dry_run=False, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Onboard ``rows`` as customers of ``created_by`` (an RM, or None).
+    Returns {'created', 'errors', 'rows'}; with ``dry_run`` only validates.
+    """
+    report, valid = validate(rows)
+    if dry_run:
+        for index, data in valid:
+            report[index - 1] = {'row': index, 'username': data['username'], 'status': 'valid'}
+    else:
+        hashes = hash_passwords([data.get('password', '') for _, data in valid], workers)
+        entries = [(index, data, password_hash)
+                   for (index, data), password_hash in zip(valid, hashes)]
+        for chunk in batch.chunked(entries, chunk_size):
+            for entry in _insert(chunk, created_by):
+                report[entry['row'] - 1] = entry
+    return {
+        'created': sum(entry['status'] == 'created' for entry in report),
+        'errors': sum(entry['status'] == 'error' for entry in report),
+        'rows': report,
+    }
@@ -0,0 +1,102 @@
+"""
+Transactional outbox.
+
+Side effects of a posting (notifications, rollups, audit, cache updates)
+are not run in the request. Instead ``publish()`` writes an OutboxEvent in
+the same ``transaction.atomic()`` block as the Transaction rows, so an
+event exists if and only if the posting committed. ``manage.py
+run_outbox_worker`` drains the table in batches with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so several workers can run side by
+side without taking each other's events.
+
+Delivery is at-least-once: handlers must be idempotent.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import sharding
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+MAX_BACKOFF = timedelta(minutes=15)
+
+
+def register(topic):
+    """Decorator: register ``fn(payload)`` as a handler for ``topic``."""
+    def decorator(fn):
+        _handlers.setdefault(topic, []).append(fn)
+        return fn
+    return decorator
+
+
+def publish(topic, payload):
+    """Queue one event; call inside the posting's atomic block."""
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def publish_many(topic, payloads):
+    """Queue many events with one INSERT."""
+    return OutboxEvent.objects.bulk_create(
+        [OutboxEvent(topic=topic, payload=p) for p in payloads]
+    )
+
+
+def transaction_payload(txn):
+    """Event payload for a posted Transaction."""
+    return {
+        'transaction_id': txn.id,
+        'account_id': txn.account_id,
+        'transaction_type': txn.transaction_type,
+        'amount': str(txn.amount),
+        'balance_after': str(txn.balance_after),
+        'description': txn.description,
+        'reference_id': txn.reference_id,
+        'timestamp': txn.timestamp.isoformat(),
+    }
+
+
+def process_batch(batch_size=100):
+    """
+    Claim and deliver up to ``batch_size`` due events; return how many were claimed.
+
+    Each handler runs in its own savepoint: a failing event is rescheduled
+    with exponential backoff without undoing the rest of the batch. Drains
+    the ledger database of the current context (see sharding.py).
+    """
+    now = timezone.now()
+    alias = sharding.db()
+    with transaction.atomic(using=alias):
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        for event in events:
+            try:
+                with transaction.atomic(using=alias):
+                    for handler in _handlers.get(event.topic, ()):
+                        handler(event.payload)
+            except Exception as exc:
+                event.attempts += 1
+                event.available_at = now + min(timedelta(seconds=2 ** event.attempts), MAX_BACKOFF)
+                event.last_error = repr(exc)[:500]
+                logger.exception('Outbox event %s (%s) failed', event.id, event.topic)
+            else:
+                event.processed_at = now
+        OutboxEvent.objects.bulk_update(
+            events, ['attempts', 'available_at', 'last_error', 'processed_at']
+        )
+    return len(events)
+
+
+def purge_processed(older_than):
+    """Delete delivered events processed before ``timezone.now() - older_than``."""
+    return OutboxEvent.objects.filter(
+        processed_at__lt=timezone.now() - older_than
+    ).delete()[0]
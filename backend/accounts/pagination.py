@@ -0,0 +1,41 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+class PortfolioPagination(PageNumberPagination):
+    """Page-number pagination for the RM customer portfolio list."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Admin paginator that avoids exact COUNT(*) on big unfiltered tables.
+
+    On PostgreSQL an unfiltered changelist uses the planner's row estimate
+    from pg_class when it exceeds APPROXIMATE_COUNT_THRESHOLD; filtered
+    querysets and small tables keep an exact count.
+    """
+    APPROXIMATE_COUNT_THRESHOLD = 100_000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if (
+            isinstance(qs, QuerySet)
+            and not qs.query.where
+            and connections[qs.db].vendor == 'postgresql'
+        ):
+            with connections[qs.db].cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                    [qs.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.APPROXIMATE_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
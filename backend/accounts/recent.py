@@ -0,0 +1,111 @@
+"""
+Per-customer cache of the latest transactions.
+
+The customer dashboard and the first page of a statement only need a
+customer's newest few postings. ``latest(user, n)`` serves them from a
+bounded ring buffer of the RECENT_TRANSACTIONS_SIZE newest rows per user,
+kept in the RECENT_TRANSACTIONS_CACHE cache: postings push their rows in
+on commit and the oldest fall off; a missing buffer is rebuilt with one
+query. The cache's own eviction decides which users stay cached —
+LocMemCache (MAX_ENTRIES) and Redis with an ``allkeys-lru`` policy both
+drop the least recently read buffers first.
+
+Buffers are only written under a short per-user lock. A posting that
+cannot take the lock marks the buffer dirty and drops it, and the lock
+holder re-checks the mark before releasing, so a buffer that could be
+missing a committed posting never survives. Buffers also expire after
+RECENT_TRANSACTIONS_TTL seconds, which bounds how long postings made by
+another process stay invisible with the per-process LocMemCache; set
+REDIS_URL to share one cache.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from . import sharding
+from .fast_serializers import TransactionValuesSerializer
+from .models import Transaction
+
+LOCK_SECONDS = 5
+
+
+def _cache():
+    return caches[settings.RECENT_TRANSACTIONS_CACHE]
+
+
+def _key(user_id, part='rows'):
+    return f'recent:{part}:{user_id}'
+
+
+def _newest(rows):
+    """The RECENT_TRANSACTIONS_SIZE newest rows, newest first."""
+    rows = sorted(rows, key=lambda row: (row[-1], row[0]), reverse=True)
+    return rows[:settings.RECENT_TRANSACTIONS_SIZE]
+
+
+@contextmanager
+def _locked(user_id):
+    """Yield whether this caller holds ``user_id``'s buffer lock."""
+    cache = _cache()
+    held = cache.add(_key(user_id, 'lock'), True, timeout=LOCK_SECONDS)
+    try:
+        yield held
+    finally:
+        if held:
+            if cache.get(_key(user_id, 'dirty')):
+                cache.delete_many([_key(user_id), _key(user_id, 'dirty')])
+            cache.delete(_key(user_id, 'lock'))
+
+
+def _query(user, n):
+    rows = TransactionValuesSerializer().values(
+        Transaction.objects.filter(account__user=user).order_by('-timestamp', '-id'))
+    return list(rows[:n])
+
+
+def latest(user, n):
+    """``user``'s ``n`` newest transactions as TransactionValuesSerializer rows."""
+    size = settings.RECENT_TRANSACTIONS_SIZE
+    if n > size:
+        return _query(user, n)
+    cache = _cache()
+    rows = cache.get(_key(user.id))
+    if rows is None:
+        with _locked(user.id) as held:
+            rows = _query(user, size)
+            if held:
+                cache.set(_key(user.id), rows, timeout=settings.RECENT_TRANSACTIONS_TTL)
+    return rows[:n]
+
+
+# ─── Updates ────────────────────────────────────────────────────────
+def _push(rows_by_user):
+    cache = _cache()
+    for user_id, rows in rows_by_user.items():
+        with _locked(user_id) as held:
+            if not held:
+                # Someone else is writing this buffer; make sure it is dropped.
+                cache.set(_key(user_id, 'dirty'), True, timeout=LOCK_SECONDS)
+                cache.delete(_key(user_id))
+                continue
+            buffer = cache.get(_key(user_id))
+            if buffer is not None:
+                merged = {row[0]: row for row in chain(buffer, rows)}
+                cache.set(_key(user_id), _newest(merged.values()),
+                          timeout=settings.RECENT_TRANSACTIONS_TTL)
+
+
+def record(txns):
+    """Push freshly posted ``txns`` (``account`` loaded) into their owners' buffers on commit."""
+    rows_by_user = defaultdict(list)
+    for txn in txns:
+        account = txn.account
+        rows_by_user[account.user_id].append((
+            txn.id, account.account_number, txn.transaction_type, txn.amount,
+            txn.balance_after, txn.description, txn.reference_id, txn.timestamp,
+        ))
+    transaction.on_commit(lambda: _push(rows_by_user), using=sharding.db())
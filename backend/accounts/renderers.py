@@ -0,0 +1,57 @@
+"""
+Fast JSON renderer backed by orjson.
+
+Drop-in replacement for DRF's JSONRenderer: output is byte-for-byte the
+same for compact responses. Types orjson does not handle natively
+(Decimal, datetimes, lazy strings, querysets …) are delegated to DRF's
+own encoder, so Decimals stay exact strings and datetimes keep DRF's
+ISO-8601 formatting.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stock renderer
+    orjson = None
+
+
+_drf_encoder = JSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that serializes with orjson when it can."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+
+        # orjson only supports compact, UTF-8 output; anything else
+        # (e.g. the browsable API's indent=4) goes through DRF.
+        if orjson is None or indent is not None or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_drf_encoder.default, option=ORJSON_OPTIONS)
+
+        # Match DRF: escape separators that are valid JSON but not valid JS.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets a streaming view accept ``Accept: text/event-stream``. Only error
+    responses are rendered here, as a single 'error' event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b'event: error\ndata: ' + ORJSONRenderer().render(data) + b'\n\n'
@@ -0,0 +1,313 @@
+"""
+Refresh-token revocation.
+
+Refresh tokens rotate (SIMPLE_JWT['ROTATE_REFRESH_TOKENS']): ``consume()``
+revokes the presented token as it is exchanged, so a copied token stops
+working the first time either copy is used, and logout revokes one
+explicitly. 'Log out everywhere' stores a per-user cutoff instead: every
+token the user was issued before it is refused, access tokens included
+(see authentication.py).
+
+Checks stay off the database. Each process keeps the revoked jtis in a
+Bloom filter (REVOCATION_BLOOM_CAPACITY jtis at REVOCATION_BLOOM_ERROR
+false positives, ~1.8 MB for a million) and the cutoffs in a dict. A jti
+the filter has not seen was never revoked; only a hit is confirmed against
+the RevokedToken table. A revocation goes into the process's own filter at
+once; a background thread writes them to the table in batches every
+REVOCATION_SYNC_SECONDS and pulls in the revocations and cutoffs other
+processes wrote, which bounds how long another process may still accept a
+token revoked elsewhere. With REVOCATION_SYNC_SECONDS = None revocations
+are written through and nothing is pulled (one process only).
+
+RevokedToken rows are just the jti (a UUID key) and the token's expiry.
+``manage.py compact_revocations`` deletes rows and cutoffs that no live
+token can match; a Bloom filter cannot forget, so each process rebuilds
+its filter from the table every REVOCATION_REBUILD_SECONDS.
+"""
+import atexit
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken, TokenCutoff
+
+logger = logging.getLogger(__name__)
+
+# Re-read this much before the last sync: rows committed late or stamped
+# by a host whose clock is behind.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+_start_lock = threading.Lock()
+_filter = None         # BloomFilter of revoked jtis; None until first built
+_pending = {}          # jti -> expiry, revoked here but not written yet
+_journal = None        # jtis revoked here while a rebuild is loading
+_cutoffs = {}          # user id claim -> 'log out everywhere' timestamp
+_synced_at = None      # revoked_at watermark of the last sync
+_rebuild_due = 0.0     # time.monotonic() of the next rebuild
+_worker = None
+
+
+class BloomFilter:
+    """Fixed-size set of byte strings with false positives but no false negatives."""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _probes(self, key):
+        # Double hashing: two 64-bit halves of one digest give every probe.
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for bit in self._probes(key):
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[bit >> 3] & (1 << (bit & 7)) for bit in self._probes(key))
+
+
+def _jti(token):
+    return uuid.UUID(token[api_settings.JTI_CLAIM])
+
+
+def _expiry(token):
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+
+# ─── Checks ─────────────────────────────────────────────────────────
+def logged_out(token):
+    """True if ``token`` was issued before its user last logged out everywhere."""
+    _ensure_started()
+    cutoff = _cutoffs.get(str(token.get(api_settings.USER_ID_CLAIM)))
+    # iat has whole seconds: tokens issued later in the cutoff's second go too.
+    return cutoff is not None and token.get('iat', 0) <= cutoff
+
+
+def is_revoked(token):
+    """True if refresh ``token`` was rotated, logged out or issued before a 'log out everywhere'."""
+    return logged_out(token) or _seen(_jti(token))
+
+
+def _seen(jti):
+    with _lock:
+        if jti in _pending:
+            return True
+        if _filter is not None and jti.bytes not in _filter:
+            return False
+    # A filter hit (or no filter yet): the table has the answer.
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+# ─── Revoking ───────────────────────────────────────────────────────
+def consume(token):
+    """
+    Revoke refresh ``token`` as it is rotated. Returns False, revoking
+    nothing, if it was already revoked: the token was used twice.
+    """
+    if logged_out(token):
+        return False
+    jti = _jti(token)
+    with _lock:
+        fresh = _filter is not None and jti not in _pending and jti.bytes not in _filter
+        if fresh:
+            _remember(jti, _expiry(token))
+    if not fresh:
+        if _seen(jti):
+            return False
+        with _lock:
+            if jti in _pending:
+                return False
+            _remember(jti, _expiry(token))
+    _written()
+    return True
+
+
+def revoke(token):
+    """Revoke refresh ``token`` (logout); revoking it twice is harmless."""
+    _ensure_started()
+    jti = _jti(token)
+    with _lock:
+        if jti not in _pending:
+            _remember(jti, _expiry(token))
+    _written()
+
+
+def log_out_everywhere(user):
+    """Refuse every token issued to ``user`` so far, on every process within a sync."""
+    now = timezone.now()
+    TokenCutoff.objects.update_or_create(user_id=user.id, defaults={'not_before': now})
+    with _lock:
+        _cutoffs[str(user.id)] = now.timestamp()
+
+
+def _remember(jti, expires_at):
+    # Caller holds _lock.
+    _pending[jti] = expires_at
+    if _filter is not None:
+        _filter.add(jti.bytes)
+    if _journal is not None:
+        _journal.append(jti)
+
+
+def _written():
+    if settings.REVOCATION_SYNC_SECONDS is None:
+        flush()
+
+
+# ─── Syncing ────────────────────────────────────────────────────────
+def flush():
+    """Write this process's pending revocations; returns how many were written."""
+    with _flush_lock:
+        with _lock:
+            batch = dict(_pending)
+        if not batch:
+            return 0
+        now = timezone.now()
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=jti, expires_at=expires_at, revoked_at=now)
+             for jti, expires_at in batch.items()],
+            batch_size=1000, ignore_conflicts=True,
+        )
+        # Dropped only now, so a check in between still finds them here.
+        with _lock:
+            for jti in batch:
+                del _pending[jti]
+        return len(batch)
+
+
+def sync():
+    """Add revocations and cutoffs written since the last sync (by any process)."""
+    global _synced_at
+    if _synced_at is None:
+        return rebuild()
+    started = timezone.now()
+    since = _synced_at - SYNC_OVERLAP
+    jtis = list(RevokedToken.objects.filter(revoked_at__gte=since).values_list('jti', flat=True))
+    cutoffs = list(TokenCutoff.objects.filter(not_before__gte=since).values_list('user_id', 'not_before'))
+    with _lock:
+        for jti in jtis:
+            if jti.bytes not in _filter:  # the overlap re-reads rows
+                _filter.add(jti.bytes)
+        for user_id, not_before in cutoffs:
+            _cutoffs[str(user_id)] = max(_cutoffs.get(str(user_id), 0), not_before.timestamp())
+    _synced_at = started
+
+
+def rebuild():
+    """Rebuild this process's filter and cutoffs from the tables, leaving out expired tokens."""
+    with _rebuild_lock:
+        _rebuild()
+
+
+def _rebuild():
+    global _filter, _cutoffs, _journal, _synced_at, _rebuild_due
+    started = timezone.now()
+    with _lock:
+        _journal = []
+    try:
+        jtis = list(RevokedToken.objects.filter(expires_at__gt=started)
+                    .values_list('jti', flat=True).iterator(chunk_size=10000))
+        bloom = BloomFilter(max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(jtis)),
+                            settings.REVOCATION_BLOOM_ERROR)
+        for jti in jtis:
+            bloom.add(jti.bytes)
+        oldest = started - settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
+        cutoffs = {str(user_id): not_before.timestamp() for user_id, not_before
+                   in TokenCutoff.objects.filter(not_before__gt=oldest).values_list('user_id', 'not_before')}
+        recent = (started - SYNC_OVERLAP).timestamp()
+        with _lock:
+            # Whatever this process revoked while the tables were being read.
+            for jti in [*_journal, *_pending]:
+                bloom.add(jti.bytes)
+            for user_id, cutoff in _cutoffs.items():
+                if cutoff >= recent:
+                    cutoffs[user_id] = max(cutoffs.get(user_id, 0), cutoff)
+            _filter, _cutoffs = bloom, cutoffs
+    finally:
+        with _lock:
+            _journal = None
+    _synced_at = started
+    _rebuild_due = time.monotonic() + settings.REVOCATION_REBUILD_SECONDS
+
+
+def _run():
+    while True:
+        try:
+            close_old_connections()
+            flush()
+            if _filter is None or time.monotonic() >= _rebuild_due:
+                rebuild()
+            else:
+                sync()
+        except Exception:
+            logger.exception('Revocation sync failed; retrying')
+        time.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+
+def _ensure_started():
+    global _worker
+    if settings.REVOCATION_SYNC_SECONDS is None:
+        # No background thread: the request that finds the filter stale rebuilds it.
+        if (_filter is None or time.monotonic() >= _rebuild_due) and _rebuild_lock.acquire(blocking=False):
+            try:
+                _rebuild()
+            finally:
+                _rebuild_lock.release()
+        return
+    if _worker is not None and _worker.is_alive():
+        return
+    with _start_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='revocation-sync', daemon=True)
+            _worker.start()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception('Token revocations lost at exit')
+
+
+def _reset_in_child():
+    # A forked worker builds its own filter and runs its own sync thread.
+    global _lock, _flush_lock, _rebuild_lock, _start_lock, _filter, _journal, _synced_at, _worker
+    _lock, _flush_lock = threading.Lock(), threading.Lock()
+    _rebuild_lock, _start_lock = threading.Lock(), threading.Lock()
+    _pending.clear()
+    _cutoffs.clear()
+    _filter = _journal = _synced_at = _worker = None
+
+
+atexit.register(_flush_at_exit)
+os.register_at_fork(after_in_child=_reset_in_child)
+
+
+# ─── Compaction ─────────────────────────────────────────────────────
+def compact(now=None):
+    """Delete revocations of expired tokens and cutoffs older than any token; returns (rows, cutoffs)."""
+    now = now or timezone.now()
+    rows, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+    oldest = now - settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
+    cutoffs, _ = TokenCutoff.objects.filter(not_before__lte=oldest).delete()
+    return rows, cutoffs
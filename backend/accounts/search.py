@@ -0,0 +1,74 @@
+"""
+Server-side search for customers and transactions.
+
+Every column searched here uses ``icontains``. On PostgreSQL Django emits
+``UPPER(col::text) LIKE UPPER('%term%')``, which migration 0003 backs with
+GIN trigram indexes on the same ``UPPER(col)`` expressions, so substring
+search stays index-assisted on large tables. On SQLite the same queries
+run as plain LIKE scans, which is fine for local data sizes.
+"""
+from django.db.models import Exists, OuterRef, Q
+from rest_framework.exceptions import ValidationError
+
+from . import sharding
+from .models import Account
+
+SEARCH_MIN_LENGTH = 3  # trigrams need at least 3 characters to use the index
+SEARCH_MAX_WORDS = 5
+
+
+def _search_words(term):
+    words = term.split()[:SEARCH_MAX_WORDS]
+    if not words or any(len(w) < SEARCH_MIN_LENGTH for w in words):
+        raise ValidationError(
+            {'search': f'Each search word must be at least {SEARCH_MIN_LENGTH} characters.'}
+        )
+    return words
+
+
+def _account_match(word):
+    """Users with an account number containing ``word``, as a filter on User."""
+    if not sharding.enabled():
+        return Exists(Account.objects.filter(user=OuterRef('pk'), account_number__icontains=word))
+    # Accounts live on other databases: collect the owners from every shard.
+    owners = sharding.scatter(lambda alias: list(Account.objects.filter(
+        account_number__icontains=word).values_list('user_id', flat=True)))
+    return Q(pk__in={pk for ids in owners for pk in ids})
+
+
+def search_users(queryset, term):
+    """Filter users whose name, username, phone, email or account number match every word."""
+    for word in _search_words(term):
+        queryset = queryset.filter(
+            Q(first_name__icontains=word)
+            | Q(last_name__icontains=word)
+            | Q(username__icontains=word)
+            | Q(phone__icontains=word)
+            | Q(email__icontains=word)
+            | _account_match(word)
+        )
+    return queryset
+
+
+def search_transactions(queryset, term):
+    """Filter transactions whose description, reference ID or account number match every word."""
+    for word in _search_words(term):
+        queryset = queryset.filter(
+            Q(description__icontains=word)
+            | Q(reference_id__icontains=word)
+            | Q(account__account_number__icontains=word)
+        )
+    return queryset
+
+
+def transaction_matcher(term):
+    """
+    Python equivalent of search_transactions() for rows outside the table
+    (archived transactions): ``match(description, reference_id, account_number)``.
+    """
+    words = [w.upper() for w in _search_words(term)]
+
+    def match(*fields):
+        haystack = [f.upper() for f in fields]
+        return all(any(w in f for f in haystack) for w in words)
+    return match
@@ -1,5 +1,11 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.utils import timezone
 from rest_framework import serializers
-from .models import User, Account, Transaction, ServiceRequest
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from . import revocation
+from .models import User, Account, Transaction, ServiceRequest, StandingInstruction
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -35,6 +41,49 @@ class CreateUserSerializer(serializers.ModelSerializer):
         return user
 
 
+class OnboardCustomerSerializer(serializers.ModelSerializer):
+    """
+    One row of a bulk onboarding file. Username uniqueness is checked for
+    the whole file at once (see onboarding.py), not per row.
+    """
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    password = serializers.CharField(write_only=True, min_length=4, required=False, allow_blank=True)
+    account_type = serializers.ChoiceField(choices=Account.ACCOUNT_TYPES, default='savings')
+
+    class Meta:
+        model = User
+        fields = ['username', 'email', 'first_name', 'last_name',
+                  'password', 'phone', 'address', 'account_type']
+
+
+class OnboardingSerializer(serializers.Serializer):
+    """Serializer for a JSON bulk onboarding request."""
+    # Each supplied password costs a deliberately slow hash in the request
+    # thread; larger files go through manage.py onboard_customers.
+    MAX_PASSWORDS = 50
+
+    customers = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=5000
+    )
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate_customers(self, customers):
+        if sum(bool(row.get('password')) for row in customers) > self.MAX_PASSWORDS:
+            raise serializers.ValidationError(
+                f'At most {self.MAX_PASSWORDS} rows may set a password. Leave passwords blank '
+                '(each customer then gets an invite_token to choose one at /api/password/setup/) '
+                'or use manage.py onboard_customers.'
+            )
+        return customers
+
+
+class PasswordSetupSerializer(serializers.Serializer):
+    """Serializer for accepting an onboarding invite."""
+    username = serializers.CharField(max_length=150)
+    token = serializers.CharField(max_length=100)
+    password = serializers.CharField(write_only=True, min_length=4)
+
+
 class AccountSerializer(serializers.ModelSerializer):
     """Serializer for bank accounts."""
     account_type_display = serializers.CharField(
@@ -75,6 +124,49 @@ class ServiceRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'created_at', 'updated_at']
 
 
+class StandingInstructionSerializer(serializers.ModelSerializer):
+    """Serializer for a customer's recurring payments and sweeps."""
+    account = serializers.PrimaryKeyRelatedField(queryset=Account.objects.filter(is_active=True))
+    account_number = serializers.CharField(source='account.account_number', read_only=True)
+    kind_display = serializers.CharField(source='get_kind_display', read_only=True)
+    destination = serializers.PrimaryKeyRelatedField(
+        queryset=Account.objects.filter(is_active=True), required=False, allow_null=True
+    )
+    destination_number = serializers.CharField(
+        source='destination.account_number', read_only=True, default=None
+    )
+    # Payment amount, or the balance a sweep leaves on the account
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0)
+    frequency_display = serializers.CharField(source='get_frequency_display', read_only=True)
+
+    class Meta:
+        model = StandingInstruction
+        fields = ['id', 'account', 'account_number', 'kind', 'kind_display', 'destination',
+                  'destination_number', 'amount', 'description', 'frequency', 'frequency_display',
+                  'start_date', 'end_date', 'next_run', 'is_active', 'last_run_at', 'last_status',
+                  'created_at']
+        read_only_fields = ['id', 'next_run', 'is_active', 'last_run_at', 'last_status', 'created_at']
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        account, destination = attrs['account'], attrs.get('destination')
+        if account.user_id != user.id:
+            raise serializers.ValidationError({'account': 'Account not found.'})
+        if attrs.get('kind', 'payment') == 'sweep':
+            if destination is None or destination.user_id != user.id or destination == account:
+                raise serializers.ValidationError(
+                    {'destination': 'A sweep needs another of your accounts as destination.'})
+        elif destination is not None:
+            raise serializers.ValidationError({'destination': 'Only sweeps have a destination.'})
+        elif attrs['amount'] <= 0:
+            raise serializers.ValidationError({'amount': 'Must be greater than zero.'})
+        if attrs['start_date'] < timezone.localdate():
+            raise serializers.ValidationError({'start_date': 'Cannot be in the past.'})
+        if attrs.get('end_date') and attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError({'end_date': 'Must be on or after start_date.'})
+        return attrs
+
+
 class DepositSerializer(serializers.Serializer):
     """Serializer for deposit requests."""
     account_id = serializers.IntegerField()
@@ -87,3 +179,66 @@ class WithdrawSerializer(serializers.Serializer):
     account_id = serializers.IntegerField()
     amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=1)
     description = serializers.CharField(max_length=255, required=False, default='Cash Withdrawal')
+
+
+class TransferSerializer(serializers.Serializer):
+    """Serializer for fund transfer requests."""
+    from_account_id = serializers.IntegerField()
+    to_account_number = serializers.CharField(max_length=20)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=1)
+    description = serializers.CharField(max_length=200, required=False, default='Fund Transfer')
+
+
+class TransferBatchSerializer(serializers.Serializer):
+    """Serializer for batched fund transfers."""
+    transfers = TransferSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class QueueClaimSerializer(serializers.Serializer):
+    """Serializer for claiming service requests from the work queue."""
+    limit = serializers.IntegerField(min_value=1, max_value=100, required=False, default=10)
+
+
+class QueueStatusUpdateSerializer(serializers.Serializer):
+    """One status change in a bulk work-queue update."""
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=['completed', 'rejected', 'pending'])
+    remarks = serializers.CharField(required=False, allow_blank=True)
+
+
+class QueueBulkStatusSerializer(serializers.Serializer):
+    """Serializer for bulk work-queue status updates."""
+    updates = QueueStatusUpdateSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Serializer for batched read requests."""
+    requests = serializers.ListField(
+        child=serializers.CharField(max_length=500), min_length=1, max_length=20
+    )
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Stock refresh, except each refresh token works once (see revocation.py)."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        # As upstream: a deactivated user cannot mint new tokens.
+        user = User.objects.filter(**{
+            api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM),
+        }).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        if not revocation.consume(refresh):
+            raise InvalidToken('Token has been revoked.')
+        data = {'access': str(refresh.access_token)}
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        data['refresh'] = str(refresh)
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    """Serializer for revoking one refresh token."""
+    refresh = serializers.CharField()
@@ -0,0 +1,351 @@
+"""
+Optional horizontal sharding of the ledger.
+
+With LEDGER_SHARDS empty (the default) everything lives in ``default``
+and this module routes every query there. With shards configured:
+
+  directory  ``default`` keeps users, service requests, sessions and
+             admin data, plus each customer's home shard in User.shard
+             ('' = ``default``, i.e. data from before sharding)
+  ledger     a customer's accounts, slots, transactions, accruals,
+             archives, rollups, standing instructions and outbox events
+             live on their home shard, so every posting stays a
+             single-database transaction
+
+The shard key is the customer, not the account: all of a customer's
+accounts are together and never move one at a time. New customers are
+placed by user id; ``manage.py rebalance_shards`` moves customers later.
+Each customer's user row is mirrored on their shard so foreign keys hold.
+
+Routing: ShardRouter sends the sharded models to ``db()`` — an explicit
+``use(alias)`` block if one is active, otherwise the shard of the request
+user (set by LedgerShardMiddleware), otherwise ``default``. Code that opens
+transactions or connections for ledger work uses ``db()`` as its alias.
+RM and superadmin reads that span customers use ``scatter()``.
+
+Ids stay globally unique: migrate starts every ledger table's id sequence
+on the n-th database at n * 2**40 (``default`` is 0), so rows keep their
+ids when a customer moves.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections, transaction
+from django.db.models import AutoField, Q
+from django.db.models.signals import post_migrate
+
+SHARDED_MODELS = frozenset({
+    'account', 'balanceslot', 'transaction', 'interestaccrual',
+    'transactionarchive', 'dailyrollup', 'rollupcoverage', 'outboxevent',
+    'standinginstruction', 'instructionrun',
+})
+ID_RANGE = 2 ** 40
+
+_alias = ContextVar('ledger_alias', default=None)
+_request = ContextVar('ledger_request', default=None)
+_pool = None
+
+
+def enabled():
+    return bool(settings.LEDGER_SHARDS)
+
+
+def aliases():
+    """Every database that can hold ledger rows, ``default`` first."""
+    return tuple(dict.fromkeys((DEFAULT_DB_ALIAS, *settings.LEDGER_SHARDS)))
+
+
+def shard_of(user):
+    """Alias holding ``user``'s ledger rows."""
+    return getattr(user, 'shard', '') or DEFAULT_DB_ALIAS
+
+
+def db():
+    """Alias for ledger work in the current context."""
+    alias = _alias.get()
+    if alias is not None:
+        return alias
+    request = _request.get()
+    if request is not None:
+        return shard_of(getattr(request, 'user', None))
+    return DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use(alias):
+    """Route ledger models (and ``db()``) to ``alias`` inside the block."""
+    token = _alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _alias.reset(token)
+
+
+def for_user(user):
+    return use(shard_of(user))
+
+
+def bind(iterable):
+    """Iterate ``iterable`` routed to the current ``db()``, e.g. a streamed response body."""
+    alias = db()
+
+    def routed():
+        with use(alias):
+            yield from iterable
+    return routed()
+
+
+def _scatter_one(fn, alias):
+    # Pool threads keep their connections between tasks; honour CONN_MAX_AGE.
+    close_old_connections()
+    try:
+        with use(alias):
+            return fn(alias)
+    finally:
+        close_old_connections()
+
+
+def scatter(fn):
+    """
+    ``[fn(alias)]`` for every ledger database, each run routed to its alias.
+    With shards the calls run in parallel on a small thread pool; ``fn``
+    must evaluate its querysets before returning.
+    """
+    global _pool
+    targets = aliases()
+    if len(targets) == 1:
+        with use(targets[0]):
+            return [fn(targets[0])]
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix='scatter')
+    return list(_pool.map(lambda alias: _scatter_one(fn, alias), targets))
+
+
+# ─── Placement ──────────────────────────────────────────────────────
+def mirror_users(users, alias):
+    """Copy minimal rows for ``users`` to ``alias`` so ledger foreign keys resolve there."""
+    if alias == DEFAULT_DB_ALIAS:
+        return
+    User = apps.get_model('accounts', 'User')
+    existing = set(User.objects.using(alias).filter(
+        id__in=[u.id for u in users]).values_list('id', flat=True))
+    User.objects.using(alias).bulk_create([
+        User(id=u.id, username=u.username, first_name=u.first_name, last_name=u.last_name,
+             role=u.role, shard=alias, date_joined=u.date_joined, password=make_password(None))
+        for u in users if u.id not in existing
+    ])
+
+
+def place(users):
+    """Give customers without a home shard one (by user id) and mirror them there."""
+    User = apps.get_model('accounts', 'User')
+    shards = settings.LEDGER_SHARDS
+    new = [u for u in users if not u.shard] if shards else []
+    for user in new:
+        user.shard = shards[user.id % len(shards)]
+    User.objects.bulk_update(new, ['shard'])
+    for alias in {u.shard for u in new}:
+        mirror_users([u for u in new if u.shard == alias], alias)
+
+
+# ─── Routing ────────────────────────────────────────────────────────
+def is_sharded(model):
+    return model._meta.app_label == 'accounts' and model._meta.model_name in SHARDED_MODELS
+
+
+class ShardRouter:
+    """Ledger models go to ``db()`` (or their instance's database); the rest to default."""
+
+    def _route(self, model, **hints):
+        if not is_sharded(model):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and is_sharded(type(instance)) and instance._state.db:
+            return instance._state.db
+        return db()
+
+    db_for_read = db_for_write = _route
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Users are mirrored onto shards, so relations to them always hold.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class LedgerShardMiddleware:
+    """Routes the request's ledger queries to the authenticated user's shard."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+
+# ─── Id ranges ──────────────────────────────────────────────────────
+def _id_floor(alias):
+    return aliases().index(alias) * ID_RANGE if alias in aliases() else 0
+
+
+def _sharded_tables():
+    """Tables of sharded models with a generated id (RollupCoverage is keyed by transaction id)."""
+    return [m._meta.db_table for m in apps.get_app_config('accounts').get_models()
+            if is_sharded(m) and isinstance(m._meta.pk, AutoField)]
+
+
+def _reset_sqlite_sequence(cursor, table, floor):
+    # Explicit ids copied in from another range move SQLite's AUTOINCREMENT
+    # counter past them; put it back inside this database's own range.
+    cursor.execute(f'SELECT MAX(id) FROM "{table}" WHERE id >= %s AND id < %s',
+                   [floor, floor + ID_RANGE])
+    seq = cursor.fetchone()[0] or max(floor - 1, 0)
+    cursor.execute('DELETE FROM sqlite_sequence WHERE name = %s', [table])
+    cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', [table, seq])
+
+
+def reserve_id_range(using, **kwargs):
+    """post_migrate: start this database's ledger id sequences inside its range."""
+    floor = _id_floor(using)
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for table in _sharded_tables():
+            if connection.vendor == 'sqlite':
+                _reset_sqlite_sequence(cursor, table, floor)
+            elif connection.vendor == 'postgresql' and floor:
+                cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM "{table}"')
+                if cursor.fetchone()[0] < floor:
+                    cursor.execute("SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, false)",
+                                   [table, floor])
+
+
+def connect_signals(sender):
+    post_migrate.connect(reserve_id_range, sender=sender)
+
+
+# ─── Rebalancing ────────────────────────────────────────────────────
+COPY_CHUNK = 2000
+
+# Copy order respects foreign keys; deletes run in reverse.
+LEDGER_TABLES = (
+    ('account', 'id'),
+    ('balanceslot', 'account_id'),
+    ('transaction', 'account_id'),
+    ('interestaccrual', 'account_id'),
+    ('transactionarchive', 'account_id'),
+    ('dailyrollup', 'account_id'),
+    ('rollupcoverage', 'account_id'),
+    ('standinginstruction', 'account_id'),
+    ('instructionrun', 'instruction__account_id'),
+)
+
+
+def _ledger_rows(alias, account_ids):
+    for model_name, key in LEDGER_TABLES:
+        model = apps.get_model('accounts', model_name)
+        yield model, model.objects.using(alias).filter(**{f'{key}__in': account_ids})
+
+
+def _pending_events(alias, account_ids):
+    """Undelivered outbox events about ``account_ids`` (postings and outgoing transfers)."""
+    OutboxEvent = apps.get_model('accounts', 'OutboxEvent')
+    return OutboxEvent.objects.using(alias).filter(processed_at__isnull=True).filter(
+        Q(payload__account_id__in=account_ids) | Q(payload__source_id__in=account_ids))
+
+
+def _copy_rows(queryset, target):
+    """INSERT ``queryset``'s rows into ``target`` as they are (same ids, no auto_now)."""
+    model = queryset.model
+    fields = model._meta.concrete_fields
+    connection = connections[target]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table), ', '.join(quote(f.column) for f in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    rows = queryset.order_by('pk').values_list(*[f.attname for f in fields]).iterator(COPY_CHUNK)
+    copied = 0
+    with connection.cursor() as cursor:
+        while chunk := list(islice(rows, COPY_CHUNK)):
+            cursor.executemany(sql, [
+                [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+                for row in chunk
+            ])
+            copied += len(chunk)
+    return copied
+
+
+def _delete_rows(alias, account_ids):
+    """Delete a customer's ledger rows from ``alias``, children first, in bounded chunks."""
+    for model, queryset in reversed(list(_ledger_rows(alias, account_ids))):
+        ids = list(queryset.values_list('pk', flat=True))
+        for start in range(0, len(ids), COPY_CHUNK):
+            model.objects.using(alias).filter(pk__in=ids[start:start + COPY_CHUNK]).delete()
+    _pending_events(alias, account_ids).delete()
+
+
+def purge_copies(user):
+    """Remove ``user``'s ledger rows from every database except their home shard."""
+    home = shard_of(user)
+    Account = apps.get_model('accounts', 'Account')
+    for alias in aliases():
+        if alias == home:
+            continue
+        ids = list(Account.objects.using(alias).filter(user_id=user.id).values_list('id', flat=True))
+        if ids:
+            with transaction.atomic(using=alias):
+                _delete_rows(alias, ids)
+
+
+def move_customer(user, target):
+    """
+    Move ``user``'s accounts and everything hanging off them to ``target``.
+    Returns rows copied (0 when already there).
+
+    The source accounts stay locked while they are copied. Commit order makes
+    an interrupted move safe to re-run: the copy commits on ``target``, then
+    the directory (User.shard) flips, then the source rows are deleted; a
+    re-run discards half-done copies, or purges leftovers once the user
+    already lives on ``target``.
+    """
+    User = apps.get_model('accounts', 'User')
+    Account = apps.get_model('accounts', 'Account')
+    source = shard_of(user)
+    if source == target:
+        purge_copies(user)
+        return 0
+
+    mirror_users([user], target)
+    copied = 0
+    with transaction.atomic(using=source):
+        # Block postings, slot credits and outbox deliveries on these accounts.
+        account_ids = list(Account.objects.using(source).select_for_update()
+                           .filter(user_id=user.id).order_by('id').values_list('id', flat=True))
+        BalanceSlot = apps.get_model('accounts', 'BalanceSlot')
+        list(BalanceSlot.objects.using(source).select_for_update()
+             .filter(account_id__in=account_ids).order_by('id').values_list('id'))
+        list(_pending_events(source, account_ids).select_for_update().values_list('id'))
+        with transaction.atomic(using=target):
+            stale = list(Account.objects.using(target).filter(user_id=user.id).values_list('id', flat=True))
+            _delete_rows(target, stale)
+            for _, queryset in _ledger_rows(source, account_ids):
+                copied += _copy_rows(queryset, target)
+            copied += _copy_rows(_pending_events(source, account_ids), target)
+            if connections[target].vendor == 'sqlite':
+                with connections[target].cursor() as cursor:
+                    for table in _sharded_tables():
+                        _reset_sqlite_sequence(cursor, table, _id_floor(target))
+        user.shard = '' if target == DEFAULT_DB_ALIAS else target
+        User.objects.filter(pk=user.pk).update(shard=user.shard)
+        _delete_rows(source, account_ids)
+    return copied
@@ -0,0 +1,184 @@
+"""
+Standing instructions: recurring payments (EMIs, bills) and sweeps.
+
+``manage.py run_standing_instructions`` runs every active instruction whose
+``next_run`` is on or before the run date. The due query is a range scan on
+the partial ``si_due_idx`` index for (id, account) pairs, which are sorted
+by account and cut into chunks that never split an account, so each chunk
+is one DB transaction that locks its accounts once (canonical order, see
+ledger.lock_accounts) however many instructions they have.
+
+Within a chunk instructions run in (account, id) order against running
+balances: a payment that the balance cannot cover fails, a sweep moves
+whatever is above its threshold to the destination account. All postings
+of the chunk go in with one bulk INSERT, one InstructionRun row per
+instruction records the outcome, and ``next_run`` advances one period for
+every instruction with a few grouped UPDATEs — failed runs included, so a
+bounced EMI is not retried the next day. Instructions are pre-authorised
+by the customer and not counted against the debit limits (see limits.py).
+Every posting is audited in the customer's name once the chunk commits.
+
+Instructions are re-read under the lock, and (instruction, run_date) is
+unique, so overlapping runs cannot execute a date twice. Instructions that
+fell more than one period behind catch up one period per pass; the command
+repeats passes until nothing is due.
+"""
+import calendar
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import audit, batch, ledger, sharding
+from .models import InstructionRun, StandingInstruction
+
+
+def next_date(instruction):
+    """The run date after ``instruction.next_run``."""
+    day = instruction.next_run
+    if instruction.frequency == 'daily':
+        return day + timedelta(days=1)
+    if instruction.frequency == 'weekly':
+        return day + timedelta(days=7)
+    year, month = divmod(day.year * 12 + day.month, 12)  # the following month
+    month += 1
+    last_day = calendar.monthrange(year, month)[1]
+    return day.replace(year=year, month=month, day=min(instruction.start_date.day, last_day))
+
+
+def due(until):
+    """(id, account id) of every active instruction due on or before ``until``, by account."""
+    rows = (StandingInstruction.objects.filter(is_active=True, next_run__lte=until)
+            .order_by().values_list('id', 'account_id'))
+    # Sorted here: ORDER BY account_id would steer the planner off si_due_idx.
+    return sorted(rows, key=lambda row: (row[1], row[0]))
+
+
+def account_chunks(rows, size):
+    """Cut (id, account id) rows into id lists of about ``size``, never splitting an account."""
+    chunks, current, last_account = [], [], None
+    for instruction_id, account_id in rows:
+        if len(current) >= size and account_id != last_account:
+            chunks.append(current)
+            current = []
+        current.append(instruction_id)
+        last_account = account_id
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _execute(instructions, accounts):
+    """Decide every instruction's outcome; returns (ledger entries, [(run, entry index)])."""
+    available = {account_id: account.balance for account_id, account in accounts.items()}
+    entries, runs = [], []
+    for si in instructions:
+        run = InstructionRun(instruction=si, run_date=si.next_run, status='completed')
+        source = accounts.get(si.account_id)
+        amount = si.amount
+        if si.kind == 'sweep':
+            destination = accounts.get(si.destination_id)
+            amount = available[si.account_id] - si.amount if source else 0
+            if destination is None:
+                run.status, run.error = 'failed', 'Destination account not found or not active.'
+            elif amount <= 0:
+                run.status = 'skipped'
+        if source is None:
+            run.status, run.error = 'failed', 'Account not found or not active.'
+        elif run.status == 'completed' and si.kind == 'payment' and available[si.account_id] < amount:
+            run.status, run.error = 'failed', 'Insufficient balance.'
+
+        index = None
+        if run.status == 'completed':
+            run.amount = amount
+            available[si.account_id] -= amount
+            index = len(entries)
+            entries.append((si.account_id, 'debit', amount, si.description))
+            if si.kind == 'sweep':
+                available[si.destination_id] += amount
+                entries.append((si.destination_id, 'credit', amount, si.description))
+        runs.append((run, index))
+    return entries, runs
+
+
+def run_chunk(instruction_ids, until):
+    """
+    Execute one chunk of due instructions in one transaction.
+    Returns {'completed': n, 'failed': n, 'skipped': n, 'amount': Decimal}.
+    """
+    now = timezone.now()
+    counts = {'completed': 0, 'failed': 0, 'skipped': 0, 'amount': 0}
+    with transaction.atomic(using=sharding.db()):
+        # Re-check under the lock so an overlapping run cannot execute them twice.
+        instructions = list(
+            StandingInstruction.objects.select_for_update()
+            .filter(id__in=instruction_ids, is_active=True, next_run__lte=until)
+            .order_by('account_id', 'id')
+        )
+        if not instructions:
+            return counts
+        accounts = ledger.lock_accounts(
+            {si.account_id for si in instructions}
+            | {si.destination_id for si in instructions if si.destination_id},
+            strict=False,
+        )
+        entries, runs = _execute(instructions, accounts)
+        txns = ledger.post_locked_entries(accounts, entries)
+        events = []
+        for run, index in runs:
+            if index is not None:
+                run.transaction = txns[index]
+                si = run.instruction
+                owner = accounts[si.account_id].user_id
+                events.append(audit.posting('standing_instruction.debit', owner, txns[index],
+                                            instruction_id=si.id))
+                if si.kind == 'sweep':
+                    events.append(audit.posting('standing_instruction.credit', owner, txns[index + 1],
+                                                instruction_id=si.id))
+        InstructionRun.objects.bulk_create([run for run, _ in runs], batch_size=1000)
+        audit.record_many(events, using=sharding.db())
+
+        # Few distinct outcomes per chunk: one UPDATE each instead of one per row.
+        advanced = defaultdict(list)
+        for si, (run, _) in zip(instructions, runs):
+            next_run = next_date(si)
+            is_active = not (si.end_date and next_run > si.end_date)
+            advanced[next_run, run.status, is_active].append(si.id)
+            counts[run.status] += 1
+            counts['amount'] += run.amount
+        for (next_run, last_status, is_active), ids in advanced.items():
+            StandingInstruction.objects.filter(id__in=ids).update(
+                next_run=next_run, last_run_at=now, last_status=last_status, is_active=is_active,
+            )
+    return counts
+
+
+def _run_chunk(args):
+    return run_chunk(*args)
+
+
+def run_due(until=None, workers=1, chunk_size=1000, progress=None):
+    """
+    Run every instruction due on or before ``until`` (default: today).
+
+    Chunks are spread over ``workers`` processes (see batch.py); ledger
+    shards are processed one after another. ``progress(counts)`` is called
+    after every committed chunk. Returns the summed counts.
+    """
+    until = until or timezone.localdate()
+    totals = {'completed': 0, 'failed': 0, 'skipped': 0, 'amount': 0}
+    for alias in sharding.aliases():
+        with sharding.use(alias):
+            while rows := due(until):
+                executed = 0
+                chunks = [(chunk, until) for chunk in account_chunks(rows, chunk_size)]
+                for counts in batch.run_chunks(_run_chunk, chunks, workers):
+                    executed += counts['completed'] + counts['failed'] + counts['skipped']
+                    for key in totals:
+                        totals[key] += counts[key]
+                    if progress:
+                        progress(counts)
+                if not executed:
+                    break
+    return totals
@@ -0,0 +1,1101 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import time as time_module
+import uuid
+import zlib
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import QuerySet, Sum
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import (analytics, audit, batch, interest, ledger, limits, live, middleware, outbox, recent,
+                      revocation, sharding, standing)
+from accounts.models import (Account, AuditEntry, DailyRollup, InterestAccrual, OutboxEvent, RevokedToken,
+                             RollupCoverage, ServiceRequest, StandingInstruction, TokenCutoff, Transaction,
+                             User)
+from accounts.fast_serializers import (
+    AccountValuesSerializer, PortfolioValuesSerializer, QueueItemValuesSerializer,
+    ServiceRequestValuesSerializer, StandingInstructionValuesSerializer, TransactionValuesSerializer,
+    UserValuesSerializer,
+)
+from accounts.search import search_transactions, search_users
+from accounts.serializers import (
+    AccountSerializer, OnboardingSerializer, ServiceRequestSerializer, StandingInstructionSerializer,
+    TransactionSerializer, UserSerializer,
+)
+from accounts.renderers import ORJSONRenderer
+from accounts.views import with_portfolio_summary
+
+
+def make_account(user, balance='0.00', slots=0):
+    account = Account.objects.create(user=user, balance=Decimal(balance))
+    if slots:
+        account = ledger.set_balance_slots(account.id, slots)
+    return account
+
+
+def slot_balances(account):
+    return list(account.slots.order_by('slot').values_list('balance', flat=True))
+
+
+# ─── Fast serializers match their ModelSerializers ──────────────────
+class ValuesSerializerTests(TestCase):
+
+    def setUp(self):
+        self.rm = User.objects.create(username='rm_values', role='rm', first_name='Priya')
+        named = User.objects.create(username='named', role='customer', first_name='Ravi',
+                                    last_name='Kumar', email='ravi@example.com', created_by=self.rm)
+        User.objects.create(username='unnamed', role='customer', created_by=None, is_active=False)
+        savings = Account.objects.create(user=named, balance=Decimal('1050.75'))
+        current = Account.objects.create(user=named, account_type='current', balance=Decimal('0.1'))
+        for amount, reference in (('1234.50', 'TXN1'), ('0.05', '')):
+            Transaction.objects.create(account=savings, transaction_type='debit', amount=Decimal(amount),
+                                       balance_after=Decimal('99999999.99'), description='UPI',
+                                       reference_id=reference)
+        # Microseconds and a UTC offset both go through DRF's datetime formatting.
+        Transaction.objects.update(timestamp=timezone.now().replace(microsecond=123456))
+        ServiceRequest.objects.create(user=named, service_type='cheque_book', remarks='')
+        ServiceRequest.objects.create(user=named, service_type='cheque_book', status='in_progress',
+                                      remarks='Posted', assigned_to=self.rm, claimed_at=timezone.now())
+        StandingInstruction.objects.create(account=savings, amount=Decimal('500'), start_date=date(2026, 11, 1),
+                                           next_run=date(2026, 11, 1))
+        StandingInstruction.objects.create(account=savings, kind='sweep', destination=current,
+                                           amount=Decimal('100.00'), start_date=date(2026, 11, 1),
+                                           end_date=date(2027, 11, 1), next_run=date(2026, 11, 1),
+                                           last_run_at=timezone.now(), last_status='skipped')
+
+    def assert_same(self, values_class, model_class, queryset):
+        values = values_class()
+        fast = values.serialize(values.values(queryset.order_by('id')))
+        expected = model_class(queryset.order_by('id'), many=True).data
+        self.assertTrue(fast)
+        for row, model_row in zip(fast, expected, strict=True):
+            self.assertEqual({key: row[key] for key in model_row}, dict(model_row))
+        return fast
+
+    def assert_all_same(self):
+        self.assert_same(UserValuesSerializer, UserSerializer, User.objects.all())
+        self.assert_same(AccountValuesSerializer, AccountSerializer, Account.objects.all())
+        self.assert_same(TransactionValuesSerializer, TransactionSerializer, Transaction.objects.all())
+        self.assert_same(ServiceRequestValuesSerializer, ServiceRequestSerializer,
+                         ServiceRequest.objects.all())
+        self.assert_same(StandingInstructionValuesSerializer, StandingInstructionSerializer,
+                         StandingInstruction.objects.all())
+
+    def test_same_output_as_model_serializers(self):
+        self.assert_all_same()
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_same_output_in_utc(self):
+        self.assert_all_same()
+
+    def test_extended_serializers_keep_the_base_shape(self):
+        rows = self.assert_same(PortfolioValuesSerializer, UserSerializer,
+                                with_portfolio_summary(User.objects.filter(role='customer')))
+        self.assertEqual([(row['account_count'], row['total_balance']) for row in rows],
+                         [(2, '1050.85'), (0, '0.00')])
+        rows = self.assert_same(QueueItemValuesSerializer, ServiceRequestSerializer,
+                                ServiceRequest.objects.all())
+        self.assertEqual([row['claimed_at'] is None for row in rows], [True, False])
+
+
+# ─── Hot accounts: consolidation never drops slot credits ───────────
+class ConsolidationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='hot_owner', role='customer')
+        self.hot = make_account(self.user, slots=4)
+        ledger.post_entry(self.hot.id, 'credit', Decimal('500.00'), 'Salary')
+        self.assertEqual(self.hot.live_balance(), Decimal('500.00'))
+
+    def assert_consolidated(self, account, balance):
+        account.refresh_from_db()
+        self.assertEqual(account.balance, Decimal(balance))
+        self.assertEqual(account.live_balance(), Decimal(balance))
+        self.assertEqual(slot_balances(account), [0, 0, 0, 0])
+
+    def test_interest_chunk_without_interest_keeps_slot_credits(self):
+        interest.accrue_chunk([self.hot.id], date(2026, 9, 1), Decimal('0'))
+        self.assert_consolidated(self.hot, '500.00')
+
+    def test_interest_chunk_skipping_accrued_account_keeps_slot_credits(self):
+        InterestAccrual.objects.create(account=self.hot, period_start=date(2026, 9, 1),
+                                       interest=Decimal('0'))
+        self.assertEqual(interest.accrue_chunk([self.hot.id], date(2026, 9, 1), Decimal('4')),
+                         (0, Decimal('0')))
+        self.assert_consolidated(self.hot, '500.00')
+
+    def test_failed_standing_instruction_keeps_slot_credits(self):
+        si = StandingInstruction.objects.create(
+            account=self.hot, amount=Decimal('900.00'), start_date=date(2026, 11, 1),
+            next_run=date(2026, 11, 1))
+        counts = standing.run_chunk([si.id], date(2026, 11, 1))
+        self.assertEqual((counts['completed'], counts['failed']), (0, 1))
+        self.assert_consolidated(self.hot, '500.00')
+
+    def test_skipped_sweep_keeps_slot_credits(self):
+        savings = make_account(self.user)
+        si = StandingInstruction.objects.create(
+            account=self.hot, kind='sweep', destination=savings, amount=Decimal('1000.00'),
+            start_date=date(2026, 11, 1), next_run=date(2026, 11, 1))
+        self.assertEqual(standing.run_chunk([si.id], date(2026, 11, 1))['skipped'], 1)
+        self.assert_consolidated(self.hot, '500.00')
+
+
+# ─── Hot accounts: slot credits ─────────────────────────────────────
+class SlotCreditTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='slot_owner', role='customer')
+
+    def test_slot_credit_posts_nothing_when_slots_are_gone(self):
+        stale = make_account(self.user, slots=4)
+        ledger.set_balance_slots(stale.id, 0)
+        self.assertIsNone(ledger._post_slot_credit(stale, Decimal('10.00'), 'Deposit'))
+        self.assertFalse(Transaction.objects.filter(account=stale).exists())
+
+    def test_credit_falls_back_to_locked_path_when_slots_are_gone(self):
+        account = make_account(self.user, slots=4)
+        ledger.post_entry(account.id, 'credit', Decimal('5.00'), 'Deposit')
+        real = ledger._post_slot_credit
+
+        def concurrent_reset(*args, **kwargs):
+            ledger.set_balance_slots(account.id, 0)  # lands between the read and the UPDATE
+            return real(*args, **kwargs)
+
+        with mock.patch.object(ledger, '_post_slot_credit', side_effect=concurrent_reset):
+            txn = ledger.post_entry(account.id, 'credit', Decimal('10.00'), 'Deposit')
+        account.refresh_from_db()
+        self.assertEqual(account.balance_slots, 0)
+        self.assertEqual(account.balance, Decimal('15.00'))
+        self.assertEqual(txn.balance_after, Decimal('15.00'))
+        self.assertEqual(Transaction.objects.filter(account=account).count(), 2)
+
+    def test_withdraw_folds_slot_credits_into_the_balance(self):
+        account = make_account(self.user, '10.00', slots=4)
+        for _ in range(3):
+            ledger.post_entry(account.id, 'credit', Decimal('30.00'), 'Deposit')
+        self.assertEqual(Account.objects.get(pk=account.pk).balance, Decimal('10.00'))  # credits sit in slots
+
+        api = APIClient()
+        api.force_authenticate(self.user)
+        withdraw = {'account_id': account.id, 'description': 'ATM'}
+        response = api.post('/api/withdraw/', {**withdraw, 'amount': '100.01'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Available: ₹100.00', response.data['detail'])
+        response = api.post('/api/withdraw/', {**withdraw, 'amount': '95.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['new_balance'], '5.00')
+        account.refresh_from_db()
+        self.assertEqual((account.balance, slot_balances(account)), (Decimal('5.00'), [0] * 4))
+
+
+# ─── Live updates ───────────────────────────────────────────────────
+class LiveStreamTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='live_owner', role='customer')
+        self.account = make_account(self.user, '100.00')
+
+    def test_replay_resends_overlap_before_last_event(self):
+        # The lower id commits last; the client already has the higher one.
+        late = ledger.post_entry(self.account.id, 'credit', Decimal('1.00'), 'Late commit')
+        seen = ledger.post_entry(self.account.id, 'credit', Decimal('2.00'), 'Seen')
+        newer = ledger.post_entry(self.account.id, 'credit', Decimal('3.00'), 'Missed')
+        replayed = [event['id'] for event in live._replay(self.user.id, seen.id)]
+        self.assertEqual(replayed, [late.id, seen.id, newer.id])
+
+    def test_replay_without_anchor_uses_later_ids(self):
+        txn = ledger.post_entry(self.account.id, 'credit', Decimal('1.00'), 'Deposit')
+        self.assertEqual([event['id'] for event in live._replay(self.user.id, txn.id - 1)], [txn.id])
+
+    @override_settings(LIVE_MAX_STREAMS=1)
+    def test_streams_are_capped_per_process(self):
+        first = live.open_stream(self.user.id)
+        self.assertIsNotNone(first)
+        self.assertIsNone(live.open_stream(self.user.id))
+
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.get('/api/live/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], str(live.RETRY_AFTER_SECONDS))
+
+        first.close()  # never iterated: the slot is still released
+        first.close()
+        second = live.open_stream(self.user.id)
+        self.assertIsNotNone(second)
+        second.close()
+
+
+# ─── Ledger verification ────────────────────────────────────────────
+class VerifyLedgerTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='audited_owner', role='customer')
+        self.account = make_account(self.user)
+        self.old = ledger.post_entry(self.account.id, 'credit', Decimal('50.00'), 'Deposit')
+        Transaction.objects.filter(pk=self.old.pk).update(timestamp=timezone.now() - timedelta(hours=1))
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.state = os.path.join(workdir.name, 'state.json')
+        self.output = os.path.join(workdir.name, 'mismatches.jsonl')
+
+    def verify(self, incremental=True):
+        call_command('verify_ledger', state=self.state, output=self.output, workers=1,
+                     incremental=incremental, stdout=io.StringIO())
+
+    def last_mark(self):
+        with open(self.state) as f:
+            return json.load(f)['last_transaction_id']
+
+    def test_mark_lags_recent_postings(self):
+        recent = ledger.post_entry(self.account.id, 'credit', Decimal('5.00'), 'Deposit')
+        self.verify(incremental=False)
+        # A posting that may still have had earlier ids in flight is not covered yet.
+        self.assertEqual(self.last_mark(), self.old.id)
+        self.assertLess(self.last_mark(), recent.id)
+
+    def test_state_is_kept_when_mismatches_are_found(self):
+        self.verify(incremental=False)
+        with open(self.state) as f:
+            before = f.read()
+        ledger.post_entry(self.account.id, 'credit', Decimal('5.00'), 'Deposit')
+        Account.objects.filter(pk=self.account.pk).update(balance=Decimal('1.00'))
+        for _ in range(2):  # reported again, not skipped by the second run
+            with self.assertRaises(CommandError):
+                self.verify()
+        with open(self.state) as f:
+            self.assertEqual(f.read(), before)
+
+
+# ─── Spending rollups ───────────────────────────────────────────────
+class RollupRebuildTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='rollup_owner', role='customer')
+        self.account = make_account(self.user, '1000.00')
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+
+    def post(self, amount, description, when):
+        txn = ledger.post_entry(self.account.id, 'debit', Decimal(amount), description)
+        Transaction.objects.filter(pk=txn.pk).update(timestamp=when)
+        event = OutboxEvent.objects.get(payload__transaction_id=txn.id)
+        event.payload['timestamp'] = when.isoformat()
+        event.save(update_fields=['payload'])
+        return event
+
+    def test_rebuild_counts_pending_postings_once(self):
+        noon = timezone.make_aware(datetime.combine(self.yesterday, time(12)))
+        pending = self.post('40.00', 'Swiggy order', noon)
+        self.post('7.00', 'Zomato order', timezone.now())  # today: left to the worker
+        analytics.rebuild_chunk([self.account.id], self.yesterday, timezone.localdate())
+        pending.refresh_from_db()
+        self.assertIsNone(pending.processed_at)  # still there for every handler
+
+        delivered = []
+        handlers = {'transaction.posted': [*outbox._handlers['transaction.posted'], delivered.append]}
+        with mock.patch.dict(outbox._handlers, handlers):
+            while outbox.process_batch():
+                pass
+        self.assertEqual(len(delivered), 2)
+        rollup = DailyRollup.objects.get(account=self.account, day=self.yesterday, category='food')
+        self.assertEqual((rollup.debit_total, rollup.debit_count), (Decimal('40.00'), 1))
+        self.assertEqual(DailyRollup.objects.get(account=self.account, day=timezone.localdate()).debit_count, 1)
+        self.assertFalse(RollupCoverage.objects.exists())
+
+
+# ─── Bulk onboarding API ────────────────────────────────────────────
+class OnboardingApiTests(TestCase):
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create(username='onboarding_rm', role='rm'))
+
+    def onboard(self, rows):
+        return self.api.post('/api/customers/onboard/', {'customers': rows}, format='json')
+
+    def test_passwords_are_hashed_in_the_request_thread(self):
+        with mock.patch.object(batch, 'run_chunks', wraps=batch.run_chunks) as run_chunks:
+            response = self.onboard([{'username': 'emp1', 'password': 'S3cret!pass'}, {'username': 'emp2'}])
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(run_chunks.call_args.args[2], 1)
+        self.assertTrue(User.objects.get(username='emp1').check_password('S3cret!pass'))
+
+    def test_customer_without_password_signs_in_through_the_invite(self):
+        response = self.onboard([{'username': 'invited'}])
+        self.assertEqual(response.status_code, 201, response.data)
+        entry = response.data['rows'][0]
+        login = {'username': 'invited', 'password': 'Chosen#123'}
+        self.assertEqual(APIClient().post('/api/token/', login, format='json').status_code, 401)
+
+        setup = {'username': 'invited', 'token': entry['invite_token'], 'password': 'Chosen#123'}
+        self.assertEqual(APIClient().post('/api/password/setup/', {**setup, 'token': 'x-y'},
+                                          format='json').status_code, 400)
+        self.assertEqual(APIClient().post('/api/password/setup/', setup, format='json').status_code, 200)
+        self.assertEqual(APIClient().post('/api/token/', login, format='json').status_code, 200)
+        # Single use: the token is bound to the old (unusable) password.
+        self.assertEqual(APIClient().post('/api/password/setup/', {**setup, 'password': 'Taken#123'},
+                                          format='json').status_code, 400)
+        self.assertTrue(User.objects.get(username='invited').check_password('Chosen#123'))
+
+    def test_rm_reissues_invites_only_before_a_password_is_set(self):
+        invited = User.objects.get(pk=self.onboard([{'username': 'invited'}]).data['rows'][0]['user_id'])
+        response = self.api.post(f'/api/customers/{invited.id}/invite/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(APIClient().post('/api/password/setup/', {
+            'username': 'invited', 'token': response.data['invite_token'], 'password': 'Chosen#123',
+        }, format='json').status_code, 200)
+        self.assertEqual(self.api.post(f'/api/customers/{invited.id}/invite/').status_code, 400)
+        other = User.objects.create(username='not_mine', role='customer')
+        self.assertEqual(self.api.post(f'/api/customers/{other.id}/invite/').status_code, 404)
+
+    def test_too_many_passwords_are_refused(self):
+        rows = [{'username': f'emp{i}', 'password': 'S3cret!pass'}
+                for i in range(OnboardingSerializer.MAX_PASSWORDS + 1)]
+        with mock.patch.object(batch, 'run_chunks') as run_chunks:
+            response = self.onboard(rows)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('customers', response.data)
+        run_chunks.assert_not_called()
+        self.assertFalse(User.objects.filter(username='emp0').exists())
+
+
+# ─── Admin changelists ──────────────────────────────────────────────
+@override_settings(STORAGES={'staticfiles': {
+    'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+class AdminChangelistTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin_lists', 'a@b.c', 'pw', role='superadmin'))
+
+    def add_rows(self, count):
+        for _ in range(count):
+            user = User.objects.create(username=f'admin_cust_{User.objects.count()}', role='customer')
+            account = make_account(user, '100.00')
+            ledger.post_entry(account.id, 'credit', Decimal('10.00'), 'UPI Credit')
+
+    def assert_constant_queries(self, url):
+        self.add_rows(2)
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_rows(20)
+        with self.assertNumQueries(len(few)):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 22)
+
+    def test_transaction_changelist_queries_do_not_grow_with_rows(self):
+        self.assert_constant_queries('/admin/accounts/transaction/')
+
+    def test_account_changelist_queries_do_not_grow_with_rows(self):
+        self.assert_constant_queries('/admin/accounts/account/')
+
+
+# ─── Batch reads ────────────────────────────────────────────────────
+@override_settings(REVOCATION_SYNC_SECONDS=None)  # JWT checks without the background sync thread
+class BatchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='batch_owner', role='customer')
+        self.account = make_account(self.user, '100.00')
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def batch(self, *urls):
+        response = self.api.post('/api/batch/', {'requests': list(urls)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [(item['status'], item['body']) for item in response.data['responses']]
+
+    def test_sub_requests_run_as_the_caller(self):
+        profile, accounts = self.batch('/api/me/', '/api/accounts/')
+        self.assertEqual((profile[0], profile[1]['username']), (200, 'batch_owner'))
+        self.assertEqual((accounts[0], [row['id'] for row in accounts[1]]), (200, [self.account.id]))
+
+    @override_settings(LIVE_MAX_STREAMS=1)
+    def test_streams_and_other_endpoints_are_refused(self):
+        refused = self.batch('/api/live/', '/api/transactions/export/', '/api/batch/',
+                             '/api/bootstrap/', '/api/token/logout-all/')
+        self.assertEqual([code for code, _ in refused], [400] * 5)
+        stream = live.open_stream(self.user.id)  # the batch held no stream slot
+        self.assertIsNotNone(stream)
+        stream.close()
+
+    def test_missing_credentials_are_still_401(self):
+        response = APIClient().post('/api/batch/', {'requests': ['/api/me/']}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+
+# ─── RM portfolio filters ───────────────────────────────────────────
+class PortfolioFilterTests(TestCase):
+
+    def setUp(self):
+        rm = User.objects.create(username='portfolio_rm', role='rm')
+        make_account(User.objects.create(username='portfolio_cust', role='customer', created_by=rm), '250.00')
+        self.api = APIClient()
+        self.api.force_authenticate(rm)
+
+    def customers(self, **params):
+        return self.api.get('/api/customers/', {'summary': 'true', **params})
+
+    def test_balance_bounds_filter(self):
+        self.assertEqual(self.customers(min_balance='250').data['count'], 1)
+        self.assertEqual(self.customers(min_balance='250.01').data['count'], 0)
+
+    def test_bad_balance_bounds_are_400(self):
+        for sharded in (False, True):
+            with mock.patch.object(sharding, 'enabled', return_value=sharded):
+                for value in ('NaN', 'sNaN', 'Infinity', '-inf', '1e20', 'abc'):
+                    self.assertEqual(self.customers(min_balance=value).status_code, 400, (sharded, value))
+                    self.assertEqual(self.customers(max_balance=value).status_code, 400, (sharded, value))
+
+
+# ─── Cold storage ───────────────────────────────────────────────────
+class ArchiveTests(TestCase):
+
+    def setUp(self):
+        self.account = make_account(User.objects.create(username='archive_owner', role='customer'))
+        txn = ledger.post_entry(self.account.id, 'credit', Decimal('10.00'), 'Old deposit')
+        Transaction.objects.filter(pk=txn.pk).update(timestamp=timezone.now() - timedelta(days=1000))
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.root = workdir.name
+
+    def archive(self):
+        call_command('archive_transactions', stdout=io.StringIO())
+
+    def test_refuses_without_a_durable_root(self):
+        for root in (None, os.path.join(self.root, 'not-mounted')):
+            with override_settings(TRANSACTION_ARCHIVE_ROOT=root), self.assertRaises(CommandError):
+                self.archive()
+        self.assertEqual(Transaction.objects.filter(account=self.account).count(), 1)
+
+    def test_archives_into_the_configured_root(self):
+        with override_settings(TRANSACTION_ARCHIVE_ROOT=self.root):
+            self.archive()
+        self.assertFalse(Transaction.objects.filter(account=self.account).exists())
+        archived = self.account.transaction_archives.get()
+        self.assertEqual(archived.row_count, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.root, archived.path)))
+
+
+# ─── Audited postings ───────────────────────────────────────────────
+@override_settings(AUDIT_FLUSH_SECONDS=None)
+class AuditedPostingTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='audit_payer', role='customer')
+        self.source = make_account(self.user, '1000.00')
+        self.destination = make_account(User.objects.create(username='audit_payee', role='customer'))
+
+    def audited(self):
+        audit.flush()
+        return list(AuditEntry.objects.order_by('seq').values_list('action', 'actor_id', 'subject'))
+
+    def test_transfers_are_audited(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        item = {'from_account_id': self.source.id, 'to_account_number': self.destination.account_number,
+                'amount': '10.00', 'description': 'Rent'}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(api.post('/api/transfer/', item, format='json').status_code, 200)
+            response = api.post('/api/transfers/batch/', {'transfers': [item, item]}, format='json')
+            self.assertEqual(response.status_code, 200)
+        debit = ('transfer', self.user.id, f'account:{self.source.id}')
+        credit = ('transfer.credit', self.user.id, f'account:{self.destination.id}')
+        self.assertEqual(self.audited(), [debit, credit, debit, debit, credit, credit])
+
+    def test_standing_instruction_postings_are_audited(self):
+        si = StandingInstruction.objects.create(
+            account=self.source, kind='sweep', destination=self.destination, amount=Decimal('100'),
+            start_date=date(2026, 11, 1), next_run=date(2026, 11, 1),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            standing.run_chunk([si.id], date(2026, 11, 1))
+        self.assertEqual(self.audited(), [
+            ('standing_instruction.debit', self.user.id, f'account:{self.source.id}'),
+            ('standing_instruction.credit', self.user.id, f'account:{self.destination.id}'),
+        ])
+        entry = AuditEntry.objects.order_by('seq').first()
+        self.assertEqual((entry.data['amount'], entry.data['instruction_id']), ('900.00', si.id))
+
+
+# ─── Response compression ───────────────────────────────────────────
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = json.dumps([{'id': i, 'description': 'UPI to Swiggy'} for i in range(100)]).encode()
+
+    def respond(self, response, accept='gzip, deflate, br', path='/api/transactions/'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept)
+        request.resolver_match = resolve(path)
+        return middleware.CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, body=None):
+        response = HttpResponse(body or self.body, content_type='application/json')
+        response['ETag'] = '"v1"'
+        return response
+
+    def test_negotiates_the_encoding(self):
+        with mock.patch.object(middleware, 'brotli', None):
+            response = self.respond(self.json_response())
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+        response = self.respond(self.json_response(), accept='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.body)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        if middleware.brotli is not None:
+            response = self.respond(self.json_response())
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(middleware.brotli.decompress(response.content), self.body)
+
+    def test_skips_small_and_uncompressible_bodies(self):
+        with self.settings(COMPRESSION_MIN_LENGTH=len(self.body) + 1):
+            response = self.respond(self.json_response())
+        self.assertFalse(response.has_header('Content-Encoding'))
+        with self.settings(COMPRESSION_MIN_LENGTH=len(self.body)):
+            self.assertTrue(self.respond(self.json_response()).has_header('Content-Encoding'))
+        response = self.respond(HttpResponse(self.body, content_type='image/png'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_gzip_length_is_padded(self):
+        with mock.patch.object(middleware, 'brotli', None):
+            lengths = {len(self.respond(self.json_response()).content) for _ in range(20)}
+        self.assertGreater(len(lengths), 1)
+
+    def test_credential_views_are_not_compressed(self):
+        for path in ('/api/token/', '/api/token/refresh/', '/api/customers/1/invite/'):
+            response = self.respond(self.json_response(), path=path)
+            self.assertFalse(response.has_header('Content-Encoding'), path)
+            self.assertEqual(response.content, self.body)
+
+    def test_streams_chunk_by_chunk(self):
+        chunks = [self.body[:10], b'', self.body[10:]]
+        seen = []
+
+        def stream():
+            for chunk in chunks:
+                seen.append(chunk)
+                yield chunk
+
+        with mock.patch.object(middleware, 'brotli', None):
+            response = self.respond(StreamingHttpResponse(stream(), content_type='application/x-ndjson'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        decompressor = zlib.decompressobj(31)
+        parts = iter(response.streaming_content)
+        # Each chunk is flushed as soon as the view yields it.
+        self.assertEqual(decompressor.decompress(next(parts)), chunks[0])
+        self.assertEqual(seen, chunks[:1])
+        rest = b''.join(decompressor.decompress(part) for part in parts)
+        self.assertEqual(chunks[0] + rest, self.body)
+        self.assertTrue(decompressor.eof)
+
+
+# ─── orjson renderer and parser ─────────────────────────────────────
+class ORJSONTests(TestCase):
+
+    def test_renders_like_drf(self):
+        user = User.objects.create(username='render_owner', role='customer')
+        ledger.post_entry(make_account(user).id, 'credit', Decimal('12.50'), 'Salary \u2028 line')
+        rows = TransactionSerializer(Transaction.objects.all(), many=True).data
+        data = {
+            'amount': Decimal('1234.50'), 'tiny': Decimal('0.01'),
+            'at': timezone.now(), 'naive': datetime(2026, 10, 19, 9, 30, 15, 123456),
+            'day': date(2026, 10, 19), 'time': time(9, 30), 'elapsed': timedelta(minutes=5),
+            'id': uuid.uuid4(), 'label': gettext_lazy('Savings'), 'rows': rows,
+            'nested': ReturnList([ReturnDict({'amount': Decimal('5')}, serializer=None)], serializer=None),
+            1: 'numeric key', 'ids': {1, 2} - {2}, 'big': 10 ** 15, 'text': 'नमस्ते',
+        }
+        self.assertIsInstance(rows, ReturnList)
+        ours = ORJSONRenderer().render(data)
+        theirs = JSONRenderer().render(data)
+        self.assertEqual(json.loads(ours), json.loads(theirs))
+        self.assertNotIn('\u2028'.encode(), ours)
+        self.assertEqual(ORJSONRenderer().render(rows), JSONRenderer().render(rows))
+
+    def test_malformed_bodies_are_rejected(self):
+        api = APIClient()
+        api.force_authenticate(User.objects.create(username='parse_owner', role='customer'))
+        for body in (b'{"amount": ', b'\xff\xfe', b'{"amount": NaN}', b'{"amount": "1"} trailing'):
+            response = api.post('/api/deposit/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn('JSON parse error', response.json()['detail'])
+        # Valid JSON the serializer cannot use is a 400 too, never a 500.
+        for body in (b'[' * 2000 + b']' * 2000, b'{"amount": 1' + b'0' * 400 + b'}'):
+            response = api.post('/api/deposit/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body[:20])
+
+
+# ─── Refresh-token revocation ───────────────────────────────────────
+@override_settings(REVOCATION_SYNC_SECONDS=None)
+class RevocationTests(TestCase):
+
+    def setUp(self):
+        revocation._reset_in_child()  # a fresh filter, built from this test's tables
+        self.addCleanup(revocation._reset_in_child)
+        self.user = User.objects.create(username='token_owner', role='customer')
+        self.api = APIClient()
+
+    def refresh(self, token):
+        return self.api.post('/api/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_each_refresh_token_works_once(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+        self.assertTrue(RevokedToken.objects.filter(jti=token['jti']).exists())
+
+    def test_logout_revokes(self):
+        token = RefreshToken.for_user(self.user)
+        self.api.force_authenticate(self.user)
+        response = self.api.post('/api/token/logout/', {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_inactive_users_cannot_refresh(self):
+        token = RefreshToken.for_user(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.refresh(token)
+        self.assertEqual((response.status_code, response.data['code']), (401, 'no_active_account'))
+        self.assertFalse(revocation.is_revoked(token))  # refused, not consumed
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_filter_hits_are_confirmed_in_the_table(self):
+        revoked, fresh = RefreshToken.for_user(self.user), RefreshToken.for_user(self.user)
+        revocation.revoke(revoked)
+        with mock.patch.object(revocation.BloomFilter, '__contains__', return_value=True):
+            self.assertTrue(revocation.is_revoked(revoked))
+            self.assertFalse(revocation.is_revoked(fresh))  # a false positive
+            self.assertEqual(self.refresh(fresh).status_code, 200)
+            self.assertEqual(self.refresh(revoked).status_code, 401)
+
+    def test_sync_picks_up_other_processes(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertFalse(revocation.is_revoked(token))
+        # Written by another process: seen here after the next sync.
+        RevokedToken.objects.create(jti=token['jti'], expires_at=timezone.now() + timedelta(days=1),
+                                    revoked_at=timezone.now())
+        self.assertFalse(revocation.is_revoked(token))
+        revocation.sync()
+        self.assertTrue(revocation.is_revoked(token))
+
+        other = RefreshToken.for_user(self.user)
+        TokenCutoff.objects.create(user_id=self.user.id, not_before=timezone.now())
+        revocation.sync()
+        self.assertTrue(revocation.is_revoked(other))
+        self.assertEqual(self.refresh(other).status_code, 401)
+
+
+# ─── Money as integer paise ─────────────────────────────────────────
+class PaiseFieldTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='paise_owner', role='customer')
+
+    def raw_balance(self, account):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT balance FROM accounts_account WHERE id = %s', [account.id])
+            return cursor.fetchone()[0]
+
+    def test_round_trip(self):
+        for value in ('0.00', '0.29', '-12.10', '9999999999999.99'):
+            account = make_account(self.user, value)
+            self.assertEqual(self.raw_balance(account), int(Decimal(value) * 100))
+            stored = Account.objects.get(pk=account.pk).balance
+            self.assertEqual((stored, str(stored)), (Decimal(value), value))
+        self.assertEqual(Account.objects.aggregate(total=Sum('balance'))['total'], Decimal('9999999999988.18'))
+        self.assertEqual(AccountSerializer(Account.objects.get(balance=Decimal('0.29'))).data['balance'], '0.29')
+
+    def test_more_than_two_places_are_rejected(self):
+        account = make_account(self.user)
+        account.balance = Decimal('1.000')  # exact: stored as 100 paise
+        account.save()
+        self.assertEqual(self.raw_balance(account), 100)
+        account.balance = Decimal('1.005')
+        with self.assertRaises(ValueError), transaction.atomic():
+            account.save()
+        self.assertEqual(Account.objects.get(pk=account.pk).balance, Decimal('1.00'))
+
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.post('/api/deposit/', {'account_id': account.id, 'amount': '10.005'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('amount', response.data)
+
+
+class PaiseMigrationTests(TransactionTestCase):
+    before, after = [('accounts', '0010_daily_rollup')], [('accounts', '0011_money_as_paise')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+
+    def balances(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT balance FROM accounts_account ORDER BY id')
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_numeric_columns_become_paise_and_back(self):
+        user = User.objects.create(username='migrated_owner', role='customer')
+        executor = MigrationExecutor(connection)
+        self.addCleanup(self.migrate, executor.loader.graph.leaf_nodes())
+        self.migrate(self.before)
+        HistoricalAccount = executor.loader.project_state(self.before).apps.get_model('accounts', 'Account')
+        for number, balance in (('SB0000000001', '0.29'), ('SB0000000002', '1234567.89')):
+            HistoricalAccount.objects.create(user_id=user.id, account_number=number, balance=Decimal(balance))
+        self.migrate(self.after)
+        self.assertEqual(self.balances(), [29, 123456789])
+        self.migrate(self.before)
+        self.assertEqual([Decimal(str(value)).quantize(Decimal('0.01')) for value in self.balances()],
+                         [Decimal('0.29'), Decimal('1234567.89')])
+
+
+# ─── Debit limits ───────────────────────────────────────────────────
+@override_settings(DEBIT_VELOCITY_LIMIT=3, DAILY_WITHDRAWAL_LIMIT='500.00', AUDIT_FLUSH_SECONDS=None)
+class DebitLimitTests(TransactionTestCase):
+
+    def setUp(self):
+        self.addCleanup(audit.flush)  # withdrawals commit here: no background flusher
+        caches[settings.LIMITS_CACHE].clear()
+        self.addCleanup(caches[settings.LIMITS_CACHE].clear)
+        self.user = User.objects.create(username='limited_owner', role='customer')
+        self.account = make_account(self.user, '10000.00')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def withdraw(self, amount):
+        return self.api.post('/api/withdraw/', {'account_id': self.account.id, 'amount': amount}, format='json')
+
+    def test_refuses_the_debit_over_the_limit(self):
+        for _ in range(3):
+            self.assertEqual(self.withdraw('10.00').status_code, 200)
+        self.assertEqual(self.withdraw('10.00').status_code, 429)
+
+        self.account = make_account(self.user, '10000.00')
+        self.assertEqual(self.withdraw('400.00').status_code, 200)
+        response = self.withdraw('100.01')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Available now: ₹100.00', response.data['detail'])
+        self.assertEqual(self.withdraw('100.00').status_code, 200)
+        # A refused debit counts nothing.
+        self.assertEqual(limits.estimate(limits.VELOCITY, self.account.id), 2)
+
+    def test_windows_roll_over(self):
+        start = time_module.time()
+        with mock.patch('time.time', return_value=start):
+            for _ in range(3):
+                self.assertEqual(self.withdraw('100.00').status_code, 200)
+            self.assertEqual(self.withdraw('100.00').status_code, 429)
+        with mock.patch('time.time', return_value=start + 75):
+            self.assertEqual(self.withdraw('100.00').status_code, 200)  # a new minute
+            self.assertEqual(self.withdraw('100.01').status_code, 429)  # the same day
+        with mock.patch('time.time', return_value=start + 24 * 3600 + 3600):
+            self.assertEqual(limits.estimate(limits.DAILY, self.account.id), 0)
+
+    def test_debits_are_counted_before_the_lock_is_released(self):
+        counted = []
+        real_publish = ledger._publish
+
+        def publish(txns):
+            counted.append(limits.estimate(limits.VELOCITY, self.account.id))
+            real_publish(txns)
+
+        with mock.patch.object(ledger, '_publish', publish):
+            ledger.post_entry(self.account.id, 'debit', Decimal('10.00'), 'ATM')
+        self.assertEqual(counted, [1])
+
+        with mock.patch.object(ledger, '_publish', side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            ledger.post_entry(self.account.id, 'debit', Decimal('10.00'), 'ATM')
+        self.assertEqual(limits.estimate(limits.VELOCITY, self.account.id), 1)  # released on rollback
+        self.assertEqual(limits.estimate(limits.DAILY, self.account.id), 1000)
+
+
+# ─── Search ─────────────────────────────────────────────────────────
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.asha = User.objects.create(username='asha.k', first_name='Asha', last_name='Kumar',
+                                        phone='9876543210', role='customer')
+        self.ravi = User.objects.create(username='ravi.m', first_name='Ravi', last_name='Menon',
+                                        email='ravi@example.com', role='customer')
+        self.account = make_account(self.asha)
+        ledger.post_entry(self.account.id, 'credit', Decimal('100.00'), 'Salary October')
+        ledger.post_entry(self.account.id, 'debit', Decimal('20.00'), 'UPI to Swiggy')
+
+    def users(self, term):
+        return set(search_users(User.objects.all(), term))
+
+    def descriptions(self, term):
+        return set(search_transactions(Transaction.objects.all(), term).values_list('description', flat=True))
+
+    def test_users_match_every_word_in_any_field(self):
+        self.assertEqual(self.users('ASHA'), {self.asha})
+        self.assertEqual(self.users('kumar 98765'), {self.asha})
+        self.assertEqual(self.users('example.com'), {self.ravi})
+        self.assertEqual(self.users(self.account.account_number[-6:]), {self.asha})
+        self.assertEqual(self.users('asha menon'), set())
+
+    def test_transactions_match_description_reference_or_account(self):
+        self.assertEqual(self.descriptions('swiggy'), {'UPI to Swiggy'})
+        self.assertEqual(self.descriptions(self.account.account_number), {'Salary October', 'UPI to Swiggy'})
+        reference = Transaction.objects.get(description='Salary October').reference_id
+        self.assertEqual(self.descriptions(reference.lower()), {'Salary October'})
+        self.assertEqual(self.descriptions('salary swiggy'), set())
+
+    def test_short_words_are_rejected(self):
+        api = APIClient()
+        api.force_authenticate(self.asha)
+        response = api.get('/api/transactions/', {'search': 'to'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('search', response.data)
+        response = api.get('/api/transactions/', {'search': 'swiggy'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['description'] for row in response.json()], ['UPI to Swiggy'])
+
+
+# ─── Fund transfers ─────────────────────────────────────────────────
+class TransferTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='transfer_owner', role='customer')
+        self.first = make_account(self.user, '100.00')
+        self.second = make_account(self.user, '100.00')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def balances(self):
+        return [Account.objects.get(pk=a.pk).balance for a in (self.first, self.second)]
+
+    def test_accounts_are_locked_in_id_order(self):
+        for source, destination in ((self.second, self.first), (self.first, self.second)):
+            with CaptureQueriesContext(connection) as queries:
+                ledger.execute_transfers([ledger.Transfer(source.id, destination.id, Decimal('1.00'), 'Move')])
+            selects = [q['sql'] for q in queries
+                       if q['sql'].startswith('SELECT') and 'accounts_account' in q['sql']]
+            # One query reads (and on PostgreSQL locks) both rows, lowest id first.
+            self.assertEqual(len(selects), 1)
+            self.assertIn('ORDER BY "accounts_account"."id" ASC', selects[0])
+        self.assertEqual(self.balances(), [Decimal('100.00'), Decimal('100.00')])
+
+    def test_insufficient_funds_post_nothing(self):
+        item = {'from_account_id': self.first.id, 'to_account_number': self.second.account_number,
+                'description': 'Rent'}
+        response = self.api.post('/api/transfer/', {**item, 'amount': '100.01'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Insufficient balance', response.data['detail'])
+
+        # All or nothing: the first transfer is rolled back with the second.
+        response = self.api.post('/api/transfers/batch/', {'transfers': [
+            {**item, 'amount': '60.00'}, {**item, 'amount': '60.00'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.balances(), [Decimal('100.00'), Decimal('100.00')])
+        self.assertFalse(Transaction.objects.exists())
+
+        response = self.api.post('/api/transfer/', {**item, 'amount': '100.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.balances(), [Decimal('0.00'), Decimal('200.00')])
+        self.assertEqual(response.data['new_balance'], '0.00')
+
+
+# ─── Transactional outbox ───────────────────────────────────────────
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.account = make_account(User.objects.create(username='outbox_owner', role='customer'))
+
+    def test_events_exist_only_for_committed_postings(self):
+        txn = ledger.post_entry(self.account.id, 'credit', Decimal('10.00'), 'Deposit')
+        with self.assertRaises(ledger.InsufficientFunds):
+            ledger.post_entry(self.account.id, 'debit', Decimal('50.00'), 'ATM')
+        events = OutboxEvent.objects.filter(topic='transaction.posted')
+        self.assertEqual([e.payload['transaction_id'] for e in events], [txn.id])
+        self.assertEqual(events[0].payload['balance_after'], '10.00')
+
+    def test_failures_back_off_without_undoing_the_batch(self):
+        delivered = []
+
+        def handler(payload):
+            if payload['fail']:
+                DailyRollup.objects.create(account=self.account, day=date(2026, 10, 19), category='food')
+                raise RuntimeError('handler down')
+            delivered.append(payload['n'])
+
+        with mock.patch.dict(outbox._handlers, {'test.event': [handler]}, clear=True):
+            outbox.publish_many('test.event', [{'n': 1, 'fail': False}, {'n': 2, 'fail': True},
+                                               {'n': 3, 'fail': False}])
+            with self.assertLogs('accounts.outbox', 'ERROR'):
+                self.assertEqual(outbox.process_batch(), 3)
+            self.assertEqual(outbox.process_batch(), 0)  # delivered once; the failure is not due yet
+        self.assertEqual(delivered, [1, 3])
+        self.assertFalse(DailyRollup.objects.exists())  # the failed handler's savepoint rolled back
+        failed = OutboxEvent.objects.get(processed_at__isnull=True)
+        self.assertEqual((failed.payload['n'], failed.attempts), (2, 1))
+        self.assertIn('handler down', failed.last_error)
+        self.assertGreater(failed.available_at, timezone.now())
+
+
+# ─── Service request work queue ─────────────────────────────────────
+class WorkQueueTests(TestCase):
+
+    def setUp(self):
+        self.rm = User.objects.create(username='queue_rm', role='rm')
+        self.other_rm = User.objects.create(username='queue_other_rm', role='rm')
+        customer = User.objects.create(username='queue_customer', role='customer', created_by=self.rm)
+        stranger = User.objects.create(username='queue_stranger', role='customer', created_by=self.other_rm)
+        self.requests = [ServiceRequest.objects.create(user=customer, service_type='cheque_book')
+                         for _ in range(5)]
+        self.foreign = ServiceRequest.objects.create(user=stranger, service_type='card_block')
+        self.api = APIClient()
+        self.api.force_authenticate(self.rm)
+
+    def claim(self, limit):
+        response = self.api.post('/api/service-queue/claim/', {'limit': limit}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['claimed']]
+
+    def test_claims_skip_rows_already_claimed(self):
+        first, second = self.claim(3), self.claim(3)
+        ids = [req.id for req in self.requests]
+        self.assertEqual((first, second), (ids[:3], ids[3:]))  # oldest first, never twice
+        self.assertEqual(self.claim(3), [])  # another RM's customers stay out of scope
+        claimed = ServiceRequest.objects.filter(id__in=ids)
+        self.assertEqual(set(claimed.values_list('status', 'assigned_to')), {('in_progress', self.rm.id)})
+        self.assertEqual(ServiceRequest.objects.get(pk=self.foreign.pk).status, 'pending')
+
+        # Released requests go back to the queue; finished ones do not.
+        response = self.api.post('/api/service-queue/bulk-status/', {'updates': [
+            {'id': ids[0], 'status': 'pending'}, {'id': ids[1], 'status': 'completed'},
+        ]}, format='json')
+        self.assertEqual(response.data['updated'], ids[:2])
+        self.assertEqual(self.claim(3), ids[:1])
+
+    def test_claim_query_skips_locked_rows(self):
+        # SQLite has no row locks; check the claim asks PostgreSQL to skip them.
+        real = QuerySet.select_for_update
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=real) as lock:
+            self.assertEqual(len(self.claim(1)), 1)
+        self.assertEqual(lock.call_args.kwargs, {'skip_locked': True, 'of': ('self',)})
+
+
+# ─── Ledger shard routing ───────────────────────────────────────────
+class ShardRoutingTests(SimpleTestCase):
+    router = sharding.ShardRouter()
+
+    def test_ledger_models_follow_the_context(self):
+        self.assertEqual(sharding.db(), 'default')
+        with sharding.use('shard1'):
+            self.assertEqual(self.router.db_for_read(Transaction), 'shard1')
+            self.assertEqual(self.router.db_for_write(Account), 'shard1')
+            self.assertEqual(self.router.db_for_read(User), 'default')  # the directory stays put
+            with sharding.use('shard2'):
+                self.assertEqual(sharding.db(), 'shard2')
+            self.assertEqual(sharding.db(), 'shard1')
+            # A row read from another shard is saved back where it came from.
+            account = Account()
+            account._state.db = 'shard2'
+            self.assertEqual(self.router.db_for_write(Account, instance=account), 'shard2')
+        self.assertEqual(sharding.db(), 'default')
+
+    def test_requests_route_to_the_users_home_shard(self):
+        seen = []
+
+        def view(request):
+            seen.append((sharding.db(), self.router.db_for_read(Transaction)))
+            with sharding.use('shard1'):  # an explicit block wins over the request user
+                seen.append(sharding.db())
+            return HttpResponse()
+
+        request = RequestFactory().get('/api/accounts/')
+        request.user = User(username='routed', shard='shard2')
+        sharding.LedgerShardMiddleware(view)(request)
+        self.assertEqual(seen, [('shard2', 'shard2'), 'shard1'])
+        self.assertEqual(sharding.db(), 'default')  # reset once the response is built
+
+        request.user = User(username='unsharded')
+        sharding.LedgerShardMiddleware(view)(request)
+        self.assertEqual(seen[-2], ('default', 'default'))
+
+    def test_bound_iterables_keep_their_shard(self):
+        def rows():
+            yield sharding.db()
+
+        with sharding.use('shard2'):
+            body = sharding.bind(rows())
+        self.assertEqual(list(body), ['shard2'])  # iterated after the block, e.g. by the WSGI server
+
+
+# ─── Recent-transactions cache ──────────────────────────────────────
+@override_settings(RECENT_TRANSACTIONS_SIZE=3)
+class RecentTransactionsTests(TestCase):
+
+    def setUp(self):
+        caches[settings.RECENT_TRANSACTIONS_CACHE].clear()
+        self.addCleanup(caches[settings.RECENT_TRANSACTIONS_CACHE].clear)
+        self.user = User.objects.create(username='recent_owner', role='customer')
+        self.account = make_account(self.user)
+
+    def post(self, amount, description):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ledger.post_entry(self.account.id, 'credit', Decimal(amount), description)
+
+    def descriptions(self, n=3):
+        return [row[5] for row in recent.latest(self.user, n)]  # the description column
+
+    def test_postings_update_the_cached_buffer(self):
+        for n in range(4):
+            self.post('1.00', f'Deposit {n}')
+        self.assertEqual(self.descriptions(), ['Deposit 3', 'Deposit 2', 'Deposit 1'])
+        self.post('1.00', 'Deposit 4')
+        with self.assertNumQueries(0):  # pushed on commit, the oldest dropped
+            self.assertEqual(self.descriptions(), ['Deposit 4', 'Deposit 3', 'Deposit 2'])
+        self.assertEqual(recent.latest(self.user, 2), recent._query(self.user, 2))
+        self.assertEqual(len(recent.latest(self.user, 5)), 5)  # beyond the buffer: from the table
+
+    def test_a_busy_buffer_is_dropped_not_left_stale(self):
+        self.post('1.00', 'Salary')
+        self.assertEqual(self.descriptions(), ['Salary'])
+        cache = caches[settings.RECENT_TRANSACTIONS_CACHE]
+        cache.add(recent._key(self.user.id, 'lock'), True)  # another writer holds the lock
+        self.post('2.00', 'Refund')
+        self.assertIsNone(cache.get(recent._key(self.user.id)))
+        cache.delete(recent._key(self.user.id, 'lock'))
+        self.assertEqual(self.descriptions(), ['Refund', 'Salary'])
+
+    def test_rolled_back_postings_are_not_cached(self):
+        self.post('1.00', 'Salary')
+        self.descriptions()
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                ledger.post_entry(self.account.id, 'credit', Decimal('5.00'), 'Never happened')
+                raise RuntimeError
+        self.assertEqual(self.descriptions(), ['Salary'])
@@ -4,24 +4,48 @@ from . import views
 urlpatterns = [
     # Auth / Profile
     path('me/', views.me, name='user-profile'),
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
+    path('batch/', views.batch, name='batch'),
+    path('token/logout/', views.logout, name='token-logout'),
+    path('token/logout-all/', views.logout_everywhere, name='token-logout-all'),
+    path('password/setup/', views.password_setup, name='password-setup'),
 
     # Super Admin → Manage RMs
     path('managers/', views.ManagerListCreateView.as_view(), name='manager-list-create'),
 
     # RM → Manage Customers
     path('customers/', views.CustomerListCreateView.as_view(), name='customer-list-create'),
+    path('customers/onboard/', views.onboard_customers, name='customer-onboard'),
     path('customers/<int:customer_id>/accounts/',
          views.rm_customer_accounts, name='rm-customer-accounts'),
+    path('customers/<int:customer_id>/invite/', views.invite_customer, name='customer-invite'),
 
     # Customer → Accounts & Transactions
     path('accounts/', views.AccountListView.as_view(), name='account-list'),
     path('transactions/', views.TransactionListView.as_view(), name='transaction-list'),
+    path('transactions/export/', views.TransactionExportView.as_view(), name='transaction-export'),
+    path('analytics/spending/', views.spending_analytics, name='spending-analytics'),
+    path('live/', views.live_updates, name='live-updates'),
     path('deposit/', views.deposit, name='deposit'),
     path('withdraw/', views.withdraw, name='withdraw'),
+    path('transfer/', views.transfer, name='transfer'),
+    path('transfers/batch/', views.transfer_batch, name='transfer-batch'),
+
+    # Customer → Standing Instructions
+    path('standing-instructions/', views.StandingInstructionListCreateView.as_view(),
+         name='standing-instruction-list-create'),
+    path('standing-instructions/<int:instruction_id>/cancel/', views.cancel_standing_instruction,
+         name='standing-instruction-cancel'),
 
     # Customer → Service Requests
     path('services/', views.ServiceRequestListCreateView.as_view(), name='service-list-create'),
 
+    # RM / Admin → Service Request Work Queue
+    path('service-queue/', views.ServiceQueueView.as_view(), name='service-queue'),
+    path('service-queue/claim/', views.service_queue_claim, name='service-queue-claim'),
+    path('service-queue/bulk-status/', views.service_queue_bulk_status,
+         name='service-queue-bulk-status'),
+
     # Dashboard
     path('dashboard-stats/', views.dashboard_stats, name='dashboard-stats'),
 
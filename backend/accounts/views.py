@@ -1,19 +1,73 @@
+import csv
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation, ROUND_CEILING, ROUND_FLOOR
+from itertools import chain, islice
+from urllib.parse import urlsplit
+
 from rest_framework import generics, status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import (
+    api_view, authentication_classes, permission_classes, renderer_classes,
+)
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Sum, Count
-from django.db import transaction
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import (
+    Count, ExpressionWrapper, F, Max, OuterRef, Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+from django.http import HttpRequest, QueryDict, StreamingHttpResponse
+from django.urls import Resolver404, resolve
+from django.utils import timezone
 
-from .models import User, Account, Transaction, ServiceRequest
+from . import (
+    analytics, archive, audit, ledger, live, onboarding, recent, revocation, sharding, work_queue,
+)
+from .exports import stream_csv
+from .fields import CENTS, PaiseField
+from .models import (
+    User, Account, BalanceSlot, DailyRollup, Transaction, ServiceRequest, StandingInstruction,
+    generate_account_number,
+)
 from .serializers import (
-    UserSerializer, CreateUserSerializer,
+    UserSerializer, CreateUserSerializer, OnboardingSerializer,
     AccountSerializer, TransactionSerializer,
     ServiceRequestSerializer, DepositSerializer, WithdrawSerializer,
+    BatchSerializer, TransferSerializer, TransferBatchSerializer,
+    QueueClaimSerializer, QueueBulkStatusSerializer, StandingInstructionSerializer,
+    LogoutSerializer, PasswordSetupSerializer,
 )
+from .fast_serializers import (
+    UserValuesSerializer, PortfolioValuesSerializer, AccountValuesSerializer,
+    TransactionValuesSerializer, ServiceRequestValuesSerializer,
+    QueueItemValuesSerializer, StandingInstructionValuesSerializer,
+)
+from .pagination import PortfolioPagination
+from .search import search_users, search_transactions, transaction_matcher
+from .renderers import EventStreamRenderer, ORJSONRenderer
 from .permissions import IsSuperAdmin, IsRelationshipManager, IsCustomer, IsSuperAdminOrRM
 
 
+# ─── Read-only fast path for list endpoints ─────────────────────────
+class ValuesListMixin:
+    """Serve GET lists from values_list() rows via a ValuesSerializer."""
+    values_serializer_class = None
+
+    def get_values_serializer_class(self):
+        return self.values_serializer_class
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer_class()()
+        rows = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+
 # ─── Current User Profile ──────────────────────────────────────────
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -23,9 +77,52 @@ def me(request):
     return Response(serializer.data)
 
 
+# ─── Logout ─────────────────────────────────────────────────────────
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def logout(request):
+    """Revoke the given refresh token; its access token lapses on its own."""
+    serializer = LogoutSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        token = RefreshToken(serializer.validated_data['refresh'])
+    except TokenError as e:
+        return Response({'detail': e.args[0], 'code': 'token_not_valid'},
+                        status=status.HTTP_401_UNAUTHORIZED)
+    revocation.revoke(token)
+    return Response({'detail': 'Logged out.'})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout_everywhere(request):
+    """Revoke every token issued to the user so far, access tokens included."""
+    revocation.log_out_everywhere(request.user)
+    audit.record('user.logged_out_everywhere', request.user, f'user:{request.user.id}')
+    return Response({'detail': 'Logged out on all devices.'})
+
+
+# ─── Onboarding invites ─────────────────────────────────────────────
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def password_setup(request):
+    """A customer onboarded without a password chooses one with their invite token."""
+    serializer = PasswordSetupSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    user = onboarding.accept_invite(**serializer.validated_data)
+    if user is None:
+        return Response({'detail': 'Invite is invalid, used or expired. Ask your RM for a new one.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    audit.record('user.password_set', user, f'user:{user.id}')
+    return Response({'detail': 'Password set. You can now sign in.'})
+
+
 # ─── Super Admin: Manage Relationship Managers ──────────────────────
-class ManagerListCreateView(generics.ListCreateAPIView):
+class ManagerListCreateView(ValuesListMixin, generics.ListCreateAPIView):
     """Super Admin can list and create Relationship Managers."""
+    values_serializer_class = UserValuesSerializer
     permission_classes = [IsSuperAdmin]
 
     def get_serializer_class(self):
@@ -34,42 +131,255 @@ class ManagerListCreateView(generics.ListCreateAPIView):
         return UserSerializer
 
     def get_queryset(self):
-        return User.objects.filter(role='rm').order_by('-date_joined')
+        qs = User.objects.filter(role='rm').order_by('-date_joined')
+        search = self.request.query_params.get('search')
+        if self.request.method == 'GET' and search:
+            qs = search_users(qs, search)
+        return qs
 
     def perform_create(self, serializer):
-        serializer.save(role='rm', created_by=self.request.user)
+        user = serializer.save(role='rm', created_by=self.request.user)
+        audit.record('user.created', self.request.user, f'user:{user.id}',
+                     username=user.username, role=user.role)
 
 
 # ─── RM: Manage Customers ──────────────────────────────────────────
-class CustomerListCreateView(generics.ListCreateAPIView):
-    """RM can list and create Customers assigned to them."""
+def with_portfolio_summary(users):
+    """Annotate a User queryset with per-customer account/transaction/service summaries."""
+    accounts = Account.objects.filter(user=OuterRef('pk')).order_by().values('user')
+    slots = BalanceSlot.objects.filter(account__user=OuterRef('pk')).order_by().values('account__user')
+    pending = ServiceRequest.objects.filter(
+        user=OuterRef('pk'), status='pending'
+    ).order_by().values('user')
+    return users.annotate(
+        account_count=Coalesce(Subquery(accounts.annotate(c=Count('id')).values('c')), 0),
+        total_balance=ExpressionWrapper(
+            Coalesce(Subquery(accounts.annotate(s=Sum('balance')).values('s')),
+                     Value(0, output_field=PaiseField()))
+            + Coalesce(Subquery(slots.annotate(s=Sum('balance')).values('s')),
+                       Value(0, output_field=PaiseField())),
+            output_field=PaiseField(),
+        ),
+        last_transaction_at=Subquery(
+            Transaction.objects.filter(account__user=OuterRef('pk'))
+            .order_by('-timestamp').values('timestamp')[:1]
+        ),
+        pending_services=Coalesce(Subquery(pending.annotate(c=Count('id')).values('c')), 0),
+    )
+
+
+def sharded_portfolio_rows(users):
+    """
+    PortfolioValuesSerializer rows for a User queryset when the ledger is
+    sharded: user fields and pending services from default, account figures
+    from grouped queries on each customer's shard (run in parallel).
+    """
+    pending = ServiceRequest.objects.filter(
+        user=OuterRef('pk'), status='pending'
+    ).order_by().values('user')
+    users = list(users.annotate(
+        pending_services=Coalesce(Subquery(pending.annotate(c=Count('id')).values('c')), 0),
+    ).values_list(*UserValuesSerializer.lookups, 'pending_services', 'shard'))
+    by_shard = defaultdict(list)
+    for row in users:
+        by_shard[row[-1] or DEFAULT_DB_ALIAS].append(row[0])
+
+    def summaries(alias):
+        ids = by_shard.get(alias)
+        if not ids:
+            return {}
+        summary = {pk: [0, Decimal('0.00'), None] for pk in ids}
+        for user_id, count, total in (Account.objects.filter(user_id__in=ids).order_by()
+                                      .values('user').annotate(c=Count('id'), s=Sum('balance'))
+                                      .values_list('user', 'c', 's')):
+            summary[user_id][:2] = count, summary[user_id][1] + total
+        for user_id, total in (BalanceSlot.objects.filter(account__user_id__in=ids).order_by()
+                               .values('account__user').annotate(s=Sum('balance'))
+                               .values_list('account__user', 's')):
+            summary[user_id][1] += total
+        for user_id, last in (Transaction.objects.filter(account__user_id__in=ids).order_by()
+                              .values('account__user').annotate(m=Max('timestamp'))
+                              .values_list('account__user', 'm')):
+            summary[user_id][2] = last
+        return summary
+
+    figures = {}
+    for summary in sharding.scatter(summaries):
+        figures.update(summary)
+    return [(*row[:-2], *figures[row[0]], row[-2]) for row in users]
+
+
+class CustomerListCreateView(ValuesListMixin, generics.ListCreateAPIView):
+    """
+    RM can list and create Customers assigned to them.
+
+    With ``?summary=true`` each customer also carries account_count,
+    total_balance, last_transaction_at and pending_services, computed as
+    correlated subqueries in the same (paginated) query. Summary lists
+    accept ``ordering`` on those fields and ``min_balance`` /
+    ``max_balance`` / ``has_pending`` filters. ``?search=`` works on both
+    forms (see search.py).
+    """
+    values_serializer_class = UserValuesSerializer
     permission_classes = [IsRelationshipManager]
+    SUMMARY_ORDERING = ('account_count', 'total_balance', 'last_transaction_at',
+                        'pending_services', 'date_joined', 'username')
+    # Balances are PaiseField(max_digits=15); larger bounds overflow the column.
+    MAX_BALANCE_FILTER = Decimal(10) ** 13
+
+    @property
+    def summary(self):
+        return self.request.query_params.get('summary') in ('1', 'true')
+
+    @property
+    def paginator(self):
+        # Plain lists stay unpaginated for the existing frontend.
+        if not self.summary:
+            return None
+        if not hasattr(self, '_portfolio_paginator'):
+            self._portfolio_paginator = PortfolioPagination()
+        return self._portfolio_paginator
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return CreateUserSerializer
         return UserSerializer
 
+    def get_values_serializer_class(self):
+        return PortfolioValuesSerializer if self.summary else UserValuesSerializer
+
     def get_queryset(self):
-        return User.objects.filter(
+        qs = User.objects.filter(
             role='customer', created_by=self.request.user
         ).order_by('-date_joined')
+        if self.request.method != 'GET':
+            return qs
+        search = self.request.query_params.get('search')
+        if search:
+            qs = search_users(qs, search)
+        if not self.summary or sharding.enabled():
+            return qs
+        qs = with_portfolio_summary(qs)
+
+        min_balance, max_balance, has_pending, ordering = self.portfolio_filters()
+        if min_balance is not None:
+            qs = qs.filter(total_balance__gte=min_balance)
+        if max_balance is not None:
+            qs = qs.filter(total_balance__lte=max_balance)
+        if has_pending is True:
+            qs = qs.filter(pending_services__gt=0)
+        elif has_pending is False:
+            qs = qs.filter(pending_services=0)
+        if ordering:
+            qs = qs.order_by(
+                F(ordering[1:]).desc(nulls_last=True) if ordering.startswith('-')
+                else F(ordering).asc(nulls_last=True),
+                '-id',
+            )
+        return qs
+
+    def portfolio_filters(self):
+        """(min_balance, max_balance, has_pending, ordering) from the query string."""
+        params = self.request.query_params
+        # Balances are whole paise, so round the bounds inwards to paise.
+        bounds = []
+        for name, rounding in (('min_balance', ROUND_CEILING), ('max_balance', ROUND_FLOOR)):
+            try:
+                value = Decimal(params[name]).quantize(CENTS, rounding=rounding) if params.get(name) else None
+            except InvalidOperation:
+                value = Decimal('NaN')
+            if value is not None and not value.is_finite():
+                raise ValidationError({'detail': 'min_balance/max_balance must be numbers.'})
+            if value is not None and abs(value) >= self.MAX_BALANCE_FILTER:
+                raise ValidationError({'detail': f'min_balance/max_balance must be below {self.MAX_BALANCE_FILTER:,}.'})
+            bounds.append(value)
+        has_pending = {'1': True, 'true': True, '0': False, 'false': False}.get(params.get('has_pending'))
+        ordering = params.get('ordering', '')
+        return (*bounds, has_pending,
+                ordering if ordering.lstrip('-') in self.SUMMARY_ORDERING else None)
+
+    def list(self, request, *args, **kwargs):
+        if not (self.summary and sharding.enabled()):
+            return super().list(request, *args, **kwargs)
+        # Sharded ledger: the summary can't be one query, so filter and sort here.
+        serializer = PortfolioValuesSerializer()
+        rows = sharded_portfolio_rows(self.filter_queryset(self.get_queryset()))
+        min_balance, max_balance, has_pending, ordering = self.portfolio_filters()
+        balance = serializer.lookups.index('total_balance')
+        pending = serializer.lookups.index('pending_services')
+        rows = [
+            row for row in rows
+            if (min_balance is None or row[balance] >= min_balance)
+            and (max_balance is None or row[balance] <= max_balance)
+            and (has_pending is None or (row[pending] > 0) == has_pending)
+        ]
+        if ordering:
+            index = serializer.lookups.index(ordering.lstrip('-'))
+            rows.sort(key=lambda row: row[0], reverse=True)
+            present = [row for row in rows if row[index] is not None]
+            present.sort(key=lambda row: row[index], reverse=ordering.startswith('-'))
+            rows = present + [row for row in rows if row[index] is None]
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(serializer.serialize(page))
 
     def perform_create(self, serializer):
         user = serializer.save(role='customer', created_by=self.request.user)
+        sharding.place([user])
         # Auto-create a savings account for the new customer
-        import uuid
-        Account.objects.create(
+        account = Account.objects.using(sharding.shard_of(user)).create(
             user=user,
-            account_number=f"SB{uuid.uuid4().hex[:10].upper()}",
+            account_number=generate_account_number(),
             account_type='savings',
-            balance=0.00,
+            balance=0,
         )
+        audit.record('user.created', self.request.user, f'user:{user.id}',
+                     username=user.username, role=user.role, account_number=account.account_number)
+
+
+@api_view(['POST'])
+@permission_classes([IsRelationshipManager])
+def onboard_customers(request):
+    """
+    Bulk-create customers, each with a default account, for the RM.
+
+    Takes JSON ``{"customers": [...], "dry_run": false}`` or a multipart CSV
+    upload (``file``, optional ``dry_run``) with a header row. Invalid rows
+    are skipped; the response reports every row. At most
+    OnboardingSerializer.MAX_PASSWORDS rows may set a password.
+    """
+    data = request.data
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            rows = onboarding.read_csv(upload.read())
+        except (UnicodeDecodeError, csv.Error):
+            return Response({'detail': 'file must be a UTF-8 CSV with a header row.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        data = {'customers': rows, 'dry_run': data.get('dry_run', False)}
+    serializer = OnboardingSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    rows, dry_run = serializer.validated_data['customers'], serializer.validated_data['dry_run']
+
+    # Hashed in this thread: forking a process pool from a threaded
+    # gunicorn worker is unsafe, and MAX_PASSWORDS keeps this well inside
+    # the request timeout.
+    result = onboarding.onboard(rows, request.user, dry_run=dry_run)
+    audit.record_many([
+        ('user.created', request.user, f"user:{row['user_id']}",
+         {'username': row['username'], 'role': 'customer', 'account_number': row['account_number']})
+        for row in result['rows'] if row['status'] == 'created'
+    ])
+    if result['errors'] == len(rows):
+        code = status.HTTP_400_BAD_REQUEST
+    else:
+        code = status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED
+    return Response(result, status=code)
 
 
 # ─── Customer: View Accounts ───────────────────────────────────────
-class AccountListView(generics.ListAPIView):
+class AccountListView(ValuesListMixin, generics.ListAPIView):
     """Customer can view their own accounts."""
+    values_serializer_class = AccountValuesSerializer
     serializer_class = AccountSerializer
     permission_classes = [IsCustomer]
 
@@ -78,11 +388,37 @@ class AccountListView(generics.ListAPIView):
 
 
 # ─── Customer: View Transactions ───────────────────────────────────
-class TransactionListView(generics.ListAPIView):
-    """Customer can view their transaction statements."""
+def _date_param(request, name):
+    """Optional YYYY-MM-DD query param as a date."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: 'Use YYYY-MM-DD.'})
+
+
+class TransactionListView(ValuesListMixin, generics.ListAPIView):
+    """
+    Customer can view their transaction statements. ``?from=``/``?to=``
+    (YYYY-MM-DD, inclusive) limit the range; months that were moved to
+    cold storage are read back from the archive files transparently.
+    ``?limit=`` returns only the newest rows; without other filters those
+    come from the recent-transactions cache (see recent.py).
+    """
+    values_serializer_class = TransactionValuesSerializer
     serializer_class = TransactionSerializer
     permission_classes = [IsCustomer]
 
+    def get_range(self):
+        """Aware [start, end) from the from/to query params (None = open)."""
+        start, end = _date_param(self.request, 'from'), _date_param(self.request, 'to')
+        return (
+            start and timezone.make_aware(datetime.combine(start, time.min)),
+            end and timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+        )
+
     def get_queryset(self):
         qs = Transaction.objects.filter(account__user=self.request.user)
         # Optional filters
@@ -92,12 +428,162 @@ class TransactionListView(generics.ListAPIView):
         account_id = self.request.query_params.get('account')
         if account_id:
             qs = qs.filter(account_id=account_id)
+        search = self.request.query_params.get('search')
+        if search:
+            qs = search_transactions(qs, search)
+        start, end = self.get_range()
+        if start:
+            qs = qs.filter(timestamp__gte=start)
+        if end:
+            qs = qs.filter(timestamp__lt=end)
         return qs
 
+    def statement_rows(self, serializer):
+        """Table rows, then archived rows (always older), newest first."""
+        params = self.request.query_params
+        accounts = Account.objects.filter(user=self.request.user)
+        if params.get('account'):
+            accounts = accounts.filter(id=params['account'])
+        start, end = self.get_range()
+        txn_type = params.get('type')
+        archived = archive.read_transactions(
+            accounts, start, end,
+            transaction_type=txn_type if txn_type in ('credit', 'debit') else None,
+            match=transaction_matcher(params['search']) if params.get('search') else None,
+        )
+        return chain(serializer.values(self.get_queryset()), archived)
+
+    def get_limit(self):
+        value = self.request.query_params.get('limit')
+        if value is None:
+            return None
+        if not value.isdigit() or int(value) < 1:
+            raise ValidationError({'limit': 'Must be a positive number.'})
+        return int(value)
+
+    def list(self, request, *args, **kwargs):
+        serializer = TransactionValuesSerializer()
+        limit = self.get_limit()
+        if limit is not None and set(request.query_params) == {'limit'}:
+            rows = recent.latest(request.user, limit)
+            # Fewer rows than asked means older ones may be in the archive.
+            if len(rows) == limit:
+                return Response(serializer.serialize(rows))
+        rows = self.statement_rows(serializer)
+        if limit is not None:
+            rows = islice(rows, limit)
+        return Response(serializer.serialize(rows))
+
+
+class TransactionExportView(TransactionListView):
+    """Same statement as CSV, streamed (takes the same filters)."""
+    HEADER = ('timestamp', 'reference_id', 'account_number', 'transaction_type',
+              'description', 'amount', 'balance_after')
+
+    def list(self, request, *args, **kwargs):
+        serializer = TransactionValuesSerializer()
+        rows = (
+            (serializer.datetime(ts), reference_id, account_number, transaction_type,
+             description, amount, balance_after)
+            for (_, account_number, transaction_type, amount, balance_after,
+                 description, reference_id, ts) in self.statement_rows(serializer)
+        )
+        return stream_csv(self.HEADER, sharding.bind(rows), 'statement.csv')
+
+
+# ─── Customer: Spending Analytics ──────────────────────────────────
+@api_view(['GET'])
+@permission_classes([IsCustomer])
+def spending_analytics(request):
+    """
+    Credit/debit series and top categories from the daily rollups.
+    ``?from=``/``?to=`` (default: the last 12 months), ``?interval=month|day``,
+    ``?account=``, ``?top=``.
+    """
+    end = _date_param(request, 'to') or timezone.localdate()
+    start = _date_param(request, 'from') or (end - timedelta(days=365)).replace(day=1)
+    interval = request.query_params.get('interval', 'month')
+    if interval not in ('month', 'day'):
+        return Response({'detail': "interval must be 'month' or 'day'."}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end:
+        return Response({'detail': "'from' must not be after 'to'."}, status=status.HTTP_400_BAD_REQUEST)
+    if interval == 'day' and (end - start).days > 366:
+        return Response({'detail': 'Daily series are limited to one year.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        top = min(max(int(request.query_params.get('top', 10)), 1), 50)
+    except ValueError:
+        return Response({'detail': 'top must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    rollups = DailyRollup.objects.filter(account__user=request.user, day__gte=start, day__lte=end)
+    account_id = request.query_params.get('account')
+    if account_id:
+        rollups = rollups.filter(account_id=account_id)
+    return Response({
+        'from': start.isoformat(), 'to': end.isoformat(), 'interval': interval,
+        **analytics.summarize(rollups, interval, top),
+    })
+
+
+# ─── Customer: Live Updates ────────────────────────────────────────
+@api_view(['GET'])
+@permission_classes([IsCustomer])
+@renderer_classes([EventStreamRenderer, ORJSONRenderer])
+def live_updates(request):
+    """
+    Server-sent events: one 'transaction' event (new row + balance) per
+    posting on the customer's accounts. Send ``Last-Event-ID`` to resume.
+    """
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id is not None and not last_event_id.isdigit():
+        return Response({'detail': 'Last-Event-ID must be a transaction id.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    body = live.open_stream(request.user.id, int(last_event_id) if last_event_id else None)
+    if body is None:
+        return Response({'detail': 'Too many live streams open. Try again shortly.'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        headers={'Retry-After': str(live.RETRY_AFTER_SECONDS)})
+    response = StreamingHttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: don't buffer the stream
+    return response
+
+
+# ─── Customer: Standing Instructions ───────────────────────────────
+class StandingInstructionListCreateView(ValuesListMixin, generics.ListCreateAPIView):
+    """Customer can view and set up recurring payments and sweeps (run by run_standing_instructions)."""
+    values_serializer_class = StandingInstructionValuesSerializer
+    serializer_class = StandingInstructionSerializer
+    permission_classes = [IsCustomer]
+
+    def get_queryset(self):
+        return StandingInstruction.objects.filter(account__user=self.request.user).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        instruction = serializer.save(next_run=serializer.validated_data['start_date'])
+        audit.record('standing_instruction.created', self.request.user,
+                     f'standing_instruction:{instruction.id}', kind=instruction.kind,
+                     account_id=instruction.account_id, amount=instruction.amount,
+                     frequency=instruction.frequency)
+
+
+@api_view(['POST'])
+@permission_classes([IsCustomer])
+def cancel_standing_instruction(request, instruction_id):
+    """Customer stops one of their standing instructions."""
+    cancelled = StandingInstruction.objects.filter(
+        id=instruction_id, account__user=request.user, is_active=True,
+    ).update(is_active=False)
+    if not cancelled:
+        return Response({'detail': 'Standing instruction not found or already cancelled.'},
+                        status=status.HTTP_404_NOT_FOUND)
+    audit.record('standing_instruction.cancelled', request.user, f'standing_instruction:{instruction_id}')
+    return Response({'detail': 'Standing instruction cancelled.'})
+
 
 # ─── Customer: Service Requests ────────────────────────────────────
-class ServiceRequestListCreateView(generics.ListCreateAPIView):
+class ServiceRequestListCreateView(ValuesListMixin, generics.ListCreateAPIView):
     """Customer can view and create service requests."""
+    values_serializer_class = ServiceRequestValuesSerializer
     serializer_class = ServiceRequestSerializer
     permission_classes = [IsCustomer]
 
@@ -105,69 +591,224 @@ class ServiceRequestListCreateView(generics.ListCreateAPIView):
         return ServiceRequest.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        req = serializer.save(user=self.request.user)
+        audit.record('service_request.created', self.request.user, f'service_request:{req.id}',
+                     service_type=req.service_type, status=req.status)
 
 
-# ─── Dashboard Stats ───────────────────────────────────────────────
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dashboard_stats(request):
-    """Return role-appropriate dashboard statistics."""
-    user = request.user
+# ─── RM / Admin: Service Request Work Queue ────────────────────────
+class ServiceQueueView(ValuesListMixin, generics.ListAPIView):
+    """Requests the RM/admin has claimed (``?status=`` to see finished ones)."""
+    values_serializer_class = QueueItemValuesSerializer
+    serializer_class = ServiceRequestSerializer
+    permission_classes = [IsSuperAdminOrRM]
+
+    def get_queryset(self):
+        status_filter = self.request.query_params.get('status', 'in_progress')
+        return ServiceRequest.objects.filter(
+            assigned_to=self.request.user, status=status_filter
+        ).order_by('claimed_at', 'id')
 
+
+@api_view(['POST'])
+@permission_classes([IsSuperAdminOrRM])
+def service_queue_claim(request):
+    """Claim the next batch of pending requests (concurrent callers never collide)."""
+    serializer = QueueClaimSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    claimed = work_queue.claim_requests(request.user, serializer.validated_data['limit'])
+
+    values = QueueItemValuesSerializer()
+    rows = values.values(ServiceRequest.objects.filter(
+        id__in=[req.id for req in claimed]).order_by('created_at', 'id'))
+    return Response({'claimed': values.serialize(rows)})
+
+
+@api_view(['POST'])
+@permission_classes([IsSuperAdminOrRM])
+def service_queue_bulk_status(request):
+    """Complete, reject or release ('pending') claimed requests in bulk."""
+    serializer = QueueBulkStatusSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    updated, skipped = work_queue.bulk_transition(
+        request.user, serializer.validated_data['updates']
+    )
+    return Response({
+        'detail': f'{len(updated)} service request(s) updated.',
+        'updated': [req.id for req in updated],
+        'skipped': skipped,
+    })
+
+
+# ─── Dashboard Stats ───────────────────────────────────────────────
+def _dashboard(user):
+    """
+    Return (stats, accounts) for the user's role.
+
+    ``accounts`` is the serialized account list for customers (their stats
+    are computed from that same fetch) and None for other roles; ``stats``
+    is None for an unknown role.
+    """
     if user.role == 'superadmin':
-        return Response({
+        totals = sharding.scatter(
+            lambda alias: (Account.objects.count(), Account.objects.total_balance()))
+        return {
             'total_rms': User.objects.filter(role='rm').count(),
             'total_customers': User.objects.filter(role='customer').count(),
-            'total_accounts': Account.objects.count(),
-            'total_balance': str(Account.objects.aggregate(
-                total=Sum('balance'))['total'] or 0),
+            'total_accounts': sum(count for count, _ in totals),
+            'total_balance': str(sum(balance for _, balance in totals)),
             'pending_services': ServiceRequest.objects.filter(
                 status='pending').count(),
-        })
+        }, None
 
     elif user.role == 'rm':
         customers = User.objects.filter(role='customer', created_by=user)
         customer_ids = customers.values_list('id', flat=True)
-        return Response({
+        on_shards = defaultdict(list)
+        if sharding.enabled():
+            for pk, shard in customers.exclude(shard='').values_list('id', 'shard'):
+                on_shards[shard].append(pk)
+
+        def totals(alias):
+            # default's tables are filtered by subquery; shards get the ids they hold
+            ids = customer_ids if alias == DEFAULT_DB_ALIAS else on_shards[alias]
+            accounts = Account.objects.filter(user_id__in=ids)
+            return accounts.count(), accounts.total_balance()
+
+        totals = sharding.scatter(totals)
+        return {
             'total_customers': customers.count(),
-            'total_accounts': Account.objects.filter(
-                user_id__in=customer_ids).count(),
-            'total_balance': str(Account.objects.filter(
-                user_id__in=customer_ids).aggregate(
-                total=Sum('balance'))['total'] or 0),
+            'total_accounts': sum(count for count, _ in totals),
+            'total_balance': str(sum(balance for _, balance in totals)),
             'pending_services': ServiceRequest.objects.filter(
                 user_id__in=customer_ids, status='pending').count(),
-        })
+        }, None
 
     elif user.role == 'customer':
-        accounts = Account.objects.filter(user=user)
-        total_balance = accounts.aggregate(total=Sum('balance'))['total'] or 0
-        recent_txns = Transaction.objects.filter(
-            account__user=user
-        )[:5]
-        return Response({
-            'total_accounts': accounts.count(),
-            'total_balance': str(total_balance),
-            'recent_transactions': TransactionSerializer(recent_txns, many=True).data,
+        account_serializer = AccountValuesSerializer()
+        account_rows = list(account_serializer.values(Account.objects.filter(user=user)))
+        balance_idx = account_serializer.lookups.index('live_balance')
+        txn_serializer = TransactionValuesSerializer()
+        recent_txns = recent.latest(user, 5)
+        return {
+            'total_accounts': len(account_rows),
+            'total_balance': str(sum(row[balance_idx] for row in account_rows)),
+            'recent_transactions': txn_serializer.serialize(recent_txns),
             'pending_services': ServiceRequest.objects.filter(
                 user=user, status='pending').count(),
-        })
+        }, account_serializer.serialize(account_rows)
 
-    return Response({'detail': 'Unknown role'}, status=400)
+    return None, None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_stats(request):
+    """Return role-appropriate dashboard statistics."""
+    stats, _ = _dashboard(request.user)
+    if stats is None:
+        return Response({'detail': 'Unknown role'}, status=400)
+    return Response(stats)
+
+
+# ─── Page-load Bootstrap ───────────────────────────────────────────
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bootstrap(request):
+    """
+    Everything the app shell needs after login in one round trip:
+    profile, role-specific stats and (for customers) accounts with
+    recent transactions.
+    """
+    stats, accounts = _dashboard(request.user)
+    if stats is None:
+        return Response({'detail': 'Unknown role'}, status=400)
+    data = {'user': UserSerializer(request.user).data, 'stats': stats}
+    if accounts is not None:
+        data['accounts'] = accounts
+    return Response(data)
+
+
+# Plain JSON reads only: no streams (live updates, CSV exports), token
+# endpoints or nested batches.
+BATCH_URL_NAMES = frozenset({
+    'user-profile', 'manager-list-create', 'customer-list-create', 'rm-customer-accounts',
+    'account-list', 'transaction-list', 'spending-analytics', 'standing-instruction-list-create',
+    'service-list-create', 'service-queue', 'dashboard-stats', 'all-customers',
+})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """
+    Run several read-only GET sub-requests (BATCH_URL_NAMES) in one HTTP call.
+
+    Sub-requests reuse the caller's already-authenticated user (see
+    BatchSubrequestAuthentication), so the JWT is verified and the user
+    loaded once for the whole batch.
+    """
+    serializer = BatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    results = []
+    for url in serializer.validated_data['requests']:
+        parts = urlsplit(url)
+        try:
+            match = resolve(parts.path)
+        except Resolver404:
+            results.append({'url': url, 'status': 404, 'body': {'detail': 'Not found.'}})
+            continue
+        if match.url_name not in BATCH_URL_NAMES or not parts.path.startswith('/api/'):
+            results.append({'url': url, 'status': 400,
+                            'body': {'detail': 'Not allowed in a batch.'}})
+            continue
+
+        sub = HttpRequest()
+        sub.method = 'GET'
+        sub.path = sub.path_info = parts.path
+        sub.META = {**request.META, 'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path,
+                    'QUERY_STRING': parts.query, 'CONTENT_LENGTH': '0'}
+        sub.GET = QueryDict(parts.query)
+        sub.batch_auth = (request.user, request.auth)
+
+        response = match.func(sub, *match.args, **match.kwargs)
+        body = getattr(response, 'data', None)
+        results.append({'url': url, 'status': response.status_code, 'body': body})
+    return Response({'responses': results})
 
 
 # ─── Admin: All Customers (for super admin viewing) ────────────────
-class AllCustomersListView(generics.ListAPIView):
+class AllCustomersListView(ValuesListMixin, generics.ListAPIView):
     """Super Admin can see all customers."""
+    values_serializer_class = UserValuesSerializer
     serializer_class = UserSerializer
     permission_classes = [IsSuperAdmin]
 
     def get_queryset(self):
-        return User.objects.filter(role='customer').order_by('-date_joined')
+        qs = User.objects.filter(role='customer').order_by('-date_joined')
+        search = self.request.query_params.get('search')
+        if search:
+            qs = search_users(qs, search)
+        return qs
+
+
+# ─── RM: Customer invites and accounts ──────────────────────────────
+@api_view(['POST'])
+@permission_classes([IsRelationshipManager])
+def invite_customer(request, customer_id):
+    """New invite token for an assigned customer who has not chosen a password yet."""
+    customer = User.objects.filter(id=customer_id, role='customer', created_by=request.user).first()
+    if customer is None:
+        return Response({'detail': 'Customer not found or not assigned to you.'}, status=404)
+    if customer.has_usable_password():
+        return Response({'detail': 'Customer already has a password.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    audit.record('user.invited', request.user, f'user:{customer.id}')
+    return Response({'user_id': customer.id, 'username': customer.username,
+                     'invite_token': onboarding.invite_token(customer)})
 
 
-# ─── RM: View customer accounts ─────────────────────────────────────
 @api_view(['GET'])
 @permission_classes([IsRelationshipManager])
 def rm_customer_accounts(request, customer_id):
@@ -181,41 +822,44 @@ def rm_customer_accounts(request, customer_id):
             {'detail': 'Customer not found or not assigned to you.'},
             status=404
         )
-    accounts = Account.objects.filter(user=customer)
-    serializer = AccountSerializer(accounts, many=True)
-    return Response(serializer.data)
+    serializer = AccountValuesSerializer()
+    accounts = serializer.values(Account.objects.for_user(customer))
+    return Response(serializer.serialize(accounts))
 
 
 # ─── Customer: Deposit ──────────────────────────────────────────────
+def _audit_posting(action, user, txn):
+    audit.record_many([audit.posting(action, user, txn)])
+
+
+def _audit_transfers(user, txns):
+    """Audit execute_transfers' postings; credits to another shard are audited on delivery."""
+    audit.record_many(
+        [audit.posting('transfer', user, debit) for debit in txns[::2]]
+        + [audit.posting('transfer.credit', user, credit) for credit in txns[1::2] if credit.pk]
+    )
+
+
 @api_view(['POST'])
 @permission_classes([IsCustomer])
 def deposit(request):
     """Customer deposits money into their own account."""
     serializer = DepositSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    account_id = serializer.validated_data['account_id']
     amount = serializer.validated_data['amount']
-    description = serializer.validated_data['description']
 
     try:
-        account = Account.objects.get(id=account_id, user=request.user, is_active=True)
-    except Account.DoesNotExist:
-        return Response({'detail': 'Account not found or not active.'}, status=404)
-
-    with transaction.atomic():
-        account.balance += amount
-        account.save()
-        txn = Transaction.objects.create(
-            account=account,
-            transaction_type='credit',
-            amount=amount,
-            balance_after=account.balance,
-            description=description,
+        txn = ledger.post_entry(
+            serializer.validated_data['account_id'], 'credit', amount,
+            serializer.validated_data['description'], owner=request.user,
         )
+    except ledger.LedgerError as exc:
+        return Response({'detail': exc.detail}, status=exc.status)
+    _audit_posting('deposit', request.user, txn)
     return Response({
         'detail': f'₹{amount} deposited successfully.',
         'transaction': TransactionSerializer(txn).data,
-        'new_balance': str(account.balance),
+        'new_balance': str(txn.balance_after),
     })
 
 
@@ -226,33 +870,96 @@ def withdraw(request):
     """Customer withdraws money from their own account."""
     serializer = WithdrawSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    account_id = serializer.validated_data['account_id']
     amount = serializer.validated_data['amount']
-    description = serializer.validated_data['description']
 
     try:
-        account = Account.objects.get(id=account_id, user=request.user, is_active=True)
-    except Account.DoesNotExist:
-        return Response({'detail': 'Account not found or not active.'}, status=404)
+        txn = ledger.post_entry(
+            serializer.validated_data['account_id'], 'debit', amount,
+            serializer.validated_data['description'], owner=request.user,
+        )
+    except ledger.LedgerError as exc:
+        return Response({'detail': exc.detail}, status=exc.status)
+    _audit_posting('withdrawal', request.user, txn)
+    return Response({
+        'detail': f'₹{amount} withdrawn successfully.',
+        'transaction': TransactionSerializer(txn).data,
+        'new_balance': str(txn.balance_after),
+    })
 
-    if account.balance < amount:
-        return Response(
-            {'detail': f'Insufficient balance. Available: ₹{account.balance}'},
-            status=400
+
+# ─── Customer: Fund Transfer ────────────────────────────────────────
+def _resolve_transfers(items):
+    """
+    Map validated transfer dicts to ledger.Transfer, resolving destination
+    numbers with one query per ledger shard. Destinations on another shard
+    than the caller's carry their owner and number (see ledger.py).
+    """
+    numbers = {item['to_account_number'] for item in items}
+
+    def lookup(alias):
+        return [(alias, *row) for row in Account.objects.filter(
+            account_number__in=numbers, is_active=True
+        ).values_list('account_number', 'id', 'user_id')]
+
+    found = list(chain.from_iterable(sharding.scatter(lookup)))
+    if sharding.enabled():
+        # Mid-rebalance a customer's accounts exist on two shards; use the home copy.
+        homes = dict(User.objects.filter(id__in={row[3] for row in found}).values_list('id', 'shard'))
+        found = [row for row in found if row[0] == (homes.get(row[3]) or DEFAULT_DB_ALIAS)]
+    destinations = {number: (alias, pk, user_id) for alias, number, pk, user_id in found}
+    missing = numbers - destinations.keys()
+    if missing:
+        raise ledger.AccountNotFound(
+            f'Destination account not found: {", ".join(sorted(missing))}'
+        )
+    here = sharding.db()
+    transfers = []
+    for item in items:
+        number = item['to_account_number']
+        alias, pk, user_id = destinations[number]
+        remote = (user_id, number) if alias != here else ()
+        transfers.append(ledger.Transfer(item['from_account_id'], pk, item['amount'],
+                                         item['description'], *remote))
+    return transfers
+
+
+@api_view(['POST'])
+@permission_classes([IsCustomer])
+def transfer(request):
+    """Customer moves money from their own account to another account."""
+    serializer = TransferSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    amount = serializer.validated_data['amount']
+
+    try:
+        debit, credit = ledger.execute_transfers(
+            _resolve_transfers([serializer.validated_data]), owner=request.user
         )
+    except ledger.LedgerError as exc:
+        return Response({'detail': exc.detail}, status=exc.status)
+    _audit_transfers(request.user, [debit, credit])
+    return Response({
+        'detail': f'₹{amount} transferred successfully.',
+        'transaction': TransactionSerializer(debit).data,
+        'new_balance': str(debit.balance_after),
+    })
 
-    with transaction.atomic():
-        account.balance -= amount
-        account.save()
-        txn = Transaction.objects.create(
-            account=account,
-            transaction_type='debit',
-            amount=amount,
-            balance_after=account.balance,
-            description=description,
+
+@api_view(['POST'])
+@permission_classes([IsCustomer])
+def transfer_batch(request):
+    """Post many transfers from the customer's accounts in one all-or-nothing batch."""
+    serializer = TransferBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    try:
+        txns = ledger.execute_transfers(
+            _resolve_transfers(serializer.validated_data['transfers']), owner=request.user
         )
+    except ledger.LedgerError as exc:
+        return Response({'detail': exc.detail}, status=exc.status)
+    _audit_transfers(request.user, txns)
     return Response({
-        'detail': f'₹{amount} withdrawn successfully.',
-        'transaction': TransactionSerializer(txn).data,
-        'new_balance': str(account.balance),
+        'detail': f'{len(txns) // 2} transfers posted successfully.',
+        'transactions': TransactionSerializer(txns[::2], many=True).data,
     })
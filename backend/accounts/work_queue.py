@@ -0,0 +1,90 @@
+"""
+Service request work queue for RMs and super admins.
+
+Claiming locks the oldest pending rows with ``FOR UPDATE SKIP LOCKED``, so
+concurrent RMs each get a different batch instead of queueing on the same
+rows. Claimed rows move to ``in_progress`` and leave the partial
+``svc_pending_queue_idx``, so polling cost depends on the pending backlog
+only, not on the size of the request history. Every change is audited
+(see audit.py).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import audit, outbox
+from .models import ServiceRequest
+
+# Status a claimed (in_progress) request may move to; 'pending' releases it.
+TRANSITIONS = ('completed', 'rejected', 'pending')
+
+
+def _scope(user, queryset):
+    """RMs only see requests from their own customers; super admins see all."""
+    if user.role == 'rm':
+        return queryset.filter(user__created_by=user)
+    return queryset
+
+
+def claim_requests(user, limit):
+    """Claim up to ``limit`` of the oldest pending requests for ``user``."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = list(
+            _scope(user, ServiceRequest.objects.filter(status='pending'))
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('created_at', 'id')[:limit]
+        )
+        for req in claimed:
+            req.status = 'in_progress'
+            req.assigned_to = user
+            req.claimed_at = now
+            req.updated_at = now
+        ServiceRequest.objects.bulk_update(
+            claimed, ['status', 'assigned_to', 'claimed_at', 'updated_at']
+        )
+        _publish(claimed, user)
+    return claimed
+
+
+def bulk_transition(user, updates):
+    """
+    Apply ``[{'id', 'status', 'remarks'?}, ...]`` to requests in progress.
+
+    Only requests claimed by ``user`` (any claimed request for super
+    admins) are changed. Returns (updated requests, skipped ids).
+    """
+    now = timezone.now()
+    by_id = {u['id']: u for u in updates}
+    with transaction.atomic():
+        qs = ServiceRequest.objects.filter(id__in=by_id, status='in_progress')
+        if user.role != 'superadmin':
+            qs = qs.filter(assigned_to=user)
+        requests = list(qs.select_for_update(of=('self',)).order_by('id'))
+        for req in requests:
+            update = by_id[req.id]
+            req.status = update['status']
+            if update.get('remarks'):
+                req.remarks = update['remarks']
+            if req.status == 'pending':
+                req.assigned_to = None
+                req.claimed_at = None
+            req.updated_at = now
+        ServiceRequest.objects.bulk_update(
+            requests, ['status', 'remarks', 'assigned_to', 'claimed_at', 'updated_at']
+        )
+        _publish(requests, user)
+    skipped = sorted(set(by_id) - {req.id for req in requests})
+    return requests, skipped
+
+
+def _publish(requests, actor):
+    outbox.publish_many('service_request.updated', [
+        {'service_request_id': req.id, 'user_id': req.user_id,
+         'status': req.status, 'actor_id': actor.id}
+        for req in requests
+    ])
+    audit.record_many([
+        ('service_request.updated', actor, f'service_request:{req.id}',
+         {'status': req.status, 'remarks': req.remarks})
+        for req in requests
+    ])
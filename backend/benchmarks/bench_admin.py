@@ -0,0 +1,68 @@
+"""
+Admin changelists — query count must not grow with rows per page, plus
+page render time on a larger ledger, and a streamed CSV export check.
+Run: cd backend && python benchmarks/bench_admin.py
+"""
+import uuid
+from decimal import Decimal
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from accounts.admin import AccountAdmin, TransactionAdmin, ServiceRequestAdmin
+from accounts.models import User, Account, Transaction, ServiceRequest
+
+N_TXNS = 20_000
+
+admin_user = User.objects.create_superuser('bench_admin', 'a@b.c', 'pw', role='superadmin')
+users = User.objects.bulk_create([User(username=f'cust_{i}', role='customer') for i in range(200)])
+accounts = Account.objects.bulk_create([
+    Account(user=u, account_number=f"SB{uuid.uuid4().hex[:10].upper()}") for u in users
+])
+Transaction.objects.bulk_create([
+    Transaction(account=accounts[i % 200], transaction_type='credit', amount=Decimal('10.00'),
+                balance_after=Decimal(i), description='UPI Credit',
+                reference_id=f"TXN{uuid.uuid4().hex[:12].upper()}")
+    for i in range(N_TXNS)
+], batch_size=2000)
+ServiceRequest.objects.bulk_create([ServiceRequest(user=u, service_type='cheque_book') for u in users])
+
+client = Client()
+client.force_login(admin_user)
+storages = {'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+
+
+def changelist_queries(url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, response.status_code
+    return len(queries)
+
+
+print(f"🏦 Admin changelists ({N_TXNS} transactions)")
+with override_settings(STORAGES=storages):
+    for model_admin, url in ((TransactionAdmin, '/admin/accounts/transaction/'),
+                             (AccountAdmin, '/admin/accounts/account/'),
+                             (ServiceRequestAdmin, '/admin/accounts/servicerequest/')):
+        counts = {}
+        for per_page in (10, 100):
+            model_admin.list_per_page = per_page
+            counts[per_page] = changelist_queries(url)
+        assert counts[10] == counts[100], f"{url}: queries grow with page size {counts}"
+        model_admin.list_per_page = 50
+        elapsed, _ = best_of(lambda: client.get(url))
+        print(f"  {url:34s} {counts[10]} queries at 10 and 100 rows/page ✅  "
+              f"render {elapsed * 1000:6.1f} ms")
+
+    response = client.post('/admin/accounts/transaction/', {
+        'action': 'export_as_csv', 'select_across': '1', 'index': '0',
+        '_selected_action': [Transaction.objects.values_list('pk', flat=True).first()],
+    })
+    assert response.streaming, 'CSV export should stream'
+    lines = b''.join(response.streaming_content).count(b'\n')
+    assert lines == N_TXNS + 1, lines
+    print(f"  CSV export streamed {lines - 1} rows ✅")
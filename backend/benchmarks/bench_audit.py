@@ -0,0 +1,189 @@
+"""
+Audit log benchmark — cost of ``audit.record()`` on the request path (a
+buffer append) vs writing and hashing each entry synchronously, batched
+flush throughput, and verify_audit throughput. Checks: deposits,
+withdrawals, user creation (RM, customer, bulk onboarding) and service
+request changes are audited in order once committed, rolled-back work is
+not, a flush that loses the race for the chain head re-chains onto the
+winner, and the verifier finds an edited entry, a forged entry with a
+recomputed hash, a deleted entry and a truncated log.
+Uses one verifier worker on SQLite (an in-memory test DB is invisible to
+forked processes); set DATABASE_URL to a PostgreSQL server to try the pool.
+Run: cd backend && python benchmarks/bench_audit.py
+"""
+import io
+import json
+import os
+import tempfile
+import time
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts import audit
+from accounts.models import Account, AuditEntry, ServiceRequest, User
+
+EVENTS = 20_000
+LOG_SIZE = 200_000
+
+settings.AUDIT_FLUSH_SECONDS = None  # flush explicitly below
+settings.AUDIT_BATCH_SIZE = 10 ** 9
+settings.DEBIT_VELOCITY_LIMIT = None
+settings.DAILY_WITHDRAWAL_LIMIT = None
+STATE = os.path.join(tempfile.mkdtemp(), 'verify_audit_state.json')
+OUTPUT = os.path.join(tempfile.mkdtemp(), 'audit_problems.jsonl')
+
+
+def client(user):
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+
+def verify(incremental=False):
+    out = io.StringIO()
+    call_command('verify_audit', output=OUTPUT, state=STATE, incremental=incremental, stdout=out)
+    return out.getvalue()
+
+
+def verify_fails(expected):
+    try:
+        verify()
+    except CommandError:
+        with open(OUTPUT) as report:
+            problems = [json.loads(line)['problem'] for line in report]
+        assert any(expected in problem for problem in problems), problems
+    else:
+        raise AssertionError(f'verify_audit missed: {expected}')
+
+
+def actions(since):
+    return list(AuditEntry.objects.filter(seq__gt=since).order_by('seq').values_list('action', flat=True))
+
+
+# ─── Request-path cost ──────────────────────────────────────────────
+def synchronous():
+    for n in range(EVENTS):
+        audit._write([(timezone.now(), 'deposit', 1, 'account:1', {'amount': '10.00', 'n': n})])
+
+
+def buffered():
+    for n in range(EVENTS):
+        audit.record('deposit', 1, 'account:1', amount='10.00', n=n)
+
+
+sync_time, _ = best_of(synchronous, rounds=1)
+record_time, _ = best_of(buffered, rounds=1)
+started = time.perf_counter()
+flushed = audit.flush()
+flush_time = time.perf_counter() - started
+assert flushed == EVENTS
+print(f"🧾 Audit log — {EVENTS:,} events")
+print(f"  on the request path: write + hash each {sync_time / EVENTS * 1e6:7.1f} µs/event | "
+      f"buffered record() {record_time / EVENTS * 1e6:5.1f} µs/event")
+print(f"  batched flush {EVENTS / flush_time:,.0f} events/s "
+      f"(vs {EVENTS / sync_time:,.0f} events/s one at a time)")
+
+# ─── What gets audited ──────────────────────────────────────────────
+admin = User.objects.create(username='bench_audit_admin', role='superadmin')
+rm = User.objects.create(username='bench_audit_rm', role='rm', created_by=admin)
+start, _ = audit.head()
+
+response = client(admin).post('/api/managers/', {
+    'username': 'bench_audit_rm2', 'password': 'Secret#123', 'first_name': 'R', 'last_name': 'M'},
+    format='json')
+assert response.status_code == 201, response.data
+response = client(rm).post('/api/customers/', {
+    'username': 'bench_audit_cust', 'password': 'Secret#123', 'first_name': 'C', 'last_name': 'U'},
+    format='json')
+assert response.status_code == 201, response.data
+response = client(rm).post('/api/customers/onboard/', {
+    'customers': [{'username': f'bench_audit_bulk{i}'} for i in range(3)]}, format='json')
+assert response.status_code == 201, response.data
+
+customer = User.objects.get(username='bench_audit_cust')
+account = Account.objects.get(user=customer)
+api = client(customer)
+assert api.post('/api/deposit/', {'account_id': account.id, 'amount': '500.00',
+                                  'description': 'Salary'}, format='json').status_code == 200
+assert api.post('/api/withdraw/', {'account_id': account.id, 'amount': '900.00',
+                                   'description': 'ATM'}, format='json').status_code == 400
+assert api.post('/api/withdraw/', {'account_id': account.id, 'amount': '200.00',
+                                   'description': 'ATM'}, format='json').status_code == 200
+response = api.post('/api/services/', {'service_type': 'cheque_book', 'description': 'Please'},
+                    format='json')
+assert response.status_code == 201, response.data
+claimed = client(rm).post('/api/service-queue/claim/', {'limit': 5}, format='json').data['claimed']
+assert [row['id'] for row in claimed] == [response.data['id']]
+response = client(rm).post('/api/service-queue/bulk-status/', {
+    'updates': [{'id': response.data['id'], 'status': 'completed', 'remarks': 'Sent'}]}, format='json')
+assert response.data['updated'], response.data
+
+try:
+    with transaction.atomic():
+        req = ServiceRequest.objects.create(user=customer, service_type='cheque_book')
+        audit.record('service_request.created', customer, f'service_request:{req.id}')
+        raise RuntimeError
+except RuntimeError:
+    pass
+
+assert audit.flush() == 10
+assert actions(start) == ['user.created'] * 5 + [
+    'deposit', 'withdrawal', 'service_request.created',
+    'service_request.updated', 'service_request.updated'], actions(start)
+deposit = AuditEntry.objects.get(seq__gt=start, action='deposit')
+assert deposit.actor_id == customer.id and deposit.data['amount'] == '500.00', deposit.data
+assert AuditEntry.objects.filter(action='service_request.updated', data__status='completed').exists()
+print("  money movements, user creation and service request changes audited once committed ✅")
+
+# A flush that read a stale head loses the INSERT race and re-chains.
+real_head, stale = audit.head, audit.head()
+audit._write([(timezone.now(), 'test.winner', None, 'test:1', {})])
+calls = []
+audit.head = lambda: calls.append(1) or (stale if len(calls) == 1 else real_head())
+audit.record('test.loser', None, 'test:2')
+audit.flush()
+audit.head = real_head
+assert len(calls) == 2 and actions(stale[0]) == ['test.winner', 'test.loser']
+print("  concurrent flushes re-chain onto the winning head ✅")
+
+# ─── Verification ───────────────────────────────────────────────────
+head_seq, _ = audit.head()
+filler = [(timezone.now(), 'deposit', n, f'account:{n}', {'amount': '1.00'})
+          for n in range(LOG_SIZE - head_seq)]
+audit._write(filler)
+started = time.perf_counter()
+output = verify()
+elapsed = time.perf_counter() - started
+assert 'Audit log OK' in output, output
+print(f"  verify_audit: {LOG_SIZE:,} entries in {elapsed:.2f} s ({LOG_SIZE / elapsed:,.0f} entries/s)")
+
+target = deposit
+original = (target.data, target.hash)
+AuditEntry.objects.filter(pk=target.pk).update(data={**target.data, 'amount': '5000.00'})
+verify_fails('hash does not match')
+forged = {**target.data, 'amount': '5000.00'}
+AuditEntry.objects.filter(pk=target.pk).update(data=forged, hash=audit.entry_hash(
+    target.prev_hash, target.seq, target.created_at, target.action, target.actor_id, target.subject, forged))
+verify_fails('prev_hash does not match')
+AuditEntry.objects.filter(pk=target.pk).update(data=original[0], hash=original[1])
+
+middle = AuditEntry.objects.get(seq=LOG_SIZE // 2)
+middle.delete()
+verify_fails('missing')
+middle.save(force_insert=True)
+assert 'Audit log OK' in verify()
+
+audit.record('test.tail', None, 'test:3')
+audit.flush()
+assert 'verified (since entry' in verify(incremental=True)
+AuditEntry.objects.filter(seq__gt=LOG_SIZE - 10).delete()
+verify_fails('verified head was changed or removed')
+print("  edited, forged, deleted and truncated entries detected ✅")
@@ -0,0 +1,59 @@
+"""
+Benchmark — bytes and latency of API responses with and without compression.
+Compares encoders/levels on a transaction-list payload, adding the time to
+push the bytes over a slow mobile link, and checks streaming decompresses
+chunk by chunk.
+Run: cd backend && python benchmarks/bench_compression.py
+"""
+import gzip, uuid, zlib
+from decimal import Decimal
+from datetime import timedelta
+
+from common import best_of
+
+import django
+django.setup()
+
+from django.utils import timezone
+from accounts.middleware import brotli, gzip_sequence, brotli_sequence
+from accounts.renderers import ORJSONRenderer
+
+LINK_MBPS = 2  # high-RTT mobile uplink to the Vercel frontend
+now = timezone.now()
+
+
+def payload(n):
+    return ORJSONRenderer().render([
+        {'id': i, 'account_number': 'SB2025000001', 'transaction_type': 'credit' if i % 2 else 'debit',
+         'amount': f'{i * 3 % 15000}.00', 'balance_after': f'{i * 7}.25', 'description': 'UPI to Swiggy',
+         'reference_id': f"TXN{uuid.uuid4().hex[:12].upper()}",
+         'timestamp': (now - timedelta(minutes=i)).isoformat()}
+        for i in range(n)
+    ])
+
+
+encoders = [('identity', lambda b: b)]
+encoders += [(f'gzip-{lvl}', lambda b, lvl=lvl: gzip.compress(b, compresslevel=lvl, mtime=0)) for lvl in (1, 5, 6, 9)]
+if brotli is not None:
+    encoders += [(f'br-{q}', lambda b, q=q: brotli.compress(b, quality=q)) for q in (1, 4, 6, 11)]
+
+print(f"🏦 Compression at {LINK_MBPS} Mbps (cpu = best of 5)")
+for n in (50, 1_000, 10_000):
+    body = payload(n)
+    print(f"  {n} transactions, {len(body)} bytes raw")
+    for label, fn in encoders:
+        cpu, out = best_of(lambda: fn(body))
+        transfer = len(out) * 8 / (LINK_MBPS * 1_000_000)
+        print(f"    {label:9s} {len(out):9d} B  cpu {cpu * 1000:7.2f} ms  "
+              f"transfer {transfer * 1000:8.1f} ms  total {(cpu + transfer) * 1000:8.1f} ms")
+
+# Streaming: every chunk must be decodable on arrival (no whole-body buffering).
+chunks = [payload(100) for _ in range(5)]
+decoder = zlib.decompressobj(31)
+for raw, piece in zip(chunks, gzip_sequence(iter(chunks), 5)):
+    assert decoder.decompress(piece) == raw
+if brotli is not None:
+    decoder = brotli.Decompressor()
+    for raw, piece in zip(chunks, brotli_sequence(iter(chunks), 4)):
+        assert decoder.process(piece) == raw
+print("  streaming: each chunk decodes as soon as it is yielded ✅")
@@ -0,0 +1,51 @@
+"""
+Contention benchmark — concurrent credits into one hot account, single-row
+balance vs N balance slots.
+Threads run concurrently on PostgreSQL (set DATABASE_URL); SQLite has a
+single writer, so it runs one worker and only shows the per-credit overhead.
+Run: cd backend && python benchmarks/bench_hot_account.py
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from common import setup_test_db
+
+setup_test_db()
+
+from django.db import connection, connections
+from accounts import ledger
+from accounts.models import User, Account
+
+PER_WORKER = 300
+SLOTS = 16
+WORKERS = 16 if connection.vendor == 'postgresql' else 1
+
+user = User.objects.create(username='bench_payroll', role='customer')
+
+
+def worker(account_id):
+    try:
+        for _ in range(PER_WORKER):
+            ledger.post_entry(account_id, 'credit', Decimal('1.00'), 'Salary Collection')
+    finally:
+        connections.close_all()
+
+
+print(f"🏦 {WORKERS} worker(s) × {PER_WORKER} credits into one account ({connection.vendor})")
+for label, slots in (('single row', 0), (f'{SLOTS} slots', SLOTS)):
+    account = Account.objects.create(user=user, account_number=f"SB{uuid.uuid4().hex[:10].upper()}")
+    if slots:
+        ledger.set_balance_slots(account.id, slots)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(WORKERS) as pool:
+        list(pool.map(worker, [account.id] * WORKERS))
+    elapsed = time.perf_counter() - started
+
+    expected = Decimal(WORKERS * PER_WORKER)
+    assert Account.objects.get(pk=account.pk).live_balance() == expected
+    # A debit consolidates the slots into one consistent total.
+    ledger.post_entry(account.id, 'debit', Decimal('1.00'), 'Sweep')
+    assert Account.objects.get(pk=account.pk).balance == expected - 1
+    print(f"  {label:12s} {WORKERS * PER_WORKER / elapsed:8.0f} credits/s  ({elapsed:.2f} s), balance exact ✅")
@@ -0,0 +1,118 @@
+"""
+Debit-limit benchmark — sliding-window counter check vs a range scan of
+the account's last 24 h of Transaction rows, on an account with many
+debits. Also checks the limits: velocity and daily limits refuse the
+posting that would exceed them, rolled-back postings are not counted,
+windows slide, and counters are re-seeded from the ledger after the cache
+is cleared.
+Run: cd backend && python benchmarks/bench_limits.py
+"""
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from accounts import ledger, limits
+from accounts.models import User, Account, Transaction
+
+DEBITS = 20_000
+CHECKS = 1_000
+
+user = User.objects.create(username='bench_limits', role='customer')
+
+
+def new_account(balance='1000000.00'):
+    return Account.objects.create(user=user, account_number=f"SB{uuid.uuid4().hex[:10].upper()}",
+                                  balance=Decimal(balance))
+
+
+def withdraw(account, amount):
+    return ledger.post_entry(account.id, 'debit', Decimal(amount), 'ATM Withdrawal')
+
+
+# ─── Cost per check ─────────────────────────────────────────────────
+busy = new_account()
+Transaction.objects.bulk_create([
+    Transaction(account=busy, transaction_type='debit', amount=Decimal('1.00'),
+                balance_after=Decimal('1000000.00'), description='UPI', reference_id=f'TXNB{i:011d}')
+    for i in range(DEBITS)
+], batch_size=2000)
+since = timezone.now() - timedelta(days=1)
+
+
+def scan():
+    for _ in range(CHECKS):
+        Transaction.objects.filter(account=busy, transaction_type='debit', timestamp__gte=since) \
+            .aggregate(total=Sum('amount'), count=Count('id'))
+
+
+def counters():
+    for _ in range(CHECKS):
+        limits.check_debits({busy.id: Decimal('1.00')})
+
+
+settings.DEBIT_VELOCITY_LIMIT = 10 ** 9
+settings.DAILY_WITHDRAWAL_LIMIT = '10000000000.00'
+scan_time, _ = best_of(scan, rounds=3)
+counter_time, _ = best_of(counters, rounds=3)
+print(f"🏦 Debit limit check, account with {DEBITS:,} debits today ({connection.vendor}, "
+      f"{settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]})")
+print(f"  range scan   {scan_time / CHECKS * 1e6:8.1f} µs/check")
+print(f"  counters     {counter_time / CHECKS * 1e6:8.1f} µs/check  ({scan_time / counter_time:.0f}x)")
+assert round(limits.estimate(limits.DAILY, busy.id)) == DEBITS * 100  # seeded from the ledger
+
+# ─── Limits ─────────────────────────────────────────────────────────
+settings.DEBIT_VELOCITY_LIMIT = 3
+settings.DAILY_WITHDRAWAL_LIMIT = '500.00'
+
+account = new_account()
+for _ in range(3):
+    withdraw(account, '10.00')
+try:
+    withdraw(account, '10.00')
+    raise AssertionError('velocity limit not enforced')
+except ledger.LimitExceeded as exc:
+    assert exc.status == 429
+
+account = new_account()
+withdraw(account, '400.00')
+try:
+    withdraw(account, '100.01')
+    raise AssertionError('daily limit not enforced')
+except ledger.LimitExceeded as exc:
+    assert 'Available now: ₹100.00' in exc.detail, exc.detail
+withdraw(account, '100.00')
+print("  velocity and daily limits refuse the posting over the limit ✅")
+
+account = new_account()
+try:
+    with transaction.atomic():
+        withdraw(account, '300.00')
+        raise RuntimeError('roll back')
+except RuntimeError:
+    pass
+withdraw(account, '500.00')
+print("  rolled-back debits are not counted ✅")
+
+now = time.time()
+limits.add(limits.VELOCITY, 'sliding', 6, now=now)
+assert limits.estimate(limits.VELOCITY, 'sliding', now=now + 30) == 6
+assert limits.estimate(limits.VELOCITY, 'sliding', now=now + 75) == 0
+print("  windows slide: counts expire after the window ✅")
+
+caches[settings.LIMITS_CACHE].clear()
+try:
+    withdraw(account, '0.01')
+    raise AssertionError('counters not re-seeded from the ledger')
+except ledger.LimitExceeded:
+    pass
+print("  cleared cache re-seeded from the ledger ✅")
@@ -0,0 +1,83 @@
+"""
+Money storage benchmark — NUMERIC (DecimalField) vs BIGINT paise (PaiseField).
+Two throwaway tables with the same rows; compares posting (balance update
+with an F() expression), SUM aggregation and reading + serializing rows
+against exact results. SQLite stores NUMERIC as REAL, so repeated postings
+can drift there; the paise column must always be exact.
+Run: cd backend && python benchmarks/bench_money.py
+"""
+import random
+from decimal import Decimal
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.db import connection, models
+from django.db.models import F, Sum
+from rest_framework import serializers
+from accounts.fields import PaiseField, paise
+
+ROWS = 50_000
+POSTINGS = 2_000
+
+
+class NumericRow(models.Model):
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+
+    class Meta:
+        app_label = 'accounts'
+
+
+class PaiseRow(models.Model):
+    amount = PaiseField()
+
+    class Meta:
+        app_label = 'accounts'
+
+
+with connection.schema_editor() as editor:
+    editor.create_model(NumericRow)
+    editor.create_model(PaiseRow)
+
+rng = random.Random(42)
+amounts = [Decimal(rng.randint(100, 10_000_000)).scaleb(-2) for _ in range(ROWS)]
+for model in (NumericRow, PaiseRow):
+    model.objects.bulk_create([model(amount=a) for a in amounts], batch_size=5000)
+
+
+def post(model, wrap):
+    def run():
+        model.objects.filter(pk=1).update(amount=wrap(amounts[0]))
+        for a in amounts[:POSTINGS]:
+            model.objects.filter(pk=1).update(amount=F('amount') + wrap(a))
+        return model.objects.get(pk=1).amount
+    return run
+
+
+def total(model):
+    return lambda: model.objects.aggregate(t=Sum('amount'))['t']
+
+
+money = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+def serialize(model):
+    return lambda: [money.to_representation(a) for a in model.objects.order_by('pk').values_list('amount', flat=True)]
+
+
+print(f"🏦 Money columns — {ROWS:,} rows, {POSTINGS:,} postings ({connection.vendor})")
+posted = amounts[0] + sum(amounts[:POSTINGS])
+cases = (
+    ('posting', post(NumericRow, lambda a: a), post(PaiseRow, paise), posted),
+    ('SUM', total(NumericRow), total(PaiseRow), sum(amounts[1:]) + posted),
+    ('serialize', serialize(NumericRow), serialize(PaiseRow),
+     [money.to_representation(a) for a in [posted, *amounts[1:]]]),
+)
+for label, numeric, integer, expected in cases:
+    numeric_time, numeric_result = best_of(numeric, rounds=3)
+    paise_time, paise_result = best_of(integer, rounds=3)
+    exact = ['✅' if result == expected else '❌' for result in (numeric_result, paise_result)]
+    print(f"  {label:10s} NUMERIC {numeric_time * 1000:8.1f} ms {exact[0]}"
+          f" | paise {paise_time * 1000:8.1f} ms {exact[1]} | {numeric_time / paise_time:4.1f}x")
+    assert paise_result == expected, label
@@ -0,0 +1,55 @@
+"""
+Bulk onboarding benchmark — customers/s through accounts.onboarding, for
+rows without passwords (unusable password plus an invite token) and rows
+with passwords (hashed with the configured hasher across a process pool).
+Also checks the per-row report: duplicates and taken usernames rejected,
+every created customer has exactly one account.
+Run: cd backend && python benchmarks/bench_onboarding.py
+"""
+import os
+import time
+
+from common import setup_test_db
+
+setup_test_db()
+
+from django.db import connection
+from accounts import batch, onboarding
+from accounts.models import Account, User
+
+ROWS = 5000
+HASHED_ROWS = 40
+WORKERS = max(batch.default_workers(), min(os.cpu_count() or 1, 8))
+
+rm = User.objects.create(username='bench_rm', role='rm')
+
+
+def rows(prefix, count, password=''):
+    return [{'username': f'{prefix}{i:05d}', 'first_name': 'Emp', 'last_name': str(i),
+             'email': f'{prefix}{i}@corp.example', 'phone': '98765', 'password': password}
+            for i in range(count)]
+
+
+print(f"🏦 Bulk onboarding ({connection.vendor}, {WORKERS} hashing process(es))")
+for label, batch_rows, workers in (
+    ('no passwords', rows('emp', ROWS), 1),
+    ('with passwords', rows('pwd', HASHED_ROWS, 'S3cret!pass'), WORKERS),
+):
+    started = time.perf_counter()
+    result = onboarding.onboard(batch_rows, rm, workers=workers)
+    elapsed = time.perf_counter() - started
+    assert result['created'] == len(batch_rows) and result['errors'] == 0, result['errors']
+    print(f"  {label:15s} {len(batch_rows):5d} rows  {len(batch_rows) / elapsed:8.0f} customers/s  ({elapsed:.2f} s)")
+
+created = User.objects.filter(created_by=rm)
+assert Account.objects.filter(user__in=created).count() == created.count() == ROWS + HASHED_ROWS
+assert User.objects.get(username='pwd00000').check_password('S3cret!pass')
+assert not User.objects.get(username='emp00000').has_usable_password()
+
+# Taken username, duplicate in the file, invalid row, one good row.
+report = onboarding.onboard(
+    [{'username': 'emp00001'}, {'username': 'new1'}, {'username': 'new1'},
+     {'username': 'bad name!'}, {'username': 'new2', 'account_type': 'gold'}], rm,
+)
+assert [row['status'] for row in report['rows']] == ['error', 'created', 'error', 'error', 'error'], report
+print("  per-row report: taken, duplicate and invalid rows rejected, valid rows created ✅")
@@ -0,0 +1,131 @@
+"""
+Recent-transactions cache benchmark — the customer dashboard's "recent
+transactions" and a ``?limit=`` statement page served from the per-user
+ring buffer vs the indexed query over the customer's Transaction rows.
+Checks: the buffer always matches the table after deposits, transfers
+between two cached customers and rolled-back postings; it is capped at
+RECENT_TRANSACTIONS_SIZE rows; a posting made while another writer holds
+the lock drops the buffer instead of leaving it stale; an evicted buffer
+is rebuilt on the next read; and a statement page falls back to the
+archive-aware path when the table has fewer rows than asked for.
+Run: cd backend && python benchmarks/bench_recent.py
+"""
+import uuid
+from decimal import Decimal
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from accounts import ledger, recent
+from accounts.fast_serializers import TransactionValuesSerializer
+from accounts.models import User, Account, Transaction
+
+HISTORY = 20_000
+READS = 1_000
+SIZE = settings.RECENT_TRANSACTIONS_SIZE
+
+settings.DEBIT_VELOCITY_LIMIT = None
+settings.DAILY_WITHDRAWAL_LIMIT = None
+cache = recent._cache()
+
+
+def new_customer(name):
+    user = User.objects.create(username=name, role='customer')
+    account = Account.objects.create(user=user, account_number=f"SB{uuid.uuid4().hex[:10].upper()}",
+                                     balance=Decimal('1000000.00'))
+    return user, account
+
+
+def from_table(user, n=SIZE):
+    return recent._query(user, n)
+
+
+def assert_fresh(user):
+    assert recent.latest(user, SIZE) == from_table(user), user.username
+
+
+# ─── Read cost ──────────────────────────────────────────────────────
+busy, busy_account = new_customer('bench_recent')
+Transaction.objects.bulk_create([
+    Transaction(account=busy_account, transaction_type='credit', amount=Decimal('1.00'),
+                balance_after=Decimal('1000000.00'), description='UPI', reference_id=f'TXNR{i:011d}')
+    for i in range(HISTORY)
+], batch_size=2000)
+
+
+def query():
+    for _ in range(READS):
+        list(TransactionValuesSerializer().values(Transaction.objects.filter(account__user=busy))[:5])
+
+
+def cached():
+    for _ in range(READS):
+        recent.latest(busy, 5)
+
+
+query_time, _ = best_of(query, rounds=3)
+cached_time, _ = best_of(cached, rounds=3)
+print(f"🧾 Recent transactions — customer with {HISTORY:,} rows, {READS:,} dashboard reads")
+print(f"  table query {query_time / READS * 1e6:7.1f} µs/read | ring buffer "
+      f"{cached_time / READS * 1e6:7.1f} µs/read ({query_time / cached_time:.0f}x)")
+
+api = APIClient()
+api.force_authenticate(busy)
+with CaptureQueriesContext(connection) as queries:
+    stats = api.get('/api/dashboard-stats/').data
+    page = api.get('/api/transactions/', {'limit': 10}).data
+assert not any('accounts_transaction' in q['sql'] for q in queries.captured_queries)
+assert [row['id'] for row in stats['recent_transactions']] == [row[0] for row in from_table(busy, 5)]
+assert [row['id'] for row in page] == [row[0] for row in from_table(busy, 10)]
+print("  dashboard and ?limit= statement page read no Transaction rows ✅")
+
+# ─── Freshness ──────────────────────────────────────────────────────
+alice, alice_account = new_customer('bench_recent_alice')
+bob, bob_account = new_customer('bench_recent_bob')
+for user in (alice, bob):
+    assert recent.latest(user, SIZE) == []  # cache both, empty
+for n in range(SIZE + 5):
+    ledger.post_entry(alice_account.id, 'credit', Decimal('10.00'), 'Salary')
+    ledger.execute_transfers([
+        ledger.Transfer(alice_account.id, bob_account.id, Decimal('1.00'), 'Split')])
+    assert len(cache.get(recent._key(alice.id))) == min(2 * (n + 1), SIZE)
+assert_fresh(alice)
+assert_fresh(bob)
+
+try:
+    with transaction.atomic():
+        ledger.post_entry(alice_account.id, 'credit', Decimal('99.00'), 'Rolled back')
+        raise RuntimeError
+except RuntimeError:
+    pass
+assert_fresh(alice)
+print(f"  buffer matches the table after postings, transfers and a rollback, capped at {SIZE} ✅")
+
+# A concurrent writer holds Alice's lock: the posting must drop her buffer.
+with recent._locked(alice.id) as held:
+    assert held
+    ledger.post_entry(alice_account.id, 'debit', Decimal('5.00'), 'ATM Withdrawal')
+    assert cache.get(recent._key(alice.id)) is None
+    cache.set(recent._key(alice.id), from_table(alice)[1:])  # stale write by the lock holder
+assert cache.get(recent._key(alice.id)) is None
+assert_fresh(alice)
+
+cache.delete(recent._key(bob.id))  # evicted
+assert_fresh(bob)
+print("  contended postings drop the buffer, evicted buffers are rebuilt ✅")
+
+# ─── Statement fallback ─────────────────────────────────────────────
+newcomer, newcomer_account = new_customer('bench_recent_new')
+ledger.post_entry(newcomer_account.id, 'credit', Decimal('10.00'), 'Opening deposit')
+api.force_authenticate(newcomer)
+with CaptureQueriesContext(connection) as queries:
+    page = api.get('/api/transactions/', {'limit': 5}).data
+assert len(page) == 1
+assert sum('accounts_transaction' in q['sql'] for q in queries.captured_queries) >= 2
+assert api.get('/api/transactions/', {'limit': '0'}).status_code == 400
+print("  short statements fall back to the archive-aware path ✅")
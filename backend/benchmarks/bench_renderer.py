@@ -0,0 +1,57 @@
+"""
+Benchmark — render time of a 10k-transaction payload, DRF JSONRenderer vs ORJSONRenderer.
+Run: cd backend && python benchmarks/bench_renderer.py
+"""
+import os, sys, time, uuid
+from decimal import Decimal
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'subbu_bank.settings')
+
+import django
+django.setup()
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from accounts.models import Account, Transaction
+from accounts.renderers import ORJSONRenderer
+from accounts.serializers import TransactionSerializer
+
+N = 10_000
+ROUNDS = 10
+
+# Build unsaved instances so the benchmark needs no database.
+account = Account(id=1, account_number='SB2025000001', balance=Decimal('0.00'))
+now = timezone.now()
+txns = [
+    Transaction(
+        id=i, account=account,
+        transaction_type='credit' if i % 2 else 'debit',
+        amount=Decimal('1234.50'), balance_after=Decimal(i) + Decimal('0.25'),
+        description='UPI to Swiggy', reference_id=f"TXN{uuid.uuid4().hex[:12].upper()}",
+        timestamp=now - timedelta(minutes=i),
+    )
+    for i in range(N)
+]
+data = TransactionSerializer(txns, many=True).data
+# A raw payload too, to exercise Decimal / datetime handling in the encoder.
+raw = [{'amount': t.amount, 'timestamp': t.timestamp, 'ref': t.reference_id} for t in txns]
+
+
+def bench(renderer, payload):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        out = renderer.render(payload, 'application/json', {})
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+print(f"🏦 Rendering {N} transactions (best of {ROUNDS})")
+for label, payload in (('serialized', data), ('raw Decimal/datetime', raw)):
+    drf_time, drf_out = bench(JSONRenderer(), payload)
+    fast_time, fast_out = bench(ORJSONRenderer(), payload)
+    assert drf_out == fast_out, f"{label}: renderer output differs"
+    print(f"  {label:22s} DRF {drf_time * 1000:8.2f} ms | orjson {fast_time * 1000:8.2f} ms"
+          f" | {drf_time / fast_time:5.1f}x  ({len(fast_out)} bytes, identical)")
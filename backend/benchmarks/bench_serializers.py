@@ -0,0 +1,65 @@
+"""
+Benchmark + golden check — ModelSerializer vs values-based fast serializers.
+Run: cd backend && python benchmarks/bench_serializers.py
+"""
+import uuid
+from decimal import Decimal
+from datetime import timedelta
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.utils import timezone
+from accounts.models import User, Account, Transaction, ServiceRequest
+from accounts.serializers import (
+    UserSerializer, AccountSerializer, TransactionSerializer, ServiceRequestSerializer,
+)
+from accounts.fast_serializers import (
+    UserValuesSerializer, AccountValuesSerializer,
+    TransactionValuesSerializer, ServiceRequestValuesSerializer,
+)
+
+N = 5_000
+now = timezone.now()
+
+rm = User.objects.create(username='rm_bench', role='rm')
+users = User.objects.bulk_create([
+    User(username=f'cust_{i}', first_name='Ravi' if i % 3 else '', last_name='Kumar' if i % 3 else '',
+         email=f'c{i}@email.com', role='customer', phone='9001234567', created_by=rm)
+    for i in range(N)
+])
+accounts = Account.objects.bulk_create([
+    Account(user=u, account_number=f"SB{uuid.uuid4().hex[:10].upper()}",
+            account_type=('savings', 'current', 'salary')[i % 3], balance=Decimal('1050.75'))
+    for i, u in enumerate(users)
+])
+Transaction.objects.bulk_create([
+    Transaction(account=accounts[i % 50], transaction_type='credit' if i % 2 else 'debit',
+                amount=Decimal('1234.50'), balance_after=Decimal(i) + Decimal('0.25'),
+                description='UPI to Swiggy', reference_id=f"TXN{uuid.uuid4().hex[:12].upper()}",
+                timestamp=now - timedelta(minutes=i))
+    for i in range(N)
+])
+ServiceRequest.objects.bulk_create([
+    ServiceRequest(user=users[i % 50], service_type='cheque_book',
+                   status=('pending', 'completed')[i % 2], remarks='Bench')
+    for i in range(N)
+])
+
+cases = [
+    ('users', User.objects.filter(role='customer').order_by('-date_joined'),
+     UserSerializer, UserValuesSerializer),
+    ('accounts', Account.objects.all(), AccountSerializer, AccountValuesSerializer),
+    ('transactions', Transaction.objects.all(), TransactionSerializer, TransactionValuesSerializer),
+    ('service requests', ServiceRequest.objects.all(),
+     ServiceRequestSerializer, ServiceRequestValuesSerializer),
+]
+
+print(f"🏦 Serializing {N} rows per model (best of 5, query included)")
+for label, qs, model_ser, values_ser in cases:
+    slow_time, slow = best_of(lambda: model_ser(qs.all(), many=True).data)
+    fast_time, fast = best_of(lambda: values_ser().serialize(values_ser().values(qs.all())))
+    assert [dict(row) for row in slow] == fast, f"{label}: fast output differs from serializer"
+    print(f"  {label:18s} ModelSerializer {slow_time * 1000:8.1f} ms | values {fast_time * 1000:7.1f} ms"
+          f" | {slow_time / fast_time:5.1f}x  (golden ✅)")
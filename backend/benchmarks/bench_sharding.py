@@ -0,0 +1,208 @@
+"""
+Ledger sharding — runs against three SQLite shards (in-memory test
+databases) next to ``default``. Times the superadmin dashboard's
+scatter-gather against the same queries run one database after another
+(in-memory SQLite has no I/O to overlap, so expect no gain here; with a
+Postgres server per shard the shards are queried in parallel), and moving
+customers between shards. Checks: customers are spread over
+the shards with ids in disjoint ranges, postings and cross-shard transfers
+land on the right databases with the money conserved, the dashboards and
+the RM portfolio match totals computed shard by shard, search finds
+account numbers on any shard, and rebalancing (including re-running an
+interrupted move) keeps every balance, transaction and id.
+Run: cd backend && python benchmarks/bench_sharding.py
+"""
+import io
+import os
+import tempfile
+import time
+from collections import Counter
+from decimal import Decimal
+
+os.environ.setdefault('LEDGER_SQLITE_SHARDS', '3')
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Sum
+from rest_framework.test import APIClient
+from accounts import onboarding, outbox, sharding
+from accounts.models import Account, Transaction, User
+
+CUSTOMERS = 600
+DEPOSITS = 300
+
+settings.DEBIT_VELOCITY_LIMIT = None
+settings.DAILY_WITHDRAWAL_LIMIT = None
+assert settings.LEDGER_SHARDS == ['shard1', 'shard2', 'shard3']
+
+
+def client(user):
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+
+def ledger_totals():
+    """(accounts, balance, transactions) per alias, read shard by shard."""
+    totals = {}
+    for alias in sharding.aliases():
+        accounts = Account.objects.using(alias)
+        totals[alias] = (accounts.count(), accounts.aggregate(s=Sum('balance'))['s'] or 0,
+                         Transaction.objects.using(alias).count())
+    return totals
+
+
+def drain_outbox():
+    for alias in sharding.aliases():
+        with sharding.use(alias):
+            while outbox.process_batch(500):
+                pass
+
+
+# ─── Placement ──────────────────────────────────────────────────────
+rm = User.objects.create(username='bench_rm', role='rm')
+admin = User.objects.create(username='bench_admin', role='superadmin')
+onboarding.onboard([{'username': f'cust{i:04d}'} for i in range(CUSTOMERS)], rm)
+customers = list(User.objects.filter(created_by=rm).order_by('id'))
+per_shard = {alias: 0 for alias in settings.LEDGER_SHARDS}
+for user in customers:
+    per_shard[user.shard] += 1
+    account = Account.objects.for_user(user).get()
+    floor = sharding.aliases().index(user.shard) * sharding.ID_RANGE
+    assert floor <= account.id < floor + sharding.ID_RANGE, (user.shard, account.id)
+assert Account.objects.using('default').count() == 0
+assert max(per_shard.values()) - min(per_shard.values()) <= 1, per_shard
+print(f"🏦 Ledger sharding — {CUSTOMERS} customers on {len(per_shard)} SQLite shards {per_shard}")
+print("  customers spread evenly, accounts on their shard with disjoint id ranges ✅")
+
+# ─── Postings ───────────────────────────────────────────────────────
+accounts = {user.id: Account.objects.for_user(user).get() for user in customers}
+for n in range(DEPOSITS):
+    user = customers[n % len(customers)]
+    response = client(user).post('/api/deposit/', {
+        'account_id': accounts[user.id].id, 'amount': '100.00', 'description': 'Salary'},
+        format='json')
+    assert response.status_code == 200, response.data
+totals = ledger_totals()
+assert sum(balance for _, balance, _ in totals.values()) == DEPOSITS * 100
+assert totals['default'] == (0, 0, 0), totals['default']
+print("  deposits routed to each customer's shard ✅")
+
+alice, bob, carol = customers[0], customers[1], customers[2]
+assert len({alice.shard, bob.shard, carol.shard}) == 3
+response = client(alice).post('/api/transfer/', {
+    'from_account_id': accounts[alice.id].id, 'to_account_number': accounts[bob.id].account_number,
+    'amount': '40.00', 'description': 'Rent'}, format='json')
+assert response.status_code == 200, response.data
+assert response.data['new_balance'] == '60.00'
+Account.objects.using(carol.shard).filter(user=carol).update(is_active=False)
+response = client(alice).post('/api/transfer/', {
+    'from_account_id': accounts[alice.id].id, 'to_account_number': accounts[carol.id].account_number,
+    'amount': '10.00', 'description': 'Gift'}, format='json')
+assert response.status_code == 404, response.data  # closed accounts are not resolved
+Account.objects.using(carol.shard).filter(user=carol).update(is_active=True)
+response = client(alice).post('/api/transfer/', {
+    'from_account_id': accounts[alice.id].id, 'to_account_number': accounts[carol.id].account_number,
+    'amount': '10.00', 'description': 'Gift'}, format='json')
+assert response.status_code == 200, response.data
+# Carol's account closes before the credit is delivered: Alice is refunded.
+Account.objects.using(carol.shard).filter(user=carol).update(is_active=False)
+drain_outbox()
+drain_outbox()  # redelivery is a no-op
+balance = {user.id: Account.objects.for_user(user).get().balance for user in (alice, bob, carol)}
+assert balance == {alice.id: Decimal('60.00'), bob.id: Decimal('140.00'), carol.id: Decimal('100.00')}, balance
+assert sum(balance for _, balance, _ in ledger_totals().values()) == DEPOSITS * 100
+Account.objects.using(carol.shard).filter(user=carol).update(is_active=True)
+print("  cross-shard transfer credited once by the outbox worker, refunded when the account closed ✅")
+
+# ─── Reads across shards ────────────────────────────────────────────
+totals = ledger_totals()
+expected_balance = sum(balance for _, balance, _ in totals.values())
+stats = client(admin).get('/api/dashboard-stats/').data
+assert stats['total_accounts'] == CUSTOMERS and Decimal(stats['total_balance']) == expected_balance, stats
+stats = client(rm).get('/api/dashboard-stats/').data
+assert stats['total_customers'] == CUSTOMERS == stats['total_accounts'], stats
+assert Decimal(stats['total_balance']) == expected_balance, stats
+
+page = client(rm).get('/api/customers/', {'summary': 'true', 'ordering': '-total_balance',
+                                          'min_balance': '100', 'page_size': 500}).data
+rows = page['results']
+assert rows[0]['username'] == bob.username and rows[0]['total_balance'] == '140.00', rows[0]
+assert all(Decimal(row['total_balance']) >= 100 for row in rows)
+assert page['count'] == sum(1 for b in balance.values() if b >= 100) + DEPOSITS - 3, page['count']
+assert [row['total_balance'] for row in rows] == sorted((row['total_balance'] for row in rows),
+                                                         key=Decimal, reverse=True)
+assert rows[0]['last_transaction_at'] is not None and rows[0]['account_count'] == 1
+
+found = client(rm).get('/api/customers/', {'search': accounts[carol.id].account_number[2:]}).data
+assert [row['username'] for row in found] == [carol.username], found
+found = client(rm).get(f'/api/customers/{carol.id}/accounts/').data
+assert [row['account_number'] for row in found] == [accounts[carol.id].account_number], found
+print("  dashboards, RM portfolio and search gather every shard ✅")
+
+
+def serial():
+    return [(Account.objects.using(alias).count(), Account.objects.using(alias).total_balance())
+            for alias in sharding.aliases()]
+
+
+def scattered():
+    return sharding.scatter(lambda alias: (Account.objects.count(), Account.objects.total_balance()))
+
+
+assert serial() == scattered()
+serial_time, _ = best_of(serial, rounds=20)
+scatter_time, _ = best_of(scattered, rounds=20)
+print(f"  superadmin totals: one by one {serial_time * 1e3:6.2f} ms | scatter-gather "
+      f"{scatter_time * 1e3:6.2f} ms")
+
+# ─── Rebalancing ────────────────────────────────────────────────────
+STATE = os.path.join(tempfile.mkdtemp(), 'verify_state.json')
+call_command('verify_ledger', output=os.devnull, state=STATE, stdout=io.StringIO())
+before = {alias: totals[alias] for alias in totals}
+history = list(Transaction.objects.using(alice.shard).filter(account__user=alice)
+               .order_by('id').values_list('id', 'amount', 'balance_after', 'reference_id'))
+source, target = alice.shard, bob.shard
+expected_rows = sum(qs.count() for _, qs in sharding._ledger_rows(source, [accounts[alice.id].id]))
+
+# Interrupted move: copies left on the target are discarded by the re-run.
+sharding.mirror_users([alice], target)
+for _, queryset in sharding._ledger_rows(source, [accounts[alice.id].id]):
+    sharding._copy_rows(queryset, target)
+copied = sharding.move_customer(alice, target)
+alice.refresh_from_db()
+assert alice.shard == target and copied == expected_rows, (copied, expected_rows)
+moved = list(Transaction.objects.using(target).filter(account__user=alice)
+             .order_by('id').values_list('id', 'amount', 'balance_after', 'reference_id'))
+assert moved == history
+assert not Account.objects.using(source).filter(user=alice).exists()
+assert not Transaction.objects.using(source).filter(account__user=alice).exists()
+
+response = client(alice).post('/api/deposit/', {
+    'account_id': accounts[alice.id].id, 'amount': '5.00', 'description': 'Cashback'}, format='json')
+assert response.status_code == 200 and response.data['new_balance'] == '65.00', response.data
+floor = sharding.aliases().index(target) * sharding.ID_RANGE
+assert floor <= response.data['transaction']['id'] < floor + sharding.ID_RANGE
+assert sharding.move_customer(alice, target) == 0  # already there: nothing to do
+call_command('verify_ledger', output=os.devnull, state=STATE, stdout=io.StringIO())
+
+movers = [user for user in customers[3:] if user.shard == source][:60]
+started = time.perf_counter()
+rows_copied = sum(sharding.move_customer(user, target) for user in movers)
+elapsed = time.perf_counter() - started
+after = ledger_totals()
+assert sum(b for _, b, _ in after.values()) == sum(b for _, b, _ in before.values()) + 5
+assert after[source][0] == before[source][0] - len(movers) - 1
+print(f"  rebalance: interrupted move re-run, ids and history kept ✅  "
+      f"{len(movers)} customers ({rows_copied} rows) in {elapsed:.2f} s")
+
+call_command('rebalance_shards', auto=True, stdout=io.StringIO())
+load = Counter(User.objects.filter(role='customer').values_list('shard', flat=True))
+assert max(load.values()) - min(load.values()) <= 1, load
+assert sum(b for _, b, _ in ledger_totals().values()) == sum(b for _, b, _ in after.values())
+call_command('verify_ledger', output=os.devnull, state=STATE, stdout=io.StringIO())
+print(f"  rebalance_shards --auto evened the shards {dict(load)} ✅")
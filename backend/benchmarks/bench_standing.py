@@ -0,0 +1,167 @@
+"""
+Standing instructions benchmark — a month-start run of INSTRUCTIONS
+recurring payments and sweeps over ACCOUNTS accounts with the batched
+scheduler, vs executing instructions one at a time through post_entry
+(timed on a sample). Checks: the due query uses the partial si_due_idx
+index, chunks never split an account, payments debit exactly once per
+date (re-runs are no-ops), uncovered payments fail without posting,
+sweeps move only the excess, closed destinations fail, end dates stop
+an instruction, missed dates catch up, monthly dates keep their day
+(clamped to short months), balances reconcile with verify_ledger, and the
+customer API validates, lists and cancels instructions.
+Run: cd backend && python benchmarks/bench_standing.py
+"""
+import io
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from common import setup_test_db
+
+setup_test_db()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from rest_framework.test import APIClient
+from accounts import ledger, standing
+from accounts.models import Account, InstructionRun, StandingInstruction, Transaction, User
+
+ACCOUNTS = 100_000
+INSTRUCTIONS = 200_000
+SAMPLE = 2_000
+RUN_DATE = date(2026, 11, 1)
+
+settings.DEBIT_VELOCITY_LIMIT = None
+settings.DAILY_WITHDRAWAL_LIMIT = None
+settings.AUDIT_FLUSH_SECONDS = None  # one in-memory SQLite: no background writer
+
+
+def new_account(user, balance):
+    return Account(user=user, account_number=f"SB{uuid.uuid4().hex[:10].upper()}",
+                   balance=Decimal(balance))
+
+
+def instruction(account, amount, **fields):
+    fields.setdefault('start_date', RUN_DATE)
+    fields.setdefault('next_run', fields['start_date'])
+    return StandingInstruction(account=account, amount=Decimal(amount), **fields)
+
+
+# ─── Scheduling rules ───────────────────────────────────────────────
+si = StandingInstruction(frequency='monthly', start_date=date(2027, 1, 31), next_run=date(2027, 1, 31))
+dates = []
+for _ in range(4):
+    si.next_run = standing.next_date(si)
+    dates.append(si.next_run)
+assert dates == [date(2027, 2, 28), date(2027, 3, 31), date(2027, 4, 30), date(2027, 5, 31)], dates
+si = StandingInstruction(frequency='monthly', start_date=date(2026, 12, 5), next_run=date(2026, 12, 5))
+assert standing.next_date(si) == date(2027, 1, 5)
+si.frequency = 'weekly'
+assert standing.next_date(si) == date(2026, 12, 12)
+rows = [(1, 10), (2, 10), (3, 11), (4, 12), (5, 12), (6, 12), (7, 13)]
+chunks = standing.account_chunks(rows, 2)
+assert chunks == [[1, 2], [3, 4, 5, 6], [7]], chunks
+print("📅 Standing instructions")
+print("  monthly dates keep their day (clamped), chunks never split an account ✅")
+
+# ─── Outcomes ───────────────────────────────────────────────────────
+owner = User.objects.create(username='bench_si_owner', role='customer')
+salary, savings, emi, closed, poor = Account.objects.bulk_create([
+    new_account(owner, '10000.00'), new_account(owner, '0.00'), new_account(owner, '5000.00'),
+    new_account(owner, '0.00'), new_account(owner, '100.00'),
+])
+Account.objects.filter(pk=closed.pk).update(is_active=False)
+cases = StandingInstruction.objects.bulk_create([
+    instruction(emi, '1500.00', description='EMI Payment'),                       # completes
+    instruction(poor, '500.00', description='Electricity Bill'),                  # fails: balance
+    instruction(salary, '2500.00', kind='sweep', destination=savings,
+                description='Sweep to savings'),                                  # moves 7500
+    instruction(savings, '50000.00', kind='sweep', destination=salary),           # skipped
+    instruction(emi, '100.00', kind='sweep', destination=closed),                 # fails: closed
+    instruction(emi, '10.00', frequency='daily', start_date=RUN_DATE - timedelta(days=2),
+                end_date=RUN_DATE, description='Daily SIP'),                      # 3 runs, ends
+])
+totals = standing.run_due(RUN_DATE)
+assert totals['completed'] == 5 and totals['failed'] == 2 and totals['skipped'] == 1, totals
+balances = dict(Account.objects.filter(user=owner).values_list('id', 'balance'))
+assert balances[emi.id] == Decimal('3470.00'), balances[emi.id]
+assert balances[salary.id] == Decimal('2500.00') and balances[savings.id] == Decimal('7500.00')
+assert balances[poor.id] == Decimal('100.00')
+outcomes = {run.instruction_id: run for run in InstructionRun.objects.filter(instruction__in=cases)}
+assert outcomes[cases[1].id].error == 'Insufficient balance.' and outcomes[cases[1].id].transaction is None
+assert outcomes[cases[2].id].amount == Decimal('7500.00') and outcomes[cases[2].id].transaction
+assert outcomes[cases[3].id].status == 'skipped'
+assert outcomes[cases[4].id].status == 'failed'
+daily = StandingInstruction.objects.get(pk=cases[5].pk)
+assert not daily.is_active and daily.runs.count() == 3, (daily.is_active, daily.runs.count())
+assert StandingInstruction.objects.get(pk=cases[1].pk).next_run == date(2026, 12, 1)
+
+before = Transaction.objects.count()
+assert standing.run_due(RUN_DATE)['completed'] == 0
+assert Transaction.objects.count() == before
+print("  payments, bounces, sweeps, closed destinations, end dates and catch-up ✅  re-run is a no-op ✅")
+
+# ─── Month-start run ────────────────────────────────────────────────
+user = User.objects.create(username='bench_si', role='customer')
+Account.objects.bulk_create([new_account(user, '100000.00') for _ in range(ACCOUNTS)], batch_size=5000)
+account_ids = list(Account.objects.filter(user=user).order_by('id').values_list('id', flat=True))
+StandingInstruction.objects.bulk_create([
+    StandingInstruction(account_id=account_ids[n % ACCOUNTS], amount=Decimal('499.00'),
+                        description='EMI Payment', start_date=RUN_DATE, next_run=RUN_DATE)
+    for n in range(INSTRUCTIONS)
+], batch_size=5000)
+
+with connection.cursor() as cursor:
+    sql, params = (StandingInstruction.objects.filter(is_active=True, next_run__lte=RUN_DATE)
+                   .order_by().values_list('id', 'account_id').query.sql_with_params())
+    cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+    plan = ' '.join(str(row) for row in cursor.fetchall())
+assert 'si_due_idx' in plan, plan
+
+sample = list(StandingInstruction.objects.filter(account__user=user).order_by('id')[:SAMPLE])
+started = time.perf_counter()
+for si in sample:
+    ledger.post_entry(si.account_id, 'debit', si.amount, si.description)
+one_by_one = (time.perf_counter() - started) / SAMPLE
+Account.objects.filter(id__in=[si.account_id for si in sample]).update(balance=Decimal('100000.00'))
+Transaction.objects.filter(account__user=user).delete()
+
+started = time.perf_counter()
+totals = standing.run_due(RUN_DATE, chunk_size=1000)
+elapsed = time.perf_counter() - started
+assert totals['completed'] == INSTRUCTIONS and totals['amount'] == INSTRUCTIONS * Decimal('499.00'), totals
+assert not StandingInstruction.objects.filter(is_active=True, next_run__lte=RUN_DATE).exists()
+assert InstructionRun.objects.filter(instruction__account__user=user).count() == INSTRUCTIONS
+spent = Decimal('100000.00') * ACCOUNTS - Account.objects.filter(user=user).aggregate(s=Sum('balance'))['s']
+assert spent == INSTRUCTIONS * Decimal('499.00'), spent
+print(f"  {INSTRUCTIONS:,} instructions on {ACCOUNTS:,} accounts: batched {elapsed:.1f} s "
+      f"({INSTRUCTIONS / elapsed:,.0f}/s) | one at a time ~{one_by_one * INSTRUCTIONS:.0f} s "
+      f"({1 / one_by_one:,.0f}/s, from {SAMPLE:,})")
+
+call_command('verify_ledger', output=os.devnull, state=os.devnull, stdout=io.StringIO())
+print("  due query on si_due_idx, every debit posted once, ledger verifies ✅")
+
+# ─── API ────────────────────────────────────────────────────────────
+api = APIClient()
+api.force_authenticate(owner)
+today = date.today().isoformat()
+response = api.post('/api/standing-instructions/', {
+    'account': emi.id, 'amount': '1200.00', 'description': 'Car EMI', 'start_date': today}, format='json')
+assert response.status_code == 201 and response.data['next_run'] == today, response.data
+created = response.data['id']
+response = api.post('/api/standing-instructions/', {
+    'account': salary.id, 'kind': 'sweep', 'amount': '1000.00', 'start_date': today}, format='json')
+assert response.status_code == 400 and 'destination' in response.data, response.data
+response = api.post('/api/standing-instructions/', {
+    'account': account_ids[0], 'amount': '10.00', 'start_date': today}, format='json')
+assert response.status_code == 400 and 'account' in response.data, response.data
+listed = api.get('/api/standing-instructions/').data
+assert listed[0]['id'] == created and listed[0]['account_number'] == emi.account_number, listed[0]
+assert listed[0]['destination_number'] is None and listed[0]['kind_display'] == 'Recurring Payment'
+assert api.post(f'/api/standing-instructions/{created}/cancel/').status_code == 200
+assert api.post(f'/api/standing-instructions/{created}/cancel/').status_code == 404
+print("  customer API creates, validates, lists and cancels ✅")
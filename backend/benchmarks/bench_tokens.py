@@ -0,0 +1,199 @@
+"""
+Refresh-token revocation benchmark — cost of the revocation check on
+every refresh (Bloom filter front, buffered writes) vs an indexed lookup
+plus INSERT per refresh, filter rebuild time over REVOKED live rows, and
+refresh latency vs the stock serializer. Checks: the filter has no false
+negatives and about the configured false-positive rate, a refresh token
+works once (reuse is refused), logout revokes a session, 'log out
+everywhere' refuses every earlier refresh and access token, revocations
+written by another process are picked up by sync(), filter false
+positives are confirmed against the table, and compaction drops expired
+rows and stale cutoffs.
+Run: cd backend && python benchmarks/bench_tokens.py
+"""
+import io
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from common import setup_test_db, best_of
+
+setup_test_db()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts import revocation
+from accounts.models import RevokedToken, TokenCutoff, User
+from accounts.serializers import TokenRefreshSerializer
+
+REVOKED = 200_000
+EXPIRED = 50_000
+REFRESHES = 20_000
+REQUESTS = 2_000
+PASSWORD = 'Secret#123'
+
+settings.REVOCATION_SYNC_SECONDS = None  # write through; sync explicitly below
+
+
+def login(username):
+    response = APIClient().post('/api/token/', {'username': username, 'password': PASSWORD}, format='json')
+    assert response.status_code == 200, response.data
+    return response.data
+
+
+def refresh(token):
+    return APIClient().post('/api/token/refresh/', {'refresh': token}, format='json')
+
+
+def me(access):
+    api = APIClient()
+    api.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    return api.get('/api/me/')
+
+
+# ─── Bloom filter ───────────────────────────────────────────────────
+bloom = revocation.BloomFilter(100_000, 0.001)
+members = [uuid.uuid4().bytes for _ in range(100_000)]
+for key in members:
+    bloom.add(key)
+assert all(key in bloom for key in members)
+false_positives = sum(uuid.uuid4().bytes in bloom for _ in range(100_000)) / 100_000
+assert false_positives < 0.002, false_positives
+print("🔑 Refresh-token revocation")
+print(f"  filter: {bloom.hashes} probes, {len(bloom.bits) / 1e3:.0f} kB per 100k tokens, "
+      f"no false negatives, {false_positives:.3%} false positives ✅")
+
+# ─── Rotation, logout, log out everywhere ───────────────────────────
+user = User.objects.create_user(username='bench_tokens', password=PASSWORD, role='customer')
+first = login('bench_tokens')
+response = refresh(first['refresh'])
+assert response.status_code == 200 and response.data['refresh'] != first['refresh'], response.data
+second = response.data
+assert refresh(first['refresh']).status_code == 401
+assert refresh(second['refresh']).status_code == 200
+print("  a refresh token works once, reuse is refused ✅")
+
+session = login('bench_tokens')
+api = APIClient()
+assert api.post('/api/token/logout/', {'refresh': session['refresh']}, format='json').status_code == 200
+assert api.post('/api/token/logout/', {'refresh': 'garbage'}, format='json').status_code == 401
+assert refresh(session['refresh']).status_code == 401
+
+phone, laptop = login('bench_tokens'), login('bench_tokens')
+assert me(laptop['access']).status_code == 200
+api.credentials(HTTP_AUTHORIZATION=f"Bearer {phone['access']}")
+assert api.post('/api/token/logout-all/').status_code == 200
+assert me(laptop['access']).status_code == 401 and me(phone['access']).status_code == 401
+assert refresh(laptop['refresh']).status_code == 401
+time.sleep(1.01)  # iat has whole seconds: the cutoff's second is refused too
+assert me(login('bench_tokens')['access']).status_code == 200
+
+# An inactive user cannot refresh, and the refused token is not consumed.
+suspended = login('bench_tokens')
+User.objects.filter(pk=user.pk).update(is_active=False)
+response = refresh(suspended['refresh'])
+assert response.status_code == 401 and me(suspended['access']).status_code == 401
+User.objects.filter(pk=user.pk).update(is_active=True)
+assert refresh(suspended['refresh']).status_code == 200
+print("  logout revokes one session, log out everywhere refuses every earlier token, "
+      "inactive users locked out ✅")
+
+# Another process revoked this token; sync() pulls it into our filter.
+elsewhere = RefreshToken.for_user(user)
+RevokedToken.objects.create(jti=elsewhere['jti'], expires_at=timezone.now() + timedelta(days=1),
+                            revoked_at=timezone.now())
+revocation.sync()
+assert revocation.is_revoked(elsewhere) and not revocation.consume(elsewhere)
+
+# A filter false positive is confirmed against the table and let through.
+unlucky = RefreshToken.for_user(user)
+revocation._filter.add(uuid.UUID(unlucky['jti']).bytes)
+assert revocation.consume(unlucky) and not revocation.consume(unlucky)
+print("  revocations from other processes synced, false positives confirmed in the table ✅")
+
+# ─── Check cost on the refresh path ─────────────────────────────────
+now = timezone.now()
+RevokedToken.objects.bulk_create([
+    RevokedToken(jti=uuid.uuid4(), expires_at=now + timedelta(days=n % 7 + 1), revoked_at=now)
+    for n in range(REVOKED)
+], batch_size=5000)
+started = time.perf_counter()
+revocation.rebuild()
+rebuild_time = time.perf_counter() - started
+tokens = [RefreshToken.for_user(user) for _ in range(REFRESHES)]
+
+
+def lookup_and_insert():
+    for token in tokens[:REFRESHES // 2]:
+        jti = uuid.UUID(token['jti'])
+        assert not RevokedToken.objects.filter(jti=jti).exists()
+        RevokedToken.objects.create(jti=jti, expires_at=now + timedelta(days=7), revoked_at=now)
+
+
+def buffered():
+    for token in tokens[REFRESHES // 2:]:
+        assert revocation.consume(token)
+
+
+lookup_time, _ = best_of(lookup_and_insert, rounds=1)
+settings.REVOCATION_SYNC_SECONDS = 3600  # background writes; flushed below
+revocation._ensure_started()
+time.sleep(0.5)  # let the sync thread finish its first pass and go to sleep
+buffered_time, _ = best_of(buffered, rounds=1)
+started = time.perf_counter()
+assert revocation.flush() == REFRESHES // 2
+flush_time = time.perf_counter() - started
+settings.REVOCATION_SYNC_SECONDS = None
+assert not any(revocation.consume(token) for token in tokens[REFRESHES // 2:][:100])
+
+per = REFRESHES // 2
+print(f"  {REVOKED:,} revoked tokens: filter rebuilt in {rebuild_time:.2f} s")
+print(f"  per refresh: lookup + INSERT {lookup_time / per * 1e6:6.1f} µs | "
+      f"filter + buffered write {buffered_time / per * 1e6:5.1f} µs "
+      f"(+ {flush_time / per * 1e6:.1f} µs each in the background flush)")
+
+
+
+def refresh_latency(serializer_class):
+    """p50, p99 of REQUESTS chained refreshes through ``serializer_class``."""
+    token, timings = login('bench_tokens')['refresh'], []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        serializer = serializer_class(data={'refresh': token})
+        serializer.is_valid(raise_exception=True)
+        timings.append(time.perf_counter() - started)
+        token = serializer.validated_data['refresh']
+    timings.sort()
+    return statistics.median(timings), timings[int(REQUESTS * 0.99)]
+
+
+settings.REVOCATION_SYNC_SECONDS = 3600
+stock = refresh_latency(jwt_serializers.TokenRefreshSerializer)
+ours = refresh_latency(TokenRefreshSerializer)
+revocation.flush()
+settings.REVOCATION_SYNC_SECONDS = None
+print(f"  refresh: stock (no revocation) p50 {stock[0] * 1e6:.0f} µs, p99 {stock[1] * 1e6:.0f} µs | "
+      f"rotating + revocation p50 {ours[0] * 1e6:.0f} µs, p99 {ours[1] * 1e6:.0f} µs")
+
+# ─── Compaction ─────────────────────────────────────────────────────
+past = timezone.now() - timedelta(seconds=1)
+RevokedToken.objects.bulk_create([
+    RevokedToken(jti=uuid.uuid4(), expires_at=past, revoked_at=past - timedelta(days=7))
+    for _ in range(EXPIRED)
+], batch_size=5000)
+stale = User.objects.create(username='bench_tokens_stale', role='customer')
+TokenCutoff.objects.create(user=stale, not_before=timezone.now() - timedelta(days=8))
+live = RevokedToken.objects.count() - EXPIRED
+out = io.StringIO()
+call_command('compact_revocations', stdout=out)
+assert f'Deleted {EXPIRED} expired revocation(s) and 1 stale cutoff(s)' in out.getvalue(), out.getvalue()
+assert RevokedToken.objects.count() == live and TokenCutoff.objects.filter(user=user).exists()
+revocation.rebuild()
+assert revocation._filter.count == live, (revocation._filter.count, live)
+assert not revocation.consume(elsewhere) and revocation.logged_out(RefreshToken(phone['refresh']))
+print("  compaction drops expired revocations and stale cutoffs, rebuild keeps the rest ✅")
@@ -0,0 +1,61 @@
+"""
+Stress benchmark — transfers/second between hot account pairs.
+
+Compares one transfer per DB transaction with batches of transfers per DB
+transaction. Workers move money back and forth between the same few
+accounts in opposite directions, which deadlocks without canonical lock
+ordering. Threads run concurrently on PostgreSQL (set DATABASE_URL);
+SQLite allows one writer, so it runs a single worker.
+Run: cd backend && python benchmarks/bench_transfers.py
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from common import setup_test_db
+
+setup_test_db()
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Sum
+from accounts.ledger import Transfer, execute_transfers
+from accounts.models import User, Account, Transaction
+
+PER_WORKER = 400
+BATCH = 50
+WORKERS = 8 if connection.vendor == 'postgresql' else 1
+
+# Debit limits are still checked on every posting, just set out of reach.
+settings.DEBIT_VELOCITY_LIMIT = 10 ** 9
+settings.DAILY_WITHDRAWAL_LIMIT = '10000000000.00'
+
+user = User.objects.create(username='bench_corp', role='customer')
+hot = [Account.objects.create(user=user, account_number=f"SB{uuid.uuid4().hex[:10].upper()}",
+                              balance=Decimal('1000000.00')) for _ in range(4)]
+start_total = Account.objects.aggregate(t=Sum('balance'))['t']
+
+
+def worker(n, batch_size):
+    # Alternate direction so workers contend on the same rows both ways.
+    a, b = hot[n % 2], hot[n % 2 + 2]
+    pairs = [(a.id, b.id) if i % 2 else (b.id, a.id) for i in range(PER_WORKER)]
+    try:
+        for i in range(0, PER_WORKER, batch_size):
+            execute_transfers([Transfer(s, d, Decimal('1.00'), 'Bench') for s, d in pairs[i:i + batch_size]])
+    finally:
+        connections.close_all()
+
+
+print(f"🏦 Transfers between hot pairs — {WORKERS} worker(s) × {PER_WORKER} transfers ({connection.vendor})")
+for label, batch_size in (('1 per transaction', 1), (f'{BATCH} per transaction', BATCH)):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(WORKERS) as pool:
+        list(pool.map(worker, range(WORKERS), [batch_size] * WORKERS))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:20s} {WORKERS * PER_WORKER / elapsed:9.0f} transfers/s  ({elapsed:.2f} s)")
+
+assert Account.objects.aggregate(t=Sum('balance'))['t'] == start_total, 'money was created or destroyed'
+assert Transaction.objects.count() == 2 * 2 * WORKERS * PER_WORKER
+print("  total balance conserved, every transfer posted a debit + credit pair ✅")
@@ -0,0 +1,52 @@
+"""
+Ledger verification throughput — postings checked per second by
+reconcile.verify(), plus a sanity check that one tampered row is found.
+Uses one worker on SQLite (an in-memory test DB is invisible to forked
+processes); set DATABASE_URL to a PostgreSQL server to try the pool.
+Run: cd backend && python benchmarks/bench_verify_ledger.py
+"""
+import time
+import uuid
+from decimal import Decimal
+
+from common import setup_test_db
+
+setup_test_db()
+
+from django.db import connection
+from accounts import batch, reconcile
+from accounts.models import User, Account, Transaction
+
+ACCOUNTS = 2000
+PER_ACCOUNT = 50
+
+user = User.objects.create(username='bench_verify', role='customer')
+accounts = Account.objects.bulk_create([
+    Account(user=user, account_number=f"SB{uuid.uuid4().hex[:10].upper()}",
+            balance=Decimal(PER_ACCOUNT * 10))
+    for _ in range(ACCOUNTS)
+])
+rows = []
+for account in accounts:
+    for n in range(1, PER_ACCOUNT + 1):
+        rows.append(Transaction(
+            account=account, transaction_type='credit', amount=Decimal('10.00'),
+            balance_after=Decimal(n * 10), description='Bench',
+            reference_id=f"TXN{uuid.uuid4().hex[:12].upper()}",
+        ))
+Transaction.objects.bulk_create(rows, batch_size=5000)
+Transaction.objects.filter(pk=rows[len(rows) // 2 + PER_ACCOUNT // 2].pk).update(balance_after=Decimal('1.00'))
+
+workers = batch.default_workers()
+ids = reconcile.account_ids()
+started = time.perf_counter()
+results = list(reconcile.verify(ids, workers=workers))
+elapsed = time.perf_counter() - started
+
+mismatches = [m for _, found in results for m in found]
+assert sum(count for count, _ in results) == ACCOUNTS
+assert [m['check'] for m in mismatches] == ['chain'], mismatches
+
+total = ACCOUNTS * PER_ACCOUNT
+print(f"🔎 {total:,} postings in {ACCOUNTS:,} accounts, {workers} worker(s) ({connection.vendor})")
+print(f"   {elapsed:.2f}s — {total / elapsed:,.0f} postings/s, tampered row found ✅")
@@ -0,0 +1,27 @@
+"""
+Shared setup for benchmark scripts: configures Django against a throwaway
+test database (in-memory for SQLite) so benchmarks never touch real data.
+"""
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'subbu_bank.settings')
+
+import django
+
+
+def setup_test_db():
+    """Configure Django and create + migrate a fresh test database."""
+    django.setup()
+    from django.test.utils import setup_databases
+    return setup_databases(verbosity=0, interactive=False)
+
+
+def best_of(fn, rounds=5):
+    """Return (best wall time in seconds, last result) over ``rounds`` calls."""
+    best, result = float('inf'), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
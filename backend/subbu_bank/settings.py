@@ -37,6 +37,8 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'accounts.middleware.CompressionMiddleware',
+    'accounts.sharding.LedgerShardMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -67,6 +69,7 @@ WSGI_APPLICATION = 'subbu_bank.wsgi.application'
 
 # Database — use PostgreSQL on Render, SQLite locally
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 if os.environ.get('DATABASE_URL'):
     DATABASES = {
@@ -83,6 +86,23 @@ else:
         }
     }
 
+# Optional ledger shards (see accounts/sharding.py): customers' accounts and
+# transactions live on these databases, everything else stays in 'default'.
+# LEDGER_SHARD_URLS is a comma-separated list of Postgres URLs;
+# LEDGER_SQLITE_SHARDS=N uses N local files (shard1.sqlite3, ...) instead.
+if os.environ.get('LEDGER_SHARD_URLS'):
+    for _n, _url in enumerate(os.environ['LEDGER_SHARD_URLS'].split(','), start=1):
+        DATABASES[f'shard{_n}'] = dj_database_url.parse(
+            _url, conn_max_age=600, engine='django.db.backends.postgresql')
+elif os.environ.get('LEDGER_SQLITE_SHARDS'):
+    for _n in range(1, int(os.environ['LEDGER_SQLITE_SHARDS']) + 1):
+        DATABASES[f'shard{_n}'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / f'shard{_n}.sqlite3',
+        }
+LEDGER_SHARDS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['accounts.sharding.ShardRouter']
+
 AUTH_PASSWORD_VALIDATORS = []
 
 AUTH_USER_MODEL = 'accounts.User'
@@ -103,14 +123,91 @@ STORAGES = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# API response compression (see accounts/middleware.py)
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_GZIP_LEVEL = 5
+COMPRESSION_BROTLI_QUALITY = 4
+# Responses carrying credentials are never compressed (BREACH)
+COMPRESSION_EXEMPT_URL_NAMES = (
+    'token_obtain_pair', 'token_refresh', 'password-setup', 'customer-invite', 'customer-onboard',
+)
+
+# Annual interest rate (percent) credited monthly on savings accounts by accrue_interest
+SAVINGS_INTEREST_RATE = '3.50'
+
+# Cold storage for old transactions (see accounts/archive.py). Archived rows
+# are deleted from the database, so this must be durable storage (a
+# persistent disk), never a container's own filesystem. Unset outside DEBUG,
+# which leaves archive_transactions refusing to run.
+_archive_root = os.environ.get('TRANSACTION_ARCHIVE_ROOT') or (BASE_DIR / 'archive' if DEBUG else None)
+TRANSACTION_ARCHIVE_ROOT = Path(_archive_root) if _archive_root else None
+TRANSACTION_RETENTION_DAYS = int(os.environ.get('TRANSACTION_RETENTION_DAYS', 730))
+
+# Per-account debit limits (see accounts/limits.py); None disables a check
+DAILY_WITHDRAWAL_LIMIT = '100000.00'  # rupees over any rolling 24 hours
+DEBIT_VELOCITY_LIMIT = 10             # debit postings per rolling minute
+LIMITS_CACHE = 'default'
+
+# Hash-chained audit log, written in batches (see accounts/audit.py)
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_SECONDS = 1.0   # None: flush only when a batch fills (and at exit)
+
+# Per-customer recent-transactions ring buffers (see accounts/recent.py)
+RECENT_TRANSACTIONS_SIZE = 20   # rows kept per customer
+RECENT_TRANSACTIONS_TTL = 300   # seconds
+RECENT_TRANSACTIONS_CACHE = 'recent'
+
+# Refresh-token revocation (see accounts/revocation.py)
+REVOCATION_BLOOM_CAPACITY = 1_000_000   # revoked tokens per filter before it grows
+REVOCATION_BLOOM_ERROR = 0.001          # false positives; each costs one indexed lookup
+REVOCATION_SYNC_SECONDS = 1.0           # None: write revocations through (single process)
+REVOCATION_REBUILD_SECONDS = 6 * 3600   # drop expired tokens from the filter
+
+# Limit counters and recent transactions need a cache shared by all web
+# processes in production
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+        'recent': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        # LRU: the least recently read customers are evicted first
+        'recent': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'recent-transactions',
+            'OPTIONS': {'MAX_ENTRIES': 10_000},
+        },
+    }
+
 # DRF Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.BatchSubrequestAuthentication',
+        'accounts.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson-backed JSON; output matches DRF's JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': (
+        'accounts.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'accounts.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 # JWT Configuration
@@ -118,6 +215,8 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=12),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    # Each refresh token works once; logout revokes (see accounts/revocation.py)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
 }
 
 # CORS — allow frontend origins
@@ -130,4 +229,12 @@ if 'https://subbubank.vercel.app' not in _cors_origins:
     _cors_origins.append('https://subbubank.vercel.app')
 CORS_ALLOWED_ORIGINS = _cors_origins
 CORS_ALLOW_ALL_ORIGINS = DEBUG
+# Live-update streams resume with Last-Event-ID (see accounts/live.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'last-event-id')
+CORS_EXPOSE_HEADERS = ['retry-after']
+# gunicorn's --threads per process (start.sh and render.yaml pass the same
+# GUNICORN_THREADS). Each open live stream holds one, so streams get three
+# quarters and the rest are always left for API requests.
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', '64'))
+LIVE_MAX_STREAMS = max(1, GUNICORN_THREADS * 3 // 4)
 
@@ -53,7 +53,15 @@ const api = {
         try { return await response.json(); } catch { return { detail: `Error ${response.status}` }; }
     },
 
-    async refreshToken() {
+    // Each refresh token works once: concurrent 401s share one refresh.
+    refreshToken() {
+        if (!this._refreshing) {
+            this._refreshing = this._refresh().finally(() => { this._refreshing = null; });
+        }
+        return this._refreshing;
+    },
+
+    async _refresh() {
         const { refresh } = this.getTokens();
         if (!refresh) return false;
         try {
@@ -68,6 +76,73 @@ const api = {
         } catch { return false; }
     },
 
+    // Live updates: server-sent events read with fetch so the JWT travels in a
+    // header. Calls onEvent({ type, ...data }) per event and reconnects with
+    // Last-Event-ID so only missed transactions are replayed. The replay
+    // overlaps what was already received (ids are not commit-ordered), so
+    // seen ids are skipped. Returns a function that closes the stream.
+    subscribeLive(onEvent) {
+        const controller = new AbortController();
+        let lastId = null;
+        const seen = new Set();
+        const run = async () => {
+            while (!controller.signal.aborted) {
+                let delay = 3000;
+                try {
+                    const { access } = this.getTokens();
+                    const response = await fetch(`${API_BASE}/live/`, {
+                        headers: {
+                            Accept: 'text/event-stream',
+                            Authorization: `Bearer ${access}`,
+                            ...(lastId !== null ? { 'Last-Event-ID': String(lastId) } : {}),
+                        },
+                        signal: controller.signal,
+                    });
+                    if (response.status === 401) {
+                        if (await this.refreshToken()) continue;
+                        return;
+                    }
+                    if (response.status === 503) {
+                        // Server at its stream limit: come back when it says so.
+                        delay = (Number(response.headers.get('Retry-After')) || 30) * 1000;
+                        throw new Error('Live updates busy');
+                    }
+                    if (!response.ok) throw new Error(`Error ${response.status}`);
+                    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                    let buffer = '';
+                    for (;;) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += value;
+                        let end;
+                        while ((end = buffer.indexOf('\n\n')) >= 0) {
+                            const fields = {};
+                            for (const line of buffer.slice(0, end).split('\n')) {
+                                const i = line.indexOf(':');
+                                if (i > 0) fields[line.slice(0, i)] = line.slice(i + 1).trimStart();
+                            }
+                            buffer = buffer.slice(end + 2);
+                            if (fields.id) {
+                                const id = Number(fields.id);
+                                if (seen.has(id)) continue;
+                                seen.add(id);
+                                if (seen.size > 2000) seen.delete(seen.values().next().value);
+                                if (lastId === null || id > lastId) lastId = id;
+                            }
+                            if (fields.event) onEvent({ type: fields.event, ...JSON.parse(fields.data || '{}') });
+                        }
+                    }
+                    continue; // server closed the stream on schedule: reconnect now
+                } catch {
+                    if (controller.signal.aborted) return;
+                }
+                await new Promise(resolve => setTimeout(resolve, delay));
+            }
+        };
+        run();
+        return () => controller.abort();
+    },
+
     async login(username, password) {
         const r = await fetch(`${API_BASE}/token/`, {
             method: 'POST', headers: { 'Content-Type': 'application/json' },
@@ -81,20 +156,43 @@ const api = {
         return user;
     },
 
+    // Revoke this session's refresh token; tokens are cleared either way.
+    async logout() {
+        const { refresh } = this.getTokens();
+        this.clearTokens();
+        if (!refresh) return;
+        try {
+            await fetch(`${API_BASE}/token/logout/`, {
+                method: 'POST', headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ refresh }),
+            });
+        } catch { /* offline: the token expires on its own */ }
+    },
+
     getProfile() { return this.request('/me/'); },
     getDashboardStats() { return this.request('/dashboard-stats/'); },
+    getBootstrap() { return this.request('/bootstrap/'); },
+    batch(urls) { return this.request('/batch/', { method: 'POST', body: JSON.stringify({ requests: urls.map(u => `/api${u}`) }) }); },
     getManagers() { return this.request('/managers/'); },
     createManager(data) { return this.request('/managers/', { method: 'POST', body: JSON.stringify({ ...data, role: 'rm' }) }); },
     getCustomers() { return this.request('/customers/'); },
+    getCustomerPortfolio(p = {}) { const q = new URLSearchParams({ summary: 'true', ...p }).toString(); return this.request(`/customers/?${q}`); },
     createCustomer(data) { return this.request('/customers/', { method: 'POST', body: JSON.stringify({ ...data, role: 'customer' }) }); },
+    onboardCustomers(customers, dryRun = false) { return this.request('/customers/onboard/', { method: 'POST', body: JSON.stringify({ customers, dry_run: dryRun }) }); },
     getAccounts() { return this.request('/accounts/'); },
     getTransactions(p = {}) { const q = new URLSearchParams(p).toString(); return this.request(`/transactions/${q ? '?' + q : ''}`); },
+    getSpendingAnalytics(p = {}) { const q = new URLSearchParams(p).toString(); return this.request(`/analytics/spending/${q ? '?' + q : ''}`); },
     getServices() { return this.request('/services/'); },
+    getServiceQueue(p = {}) { const q = new URLSearchParams(p).toString(); return this.request(`/service-queue/${q ? '?' + q : ''}`); },
+    claimServiceRequests(limit = 10) { return this.request('/service-queue/claim/', { method: 'POST', body: JSON.stringify({ limit }) }); },
+    updateServiceRequests(updates) { return this.request('/service-queue/bulk-status/', { method: 'POST', body: JSON.stringify({ updates }) }); },
     createService(data) { return this.request('/services/', { method: 'POST', body: JSON.stringify(data) }); },
-    getAllCustomers() { return this.request('/all-customers/'); },
+    getAllCustomers(p = {}) { const q = new URLSearchParams(p).toString(); return this.request(`/all-customers/${q ? '?' + q : ''}`); },
     getCustomerAccounts(id) { return this.request(`/customers/${id}/accounts/`); },
     deposit(data) { return this.request('/deposit/', { method: 'POST', body: JSON.stringify(data) }); },
     withdraw(data) { return this.request('/withdraw/', { method: 'POST', body: JSON.stringify(data) }); },
+    transfer(data) { return this.request('/transfer/', { method: 'POST', body: JSON.stringify(data) }); },
+    transferBatch(transfers) { return this.request('/transfers/batch/', { method: 'POST', body: JSON.stringify({ transfers }) }); },
 };
 
 export default api;
@@ -9,8 +9,8 @@ export default function Sidebar() {
 
     const navItems = getNavItems(user.role);
 
-    const handleLogout = () => {
-        api.clearTokens();
+    const handleLogout = async () => {
+        await api.logout();
         navigate('/');
     };
 
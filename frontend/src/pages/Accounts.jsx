@@ -11,6 +11,13 @@ export default function Accounts() {
         api.getAccounts()
             .then(setAccounts)
             .catch(err => showToast(err.detail || 'Failed to load accounts', 'error'));
+        // Apply pushed balances instead of re-fetching the list
+        return api.subscribeLive(event => {
+            if (event.type === 'resync') api.getAccounts().then(setAccounts).catch(() => { });
+            if (event.type !== 'transaction') return;
+            setAccounts(prev => prev && prev.map(acc =>
+                acc.id === event.account_id ? { ...acc, balance: event.balance } : acc));
+        });
     }, []);
 
     if (!accounts) return <div className="loading-overlay"><div className="spinner"></div></div>;
@@ -7,15 +7,21 @@ import { formatDate } from '../utils';
 export default function AllCustomers() {
     const user = api.getUser();
     const [customers, setCustomers] = useState(null);
+    const [search, setSearch] = useState('');
     const showToast = useToast();
 
     if (user.role !== 'superadmin') return <Navigate to="/dashboard" replace />;
 
+    // Server-side search; short terms (< 3 chars) list everyone
     useEffect(() => {
-        api.getAllCustomers()
-            .then(setCustomers)
-            .catch(err => showToast(err.detail || 'Failed to load customers', 'error'));
-    }, []);
+        const term = search.trim();
+        const timer = setTimeout(() => {
+            api.getAllCustomers(term.length >= 3 ? { search: term } : {})
+                .then(setCustomers)
+                .catch(err => showToast(err.detail || err.search || 'Failed to load customers', 'error'));
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [search]);
 
     return (
         <>
@@ -29,6 +35,9 @@ export default function AllCustomers() {
                     <div className="card-title">👥 Customer Directory</div>
                     {customers && <span style={{ fontSize: 13, color: 'var(--text-muted)' }}>{customers.length} customers</span>}
                 </div>
+                <div className="filters-bar">
+                    <input type="search" placeholder="Search name, username, phone, email or account no." value={search} onChange={e => setSearch(e.target.value)} />
+                </div>
 
                 {!customers ? (
                     <div className="loading-overlay"><div className="spinner"></div></div>
@@ -10,9 +10,27 @@ export default function Dashboard() {
     const showToast = useToast();
 
     useEffect(() => {
-        api.getDashboardStats()
-            .then(setStats)
+        // One round trip: profile + stats (+ accounts for customers)
+        const balances = {};
+        api.getBootstrap()
+            .then(data => {
+                api.setUser(data.user);
+                setStats(data.stats);
+                (data.accounts || []).forEach(acc => { balances[acc.id] = acc.balance; });
+            })
             .catch(err => showToast(err.detail || 'Failed to load dashboard', 'error'));
+        if (user.role !== 'customer') return;
+        // Keep balance and recent transactions current from pushed postings
+        return api.subscribeLive(event => {
+            if (event.type !== 'transaction') return;
+            balances[event.account_id] = event.balance;
+            const total = Object.values(balances).reduce((sum, b) => sum + Number(b), 0).toFixed(2);
+            setStats(prev => prev && {
+                ...prev,
+                total_balance: total,
+                recent_transactions: [event.transaction, ...(prev.recent_transactions || [])].slice(0, 5),
+            });
+        });
     }, []);
 
     if (!stats) return <div className="loading-overlay"><div className="spinner"></div></div>;
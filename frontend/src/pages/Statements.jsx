@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import api from '../api';
 import { useToast } from '../components/Toast';
 import { formatCurrency, formatDateTime } from '../utils';
@@ -8,11 +8,21 @@ export default function Statements() {
     const [accounts, setAccounts] = useState([]);
     const [filterType, setFilterType] = useState('');
     const [filterAccount, setFilterAccount] = useState('');
+    const applied = useRef({});
     const showToast = useToast();
 
     useEffect(() => {
         api.getAccounts().then(setAccounts).catch(() => { });
         loadTransactions();
+        // New postings arrive as deltas; only a resync re-fetches the list
+        return api.subscribeLive(event => {
+            if (event.type === 'resync') loadTransactions();
+            if (event.type !== 'transaction') return;
+            const { type, account } = applied.current;
+            const t = event.transaction;
+            if ((type && t.transaction_type !== type) || (account && String(event.account_id) !== String(account))) return;
+            setTxns(prev => prev && !prev.some(x => x.id === t.id) ? [t, ...prev] : prev);
+        });
     }, []);
 
     const loadTransactions = (type, account) => {
@@ -21,6 +31,7 @@ export default function Statements() {
         const a = account ?? filterAccount;
         if (t) params.type = t;
         if (a) params.account = a;
+        applied.current = params;
         setTxns(null);
         api.getTransactions(params)
             .then(setTxns)
@@ -21,4 +21,4 @@ else:
 "
 
 echo "Starting gunicorn..."
-exec gunicorn subbu_bank.wsgi:application --bind 0.0.0.0:$PORT
+exec gunicorn subbu_bank.wsgi:application --bind 0.0.0.0:$PORT --worker-class gthread --threads ${GUNICORN_THREADS:-64}